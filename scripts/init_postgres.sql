@@ -73,6 +73,8 @@ CREATE TABLE profesores (
     nombre_completo VARCHAR(255) NOT NULL,
     nombre_limpio VARCHAR(255) NOT NULL,
     slug VARCHAR(255) UNIQUE NOT NULL,
+    -- Slug del nombre en el directorio UAM (con el que el scraper busca al profesor)
+    slug_uam VARCHAR(255),
     
     -- URLs de origen
     url_directorio_uam TEXT,
@@ -89,6 +91,7 @@ CREATE TABLE profesores (
 
 -- Índices de profesores
 CREATE INDEX idx_profesores_slug ON profesores(slug);
+CREATE INDEX idx_profesores_slug_uam ON profesores(slug_uam);
 CREATE INDEX idx_profesores_nombre_limpio ON profesores(nombre_limpio);
 CREATE INDEX idx_profesores_departamento ON profesores(departamento);
 CREATE INDEX idx_profesores_activo ON profesores(activo) WHERE activo = TRUE;
@@ -258,6 +261,9 @@ CREATE TABLE resenias_metadata (
     tiene_comentario BOOLEAN DEFAULT FALSE,
     longitud_comentario INTEGER DEFAULT 0,
     
+    -- Huella de la reseña (SHA-1 de fecha, curso, calificaciones y comentario)
+    clave_resenia VARCHAR(40),
+    
     -- Auditoría
     fecha_extraccion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     fuente VARCHAR(50) DEFAULT 'misprofesores.com'
@@ -271,6 +277,7 @@ CREATE INDEX idx_resenias_fecha ON resenias_metadata(fecha_resenia DESC);
 CREATE INDEX idx_resenias_mongo ON resenias_metadata(mongo_opinion_id);
 CREATE INDEX idx_resenias_tiene_comentario ON resenias_metadata(tiene_comentario) WHERE tiene_comentario = TRUE;
 CREATE INDEX idx_resenias_profesor_fecha ON resenias_metadata(profesor_id, fecha_resenia DESC);
+CREATE INDEX idx_resenias_profesor_clave ON resenias_metadata(profesor_id, clave_resenia);
 
 -- ============================================================================
 
@@ -313,6 +320,8 @@ CREATE TABLE historial_scraping (
     
     -- Rendimiento
     duracion_segundos INTEGER,
+    duracion_ms INTEGER,
+    bytes_transferidos INTEGER,
     url_procesada TEXT,
     
     -- Metadatos de caché
@@ -331,6 +340,51 @@ CREATE INDEX idx_historial_timestamp ON historial_scraping(timestamp DESC);
 CREATE INDEX idx_historial_estado ON historial_scraping(estado);
 CREATE INDEX idx_historial_errores ON historial_scraping(estado) WHERE estado = 'error';
 
+-- ============================================================================
+
+-- Tabla: scrape_jobs
+-- Cola de trabajo de scraping compartida por workers en varias máquinas
+-- (scrape-enqueue / scrape-worker). Los workers reclaman trabajos con
+-- FOR UPDATE SKIP LOCKED y los mantienen con un lease renovado por heartbeat.
+CREATE TABLE scrape_jobs (
+    id SERIAL PRIMARY KEY,
+    
+    -- Identificación
+    run_id VARCHAR(50) NOT NULL,
+    profesor_nombre VARCHAR(255) NOT NULL,
+    
+    -- Estado: pendiente | en_proceso | terminado | fallido
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente',
+    prioridad REAL DEFAULT 0,
+    intentos INTEGER DEFAULT 0,
+    max_intentos INTEGER DEFAULT 3,
+    
+    -- Lease del worker que lo procesa
+    worker_id VARCHAR(255),
+    lease_hasta TIMESTAMP,
+    heartbeat_at TIMESTAMP,
+    
+    -- Resultado
+    resultado VARCHAR(20),
+    mensaje_error TEXT,
+    
+    -- Auditoría
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    CONSTRAINT uq_scrape_job_run_profesor UNIQUE (run_id, profesor_nombre),
+    CONSTRAINT check_scrape_job_estado
+        CHECK (estado IN ('pendiente', 'en_proceso', 'terminado', 'fallido'))
+);
+
+-- Índices de scrape_jobs
+CREATE INDEX idx_scrape_jobs_pendientes ON scrape_jobs(run_id, estado, prioridad);
+
+-- Trigger para updated_at en scrape_jobs
+CREATE TRIGGER update_scrape_jobs_updated_at
+BEFORE UPDATE ON scrape_jobs
+FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
 -- ============================================================================
 -- VISTAS
 -- ============================================================================
@@ -482,6 +536,7 @@ BEGIN
     RAISE NOTICE '  6. resenias_metadata';
     RAISE NOTICE '  7. resenia_etiquetas';
     RAISE NOTICE '  8. historial_scraping';
+    RAISE NOTICE '  9. scrape_jobs';
     RAISE NOTICE '';
     RAISE NOTICE 'La base de datos está lista para recibir datos del scraper.';
     RAISE NOTICE '============================================================================';
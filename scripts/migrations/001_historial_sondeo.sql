@@ -0,0 +1,13 @@
+-- ============================================================================
+-- Migración 001: Costo de sondeos de frescura en historial_scraping
+-- ============================================================================
+-- Agrega las columnas usadas por el sondeo de frescura de find_and_scrape
+-- (estado = 'sondeo') para registrar su costo en milisegundos y bytes.
+--
+-- Ejecución (bases creadas con una versión anterior de init_postgres.sql):
+-- docker exec -i sentiment_postgres psql -U sentiment_admin -d sentiment_uam_db \
+--     < scripts/migrations/001_historial_sondeo.sql
+-- ============================================================================
+
+ALTER TABLE historial_scraping ADD COLUMN IF NOT EXISTS duracion_ms INTEGER;
+ALTER TABLE historial_scraping ADD COLUMN IF NOT EXISTS bytes_transferidos INTEGER;
@@ -0,0 +1,37 @@
+-- ============================================================================
+-- Migración 002: Cola de trabajo distribuida (scrape_jobs)
+-- ============================================================================
+-- Crea la tabla usada por scrape-enqueue y scrape-worker para repartir una
+-- corrida entre varios procesos o máquinas.
+--
+-- Ejecución (bases creadas con una versión anterior de init_postgres.sql):
+-- docker exec -i sentiment_postgres psql -U sentiment_admin -d sentiment_uam_db \
+--     < scripts/migrations/002_scrape_jobs.sql
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    id SERIAL PRIMARY KEY,
+    run_id VARCHAR(50) NOT NULL,
+    profesor_nombre VARCHAR(255) NOT NULL,
+    estado VARCHAR(20) NOT NULL DEFAULT 'pendiente',
+    prioridad REAL DEFAULT 0,
+    intentos INTEGER DEFAULT 0,
+    max_intentos INTEGER DEFAULT 3,
+    worker_id VARCHAR(255),
+    lease_hasta TIMESTAMP,
+    heartbeat_at TIMESTAMP,
+    resultado VARCHAR(20),
+    mensaje_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_scrape_job_run_profesor UNIQUE (run_id, profesor_nombre),
+    CONSTRAINT check_scrape_job_estado
+        CHECK (estado IN ('pendiente', 'en_proceso', 'terminado', 'fallido'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_scrape_jobs_pendientes ON scrape_jobs(run_id, estado, prioridad);
+
+DROP TRIGGER IF EXISTS update_scrape_jobs_updated_at ON scrape_jobs;
+CREATE TRIGGER update_scrape_jobs_updated_at
+BEFORE UPDATE ON scrape_jobs
+FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
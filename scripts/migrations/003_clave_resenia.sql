@@ -0,0 +1,15 @@
+-- ============================================================================
+-- Migración 003: Huella de reseñas (clave_resenia)
+-- ============================================================================
+-- Agrega la huella con la que guardar_profesor_completo reconoce una reseña ya
+-- guardada (SHA-1 de fecha, curso, calificaciones y comentario). Las filas
+-- existentes quedan en NULL y reciben su huella cuando una corrida o el
+-- re-parseo las vuelve a encontrar.
+--
+-- Ejecución (bases creadas con una versión anterior de init_postgres.sql):
+-- docker exec -i sentiment_postgres psql -U sentiment_admin -d sentiment_uam_db \
+--     < scripts/migrations/003_clave_resenia.sql
+-- ============================================================================
+
+ALTER TABLE resenias_metadata ADD COLUMN IF NOT EXISTS clave_resenia VARCHAR(40);
+CREATE INDEX IF NOT EXISTS idx_resenias_profesor_clave ON resenias_metadata(profesor_id, clave_resenia);
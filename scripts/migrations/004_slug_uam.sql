@@ -0,0 +1,17 @@
+-- ============================================================================
+-- Migración 004: Slug del directorio UAM en profesores
+-- ============================================================================
+-- profesores.slug se construye con el nombre de MisProfesores, que puede
+-- diferir del nombre del directorio UAM (acentos, segundos nombres, títulos).
+-- slug_uam guarda el slug del nombre del directorio, con el que el scraper y
+-- el scheduler buscan al profesor. Las filas existentes quedan en NULL (se
+-- buscan por URL de MisProfesores o por slug) y lo reciben en su siguiente
+-- scraping.
+--
+-- Ejecución (bases creadas con una versión anterior de init_postgres.sql):
+-- docker exec -i sentiment_postgres psql -U sentiment_admin -d sentiment_uam_db \
+--     < scripts/migrations/004_slug_uam.sql
+-- ============================================================================
+
+ALTER TABLE profesores ADD COLUMN IF NOT EXISTS slug_uam VARCHAR(255);
+CREATE INDEX IF NOT EXISTS idx_profesores_slug_uam ON profesores(slug_uam);
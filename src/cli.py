@@ -9,22 +9,70 @@ Este módulo proporciona comandos para:
 
 Uso:
     python -m src.cli nombres-uam              # Obtener lista de profesores UAM
+    python -m src.cli nombres-uam --diff       # Actualizar la lista y guardar altas/bajas/cambios
     python -m src.cli prof                     # Seleccionar profesor de menú interactivo
     python -m src.cli prof --name "Nombre"     # Scrapear profesor específico
     python -m src.cli scrape-all               # Scrapear todos los profesores
+    python -m src.cli scrape-all --workers 4   # Scrapear con 4 workers concurrentes
+    python -m src.cli scrape-all --resume      # Reanudar la última corrida interrumpida
+    python -m src.cli scrape-all --max-duration 2h --budget 100  # Corrida acotada
+    python -m src.cli scrape-all --diff        # Solo profesores nuevos o renombrados
+    python -m src.cli scrape-enqueue           # Encolar una corrida en PostgreSQL
+    python -m src.cli scrape-worker --workers 4  # Procesar la cola (en una o varias máquinas)
+    python -m src.cli discover                 # Indexar el listado de la escuela en MisProfesores
+    python -m src.cli reparse                  # Re-parsear el HTML archivado sin acceder a la red
+    python -m src.cli scrape-report            # Percentiles de tiempo por etapa de la última corrida
     python -m src.cli db-sample                # Mostrar un registro de cada tabla
 """
 import argparse
 import asyncio
 import json
+import os
+import socket
+import time
+from collections import Counter
 from pathlib import Path
-from typing import List, Any
-
-from src.uam.nombres_uam import get_prof_names
+from typing import List, Any, AsyncIterator, Awaitable, Dict, Optional, Tuple, TypeVar
+
+from src.core.browser import close_browser_pool, get_browser_pool
+from src.core.http import close_http_client
+from src.core.interception import get_interception_policy
+from src.core.journal import RunJournal
+from src.core.metrics import QUANTILES, export_prometheus, percentile, rounded, run_samples, start_timings
+from src.core.rate_limit import get_rate_limiter
+from src.core.resilience import get_circuit_breaker
+from src.uam.diff import changed_names, diff_directory, load_latest_diff, save_diff
+from src.uam.nombres_uam import get_prof_names, iter_prof_batches
 from src.mp.scrape_prof import find_and_scrape
+from src.mp.reparse import reparse_archive
+from src.mp.school_index import build_school_index
+from src.mp.scheduler import ProfessorSignals, RunProgress, rank_professors
 
 INPUT_FILE = Path("data/inputs/profesor_nombres.json")
 
+T = TypeVar("T")
+
+
+def _run(coro: Awaitable[T]) -> T:
+    """
+    Ejecuta una corrutina del CLI y cierra el pool de navegador y el
+    cliente HTTP al terminar.
+
+    Args:
+        coro: Corrutina a ejecutar
+
+    Returns:
+        Resultado de la corrutina
+    """
+    async def _main() -> T:
+        try:
+            return await coro
+        finally:
+            await close_browser_pool()
+            await close_http_client()
+
+    return asyncio.run(_main())
+
 
 def _normalize_names(data: List[Any]) -> List[str]:
     """
@@ -60,12 +108,49 @@ def load_names() -> List[str]:
         return _normalize_names(data)
 
     # Fallback: obtener desde la web y persistir archivo de entrada
-    res = asyncio.run(get_prof_names())
+    res = _run(get_prof_names())
     INPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
     INPUT_FILE.write_text(json.dumps(res, ensure_ascii=False, indent=2), encoding="utf-8")
     return _normalize_names(res)
 
 
+async def update_names_with_diff() -> Dict[str, Any]:
+    """
+    Vuelve a recorrer el directorio UAM y calcula el diff contra la lista guardada.
+
+    Imprime el resumen, guarda el diff en data/outputs/directorio/diffs/ y
+    reemplaza el archivo de entrada por la lista actual.
+
+    Returns:
+        Dict del diff (ver src.uam.diff.diff_directory)
+    """
+    old: List[Dict[str, str]] = []
+    if INPUT_FILE.exists():
+        data = json.loads(INPUT_FILE.read_text(encoding="utf-8"))
+        old = [r for r in data if isinstance(r, dict) and r.get("name")]
+
+    new = await get_prof_names()
+    diff = diff_directory(old, new)
+    path = save_diff(diff)
+
+    INPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    INPUT_FILE.write_text(json.dumps(new, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    print(f"Directorio UAM: {len(old)} → {len(new)} profesores")
+    print(f"  + Altas: {len(diff['added'])}")
+    for rec in diff["added"]:
+        print(f"      {rec['name']}")
+    print(f"  - Bajas: {len(diff['removed'])}")
+    for rec in diff["removed"]:
+        print(f"      {rec['name']}")
+    print(f"  ~ Renombrados: {len(diff['renamed'])}")
+    for change in diff["renamed"]:
+        print(f"      {change['old']['name']} → {change['new']['name']}")
+    print(f"  ~ URL cambiada: {len(diff['moved'])}")
+    print(f"✓ Diff guardado en {path}")
+    return diff
+
+
 def print_menu(names: List[str], per_row: int = 4) -> None:
     """
     Imprime un menú numerado de profesores en formato de columnas.
@@ -103,65 +188,512 @@ def choose_index(n: int) -> int:
         print(f"Valor inválido. Escoge un número entre 1 y {n}.")
 
 
-async def scrape_all_professors() -> None:
+async def _scrape_worker(worker_id: int, queue: "asyncio.Queue[Optional[Tuple[int, str]]]",
+                         stats: Dict[str, Any], sequential: bool,
+                         journal: RunJournal, incremental: Optional[bool] = None) -> None:
+    """
+    Worker que consume profesores de la cola y ejecuta find_and_scrape.
+
+    Termina al recibir None (fin de la corrida) o al vencer la duración máxima.
+
+    Args:
+        worker_id: Identificador del worker (para los mensajes de progreso)
+        queue: Cola de tuplas (índice, nombre) pendientes
+        stats: Contadores compartidos de la corrida
+        sequential: Si True, omite el identificador de worker en los mensajes
+        journal: Bitácora de la corrida donde se registra cada resultado
+        incremental: Modo incremental de find_and_scrape (None: MP_INCREMENTAL)
+    """
+    while True:
+        if stats["deadline"] is not None and time.monotonic() >= stats["deadline"]:
+            return
+        item = await queue.get()
+        if item is None:
+            queue.task_done()
+            return
+        idx, name = item
+
+        # Mientras el directorio sigue cargando el total aún puede crecer
+        total = f"{stats['total']}+" if stats["loading"] else str(stats["total"])
+        prefix = f"[{idx}/{total}]" if sequential else f"[{idx}/{total}] (w{worker_id})"
+        t0 = time.monotonic()
+        stages = start_timings()
+        try:
+            print(f"\n{prefix} Procesando: {name}")
+            journal.record(name, "scrape", "inicio")
+            res = await find_and_scrape(name, incremental=incremental)
+            n_reviews = len(res.get('reviews', []))
+            timing = {
+                "duration_s": round(time.monotonic() - t0, 2),
+                "pages": res.get("pages_fetched", 0),
+                "stages_ms": rounded(stages),
+            }
+
+            if res.get('cached', False):
+                stats["cached"] += 1
+                journal.record(name, "scrape", "cache", reviews=n_reviews, **timing)
+                print(f"  -> {name}: cache vigente ({n_reviews} reseñas)")
+            else:
+                stats["scraped"] += 1
+                journal.record(name, "scrape", "scrapeado", reviews=n_reviews, **timing)
+                print(f"  -> {name}: scrapeado exitosamente ({n_reviews} reseñas)")
+
+        except Exception as e:
+            stats["errors"] += 1
+            stats["error_types"][type(e).__name__] += 1
+            journal.record(name, "scrape", "error", error=type(e).__name__,
+                           duration_s=round(time.monotonic() - t0, 2), stages_ms=rounded(stages))
+            print(f"  -> {name}: error: {str(e)}")
+        finally:
+            stats["done"] += 1
+            queue.task_done()
+            print(stats["progress"].finish(name, time.monotonic() - t0))
+
+
+async def _name_batches(only_diff: bool = False) -> AsyncIterator[List[str]]:
+    """
+    Genera los nombres de la corrida por lotes.
+
+    Con only_diff, entrega solo los nombres nuevos o renombrados del último
+    diff del directorio. Si existe el archivo de entrada, entrega todos los
+    nombres en un solo lote. Si no, recorre el directorio UAM y entrega cada lote en cuanto se
+    carga, de modo que los workers empiecen antes de que termine la carga;
+    al final persiste el archivo de entrada.
+
+    Args:
+        only_diff: Procesar solo altas y renombrados del último diff
+
+    Yields:
+        Lista de nombres de profesores
+    """
+    if only_diff:
+        diff = load_latest_diff()
+        if diff is None:
+            raise SystemExit("No hay diffs del directorio. Ejecuta primero: python -m src.cli nombres-uam --diff")
+        names = changed_names(diff)
+        print(f"Diff del {diff.get('created_at')}: {len(names)} profesores nuevos o renombrados")
+        yield names
+        return
+
+    if INPUT_FILE.exists():
+        names = load_names()
+        if not names:
+            raise SystemExit("No hay nombres disponibles. Ejecuta primero: python -m src.cli nombres-uam")
+        yield names
+        return
+
+    print("⚙ Cargando el directorio UAM mientras se scrapea...")
+    records: List[Dict[str, str]] = []
+    async for batch in iter_prof_batches():
+        records.extend(batch)
+        yield _normalize_names(batch)
+
+    INPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    INPUT_FILE.write_text(json.dumps(records, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"✓ Directorio UAM cargado: {len(records)} profesores (guardado en {INPUT_FILE})")
+
+
+async def _plan_batch(names: List[str], order: str,
+                      budget: Optional[int]) -> List[ProfessorSignals]:
+    """
+    Prioriza un lote de nombres y lo ordena para su ejecución.
+
+    Args:
+        names: Nombres del lote
+        order: "cost", "value" o "file" (ver scrape_all_professors)
+        budget: Profesores que aún caben en la corrida (None: sin límite)
+
+    Returns:
+        Lista de ProfessorSignals en el orden en que deben procesarse
+    """
+    ranked = await rank_professors(names)
+    by_name = {sig.name: sig for sig in ranked}
+    plan = ranked if order != "file" else [by_name[name] for name in names]
+
+    if budget is not None and budget < len(plan):
+        print(f"Presupuesto: {budget} de {len(plan)} profesores")
+        plan = plan[:max(0, budget)]
+
+    if order == "cost":
+        # Más largos primero (LPT): evita que un profesor grande quede al final
+        plan = sorted(plan, key=lambda s: s.cost, reverse=True)
+    return plan
+
+
+async def _produce(queue: "asyncio.Queue[Optional[Tuple[int, str]]]", stats: Dict[str, Any],
+                   journal: RunJournal, resume: Optional[str], order: str,
+                   budget: Optional[int], workers: int, only_diff: bool = False) -> None:
+    """
+    Encola los profesores de la corrida conforme se obtienen sus nombres.
+
+    Al terminar (o fallar) encola un None por worker para que terminen.
+
+    Args:
+        queue: Cola compartida con los workers
+        stats: Contadores compartidos de la corrida
+        journal: Bitácora de la corrida
+        resume: Corrida reanudada (None si es nueva)
+        order: Orden de ejecución (ver scrape_all_professors)
+        budget: Máximo de profesores a procesar (None: sin límite)
+        workers: Número de workers a notificar al terminar
+        only_diff: Procesar solo altas y renombrados del último diff
+    """
+    try:
+        async for names in _name_batches(only_diff):
+            if resume is not None:
+                pending = journal.pending(names)
+                print(f"Omitidos {len(names) - len(pending)} profesores ya terminados, "
+                      f"{len(pending)} pendientes")
+                names = pending
+
+            remaining = None if budget is None else budget - stats["total"]
+            if remaining is not None and remaining <= 0:
+                continue
+            plan = await _plan_batch(names, order, remaining)
+
+            if order != "file" and stats["total"] == 0:
+                print("Prioridad (valor esperado):")
+                for sig in sorted(plan, key=lambda s: s.value, reverse=True)[:5]:
+                    print(f"  {sig.value:.2f}  {sig.name}")
+
+            costs = {sig.name: sig.cost for sig in plan}
+            stats["progress"].add(costs)
+            print(f"Encolados {len(plan)} profesores "
+                  f"(costo estimado {sum(costs.values()) / 60:.1f} min de trabajo, "
+                  f"~{sum(costs.values()) / workers / 60:.1f} min con {workers} worker(s))")
+            for sig in plan:
+                stats["total"] += 1
+                queue.put_nowait((stats["total"], sig.name))
+    finally:
+        stats["loading"] = False
+        for _ in range(workers):
+            queue.put_nowait(None)
+
+
+def _parse_duration(value: str) -> float:
+    """
+    Convierte una duración como "90", "45m" o "2h" a segundos.
+
+    Args:
+        value: Número con sufijo opcional s, m o h (sin sufijo: segundos)
+
+    Returns:
+        Duración en segundos
+
+    Raises:
+        argparse.ArgumentTypeError: Si el formato no es válido
+    """
+    units = {"s": 1, "m": 60, "h": 3600}
+    raw = value.strip().lower()
+    factor = units.get(raw[-1:], None)
+    number = raw[:-1] if factor else raw
+    try:
+        return float(number) * (factor or 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Duración inválida: {value} (usa p. ej. 90, 45m o 2h)")
+
+
+async def scrape_all_professors(workers: int = 1, incremental: Optional[bool] = None,
+                                resume: Optional[str] = None, order: str = "cost",
+                                budget: Optional[int] = None,
+                                max_duration: Optional[float] = None,
+                                only_diff: bool = False) -> None:
     """
     Scrapea todos los profesores del directorio UAM con caché inteligente.
 
     Este comando:
-    1. Carga la lista de profesores desde nombres-uam
-    2. Para cada profesor, verifica si necesita actualización
-    3. Scrapea solo si hay cambios en el número de reseñas
-    4. Aplica delays entre requests para evitar bloqueos
-
-    Delays aplicados:
-    - 2-4 segundos entre profesores (evita sobrecarga del servidor)
+    1. Carga la lista de profesores desde nombres-uam (si aún no existe el
+       archivo de entrada, la carga del directorio corre en paralelo y los
+       workers empiezan con los primeros lotes)
+    2. Los ordena por valor esperado (antigüedad, ritmo de reseñas nuevas y
+       fallas recientes), los recorta al presupuesto de la corrida y ejecuta
+       primero los de mayor costo estimado para acortar la cola final
+       (dentro de cada lote cuando el directorio se carga en paralelo)
+    3. Reparte los profesores entre un pool acotado de workers asíncronos
+    4. Cada worker verifica si el profesor necesita actualización
+    5. Scrapea solo si hay cambios en el número de reseñas
+    6. Registra cada resultado en la bitácora de la corrida
+       (data/outputs/runs/<run_id>.jsonl)
+
+    Con resume, la corrida reutiliza la bitácora de una corrida anterior y
+    omite a los profesores que ya terminaron en ella (los que fallaron o
+    quedaron a medias se vuelven a procesar).
+
+    Control de carga:
+    - Limitador adaptativo por host (token bucket + AIMD) compartido por todos
+      los workers: acelera mientras el sitio responde bien y frena ante
+      latencias altas, timeouts, 429 o 5xx
     - Backoff exponencial automático en find_and_scrape (tenacity)
+
+    Args:
+        workers: Número de profesores procesados en paralelo (default: 1)
+        incremental: Detener la paginación en la primera reseña ya conocida
+                     (None: usa MP_INCREMENTAL)
+        resume: run_id de la corrida a reanudar, "latest" para la más
+                reciente o None para iniciar una corrida nueva
+        order: "cost" para elegir por valor esperado y ejecutar de mayor a
+               menor costo estimado, "value" para ejecutar por valor
+               esperado, "file" para respetar el orden del archivo de entrada
+        budget: Máximo de profesores a procesar (None: sin límite)
+        max_duration: Segundos tras los cuales los workers dejan de tomar
+                      profesores nuevos (None: sin límite)
+        only_diff: Procesar solo los profesores nuevos o renombrados del
+                   último diff del directorio (nombres-uam --diff)
+    """
+    try:
+        journal = RunJournal.open(resume)
+    except FileNotFoundError as e:
+        raise SystemExit(str(e))
+
+    if resume is None:
+        print(f"Corrida {journal.run_id} (bitácora: {journal.path})")
+    else:
+        print(f"Reanudando corrida {journal.run_id} (bitácora: {journal.path})")
+
+    workers = max(1, workers)
+    print(f"Iniciando scraping con {workers} worker(s)...")
+    print("="*80)
+
+    queue: "asyncio.Queue[Optional[Tuple[int, str]]]" = asyncio.Queue()
+    inicio = time.monotonic()
+    stats: Dict[str, Any] = {
+        "scraped": 0, "cached": 0, "errors": 0, "error_types": Counter(),
+        "total": 0, "done": 0, "loading": True,
+        "deadline": inicio + max_duration if max_duration else None,
+        "progress": RunProgress({}, workers),
+    }
+    sequential = workers == 1
+
+    try:
+        await asyncio.gather(
+            _produce(queue, stats, journal, resume, order, budget, workers, only_diff),
+            *(_scrape_worker(w, queue, stats, sequential, journal, incremental)
+              for w in range(1, workers + 1)),
+        )
+    finally:
+        await journal.aclose()
+
+    elapsed = time.monotonic() - inicio
+    limiter = get_rate_limiter()
+
+    # Resumen final
+    print("\n" + "="*80)
+    print("RESUMEN DE SCRAPING")
+    print("="*80)
+    print(f"Corrida: {journal.run_id}")
+    print(f"Total profesores procesados: {stats['done']}")
+    print(f"Scrapeados exitosamente: {stats['scraped']}")
+    print(f"Obtenidos de cache: {stats['cached']}")
+    print(f"Errores: {stats['errors']}")
+    for tipo, n in stats["error_types"].most_common():
+        print(f"  - {tipo}: {n}")
+    if stats["done"] < stats["total"]:
+        print(f"Pendientes por límite de duración: {stats['total'] - stats['done']} "
+              f"(continúa con --resume {journal.run_id})")
+    print(f"Workers: {workers}")
+    print(f"Duración: {elapsed:.1f}s")
+    print(f"Throughput: {stats['done'] / elapsed * 60 if elapsed else 0.0:.1f} profesores/min")
+    for line in limiter.summary_lines() + get_circuit_breaker().summary_lines():
+        print(line)
+    for line in get_browser_pool().summary_lines():
+        print(line)
+    for line in get_interception_policy().stats.summary_lines():
+        print(line)
+    print(f"Métricas por etapa: {export_prometheus(journal)} "
+          f"(detalle: python -m src.cli scrape-report --run {journal.run_id})")
+    print("="*80)
+
+
+async def enqueue_run(run_id: Optional[str] = None, order: str = "cost",
+                      budget: Optional[int] = None) -> str:
+    """
+    Encola una corrida de scraping en la tabla scrape_jobs de PostgreSQL.
+
+    Los profesores se priorizan igual que en scrape-all; la prioridad de cada
+    trabajo es su posición en ese orden (mayor primero).
+
+    Args:
+        run_id: Identificador de la corrida (None: uno nuevo)
+        order: Orden de ejecución ("cost", "value" o "file")
+        budget: Máximo de profesores a encolar (None: todos)
+
+    Returns:
+        run_id de la corrida encolada
     """
+    from src.db.queue import encolar_trabajos, resumen_cola
+
     names = load_names()
     if not names:
         raise SystemExit("No hay nombres disponibles. Ejecuta primero: python -m src.cli nombres-uam")
 
-    total = len(names)
-    print(f"Iniciando scraping de {total} profesores...")
-    print("="*80)
+    run_id = run_id or RunJournal.new_run_id()
+    plan = await _plan_batch(names, order, budget)
+    trabajos = [(sig.name, float(len(plan) - i)) for i, sig in enumerate(plan)]
+    insertados = await encolar_trabajos(run_id, trabajos)
 
-    scraped = 0
-    cached = 0
-    errors = 0
+    print(f"✓ Corrida {run_id}: {insertados} trabajos encolados "
+          f"({len(trabajos) - insertados} ya existían)")
+    print(f"  Estado de la cola: {await resumen_cola(run_id)}")
+    print(f"  Inicia workers con: python -m src.cli scrape-worker --run {run_id}")
+    return run_id
 
-    for idx, name in enumerate(names, start=1):
-        try:
-            print(f"\n[{idx}/{total}] Procesando: {name}")
-            res = await find_and_scrape(name)
 
-            if res.get('cached', False):
-                cached += 1
-                print(f"  -> Cache vigente ({len(res.get('reviews', []))} reseñas)")
-            else:
-                scraped += 1
-                print(f"  -> Scrapeado exitosamente ({len(res.get('reviews', []))} reseñas)")
+async def _queue_worker(worker_id: str, run_id: str, stats: Dict[str, Any],
+                        journal: RunJournal, incremental: Optional[bool] = None) -> None:
+    """
+    Worker que reclama trabajos de scrape_jobs hasta vaciar la corrida.
 
-            # Delay entre profesores para evitar rate limiting
-            # Solo aplicar delay si no es el último profesor
-            if idx < total:
-                delay = 2 + (2 * (idx % 3))  # Variar entre 2-4 segundos
-                print(f"  -> Esperando {delay}s antes del siguiente...")
-                await asyncio.sleep(delay)
+    Mientras procesa un profesor renueva su lease cada QUEUE_HEARTBEAT_S
+    segundos. Si no hay trabajos libres pero otros workers siguen
+    procesando, espera QUEUE_POLL_S y vuelve a consultar (sus leases
+    pueden vencer y quedar libres).
 
-        except Exception as e:
-            errors += 1
-            print(f"  -> Error: {str(e)}")
-            # Continuar con el siguiente profesor
+    Args:
+        worker_id: Identificador global del worker (host:pid:n)
+        run_id: Corrida a procesar
+        stats: Contadores compartidos del proceso
+        journal: Bitácora local de la corrida (resultados y tiempos por etapa)
+        incremental: Modo incremental de find_and_scrape (None: MP_INCREMENTAL)
+    """
+    from src.db.queue import (
+        QUEUE_HEARTBEAT_S, QUEUE_POLL_S,
+        completar_trabajo, fallar_trabajo, reclamar_trabajo, renovar_lease, resumen_cola
+    )
+
+    async def _heartbeat(job_id: int) -> None:
+        while True:
+            await asyncio.sleep(QUEUE_HEARTBEAT_S)
+            if not await renovar_lease(job_id, worker_id):
+                print(f"  ⚠ {worker_id}: lease del trabajo {job_id} perdido")
+                return
+
+    while True:
+        job = await reclamar_trabajo(run_id, worker_id)
+        if job is None:
+            if (await resumen_cola(run_id)).get("en_proceso", 0) == 0:
+                return
+            await asyncio.sleep(QUEUE_POLL_S)
             continue
 
-    # Resumen final
+        name = job["profesor_nombre"]
+        print(f"\n[{worker_id}] Procesando: {name} "
+              f"(intento {job['intentos']}/{job['max_intentos']})")
+        heartbeat = asyncio.create_task(_heartbeat(job["id"]))
+        t0 = time.monotonic()
+        stages = start_timings()
+        try:
+            res = await find_and_scrape(name, incremental=incremental)
+            n_reviews = len(res.get("reviews", []))
+            resultado = "cache" if res.get("cached", False) else "scrapeado"
+            stats["cached" if resultado == "cache" else "scraped"] += 1
+            journal.record(name, "scrape", resultado, reviews=n_reviews, worker=worker_id,
+                           duration_s=round(time.monotonic() - t0, 2),
+                           pages=res.get("pages_fetched", 0),
+                           stages_ms=rounded(stages))
+            await completar_trabajo(job["id"], worker_id, resultado)
+            print(f"  -> {name}: {resultado} ({n_reviews} reseñas)")
+        except Exception as e:
+            stats["errors"] += 1
+            stats["error_types"][type(e).__name__] += 1
+            journal.record(name, "scrape", "error", error=type(e).__name__, worker=worker_id,
+                           duration_s=round(time.monotonic() - t0, 2), stages_ms=rounded(stages))
+            estado = await fallar_trabajo(job["id"], worker_id, f"{type(e).__name__}: {e}")
+            print(f"  -> {name}: error ({estado}): {e}")
+        finally:
+            heartbeat.cancel()
+
+
+async def run_queue_worker(run_id: Optional[str] = None, workers: int = 1,
+                           incremental: Optional[bool] = None) -> None:
+    """
+    Procesa una corrida encolada en PostgreSQL con un pool de workers.
+
+    Puede ejecutarse a la vez en varios procesos o máquinas contra la misma
+    base de datos: cada trabajo lo procesa un solo worker.
+
+    Args:
+        run_id: Corrida a procesar (None: la encolada más recientemente)
+        workers: Workers concurrentes en este proceso
+        incremental: Modo incremental de find_and_scrape (None: MP_INCREMENTAL)
+    """
+    from src.db.queue import resumen_cola, ultimo_run_id
+
+    run_id = run_id or await ultimo_run_id()
+    if run_id is None:
+        raise SystemExit("La cola está vacía. Ejecuta primero: python -m src.cli scrape-enqueue")
+
+    host = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"Worker {host} procesando corrida {run_id} con {workers} worker(s)...")
+    print("="*80)
+
+    stats: Dict[str, Any] = {"scraped": 0, "cached": 0, "errors": 0, "error_types": Counter()}
+    journal = RunJournal(run_id)
+    inicio = time.monotonic()
+    try:
+        await asyncio.gather(*(
+            _queue_worker(f"{host}:{n}", run_id, stats, journal, incremental)
+            for n in range(1, max(1, workers) + 1)
+        ))
+    finally:
+        await journal.aclose()
+    elapsed = time.monotonic() - inicio
+
     print("\n" + "="*80)
-    print("RESUMEN DE SCRAPING")
+    print(f"RESUMEN DEL WORKER {host}")
+    print("="*80)
+    print(f"Scrapeados exitosamente: {stats['scraped']}")
+    print(f"Obtenidos de cache: {stats['cached']}")
+    print(f"Errores: {stats['errors']}")
+    for tipo, n in stats["error_types"].most_common():
+        print(f"  - {tipo}: {n}")
+    print(f"Duración: {elapsed:.1f}s")
+    print(f"Estado de la corrida {run_id}: {await resumen_cola(run_id)}")
+    for line in get_rate_limiter().summary_lines() + get_circuit_breaker().summary_lines():
+        print(line)
+    for line in get_browser_pool().summary_lines():
+        print(line)
+    for line in get_interception_policy().stats.summary_lines():
+        print(line)
+    print(f"Métricas por etapa de este host: {export_prometheus(journal)}")
+    print("="*80)
+
+
+def scrape_report(run_id: Optional[str] = None) -> None:
+    """
+    Muestra los percentiles de tiempo por etapa de una corrida.
+
+    Lee los tiempos guardados en la bitácora de la corrida (stages_ms) y
+    actualiza el archivo de métricas Prometheus con ellos.
+
+    Args:
+        run_id: Corrida a reportar (None: la más reciente)
+    """
+    try:
+        journal = RunJournal.open(run_id or "latest")
+    except FileNotFoundError as e:
+        raise SystemExit(str(e))
+
+    samples = run_samples(journal)
+    if not samples:
+        raise SystemExit(f"La corrida {journal.run_id} no tiene tiempos por etapa registrados.")
+
+    total_ms = sum(samples.get("total", [])) or 1.0
+    headers = ["Etapa", "n"] + [f"p{int(q * 100)} ms" for q in QUANTILES] + ["media ms", "% total"]
     print("="*80)
-    print(f"Total profesores procesados: {total}")
-    print(f"Scrapeados exitosamente: {scraped}")
-    print(f"Obtenidos de cache: {cached}")
-    print(f"Errores: {errors}")
+    print(f"TIEMPOS POR ETAPA - corrida {journal.run_id}")
+    print("="*80)
+    print(f"{headers[0]:<15}" + "".join(f"{h:>12}" for h in headers[1:]))
+    # Las etapas se ordenan por tiempo acumulado; 'total' va al final
+    ordered = sorted((n for n in samples if n != "total"), key=lambda n: sum(samples[n]), reverse=True)
+    for name in ordered + (["total"] if "total" in samples else []):
+        values = samples[name]
+        row = [len(values)] + [percentile(values, q) for q in QUANTILES]
+        row += [sum(values) / len(values), sum(values) / total_ms * 100]
+        print(f"{name:<15}{row[0]:>12}" + "".join(f"{v:>12.1f}" for v in row[1:]))
+    print("-"*80)
+    print("Las etapas de red y BD (http, navigation, selector_wait, db_postgres,")
+    print("db_mongo) están incluidas en las etapas del flujo que las contienen.")
+    print(f"Métricas Prometheus: {export_prometheus(journal)}")
     print("="*80)
 
 
@@ -335,26 +867,87 @@ def main() -> None:
     Punto de entrada principal del CLI.
 
     Maneja los comandos:
-    - nombres-uam: Extrae y muestra nombres del directorio UAM
+    - nombres-uam: Extrae y muestra nombres del directorio UAM (con --diff,
+      actualiza la lista guardada y registra altas, bajas y cambios)
     - prof: Scrapea perfil de un profesor (interactivo o por nombre)
     - scrape-all: Scrapea todos los profesores con caché inteligente
+    - scrape-enqueue: Encola una corrida en la tabla scrape_jobs de PostgreSQL
+    - scrape-worker: Procesa una corrida encolada (varios procesos/máquinas)
+    - discover: Indexa el listado de la escuela y siembra el caché de URLs
+    - reparse: Reconstruye JSON y BD desde el HTML archivado, sin red
+    - scrape-report: Muestra p50/p95 por etapa de una corrida
     - db-sample: Muestra un registro de cada tabla en las bases de datos
     """
     ap = argparse.ArgumentParser(
         description="SentimentInsightUAM - Scraping de reseñas de profesores UAM"
     )
-    ap.add_argument("cmd", choices=["nombres-uam", "prof", "scrape-all", "db-sample"],
+    ap.add_argument("cmd", choices=["nombres-uam", "prof", "scrape-all", "scrape-enqueue",
+                                    "scrape-worker", "scrape-report", "discover", "reparse", "db-sample"],
                     help="Comando a ejecutar")
     ap.add_argument("--name", help="Nombre exacto del profesor a scrapear")
+    ap.add_argument("--workers", type=int, default=None,
+                    help="Profesores procesados en paralelo por scrape-all (default: 1) "
+                         "o procesos de reparse (default: número de CPUs)")
+    ap.add_argument("--incremental", action=argparse.BooleanOptionalAction, default=None,
+                    help="Descargar solo reseñas nuevas (default: MP_INCREMENTAL)")
+    ap.add_argument("--resume", nargs="?", const="latest", default=None, metavar="RUN_ID",
+                    help="Reanudar una corrida de scrape-all (default: la más reciente)")
+    ap.add_argument("--order", choices=["cost", "value", "file"], default="cost",
+                    help="Orden de scrape-all: mayor costo primero, valor esperado o "
+                         "archivo de entrada (default: cost)")
+    ap.add_argument("--budget", type=int, default=None,
+                    help="Máximo de profesores a procesar en scrape-all")
+    ap.add_argument("--diff", action="store_true",
+                    help="nombres-uam: guardar altas/bajas/cambios del directorio; "
+                         "scrape-all: procesar solo nuevos o renombrados del último diff")
+    ap.add_argument("--max-duration", type=_parse_duration, default=None, metavar="DURACION",
+                    help="Duración máxima de scrape-all, p. ej. 90m o 2h")
+    ap.add_argument("--run", default=None, metavar="RUN_ID",
+                    help="Corrida de scrape-enqueue/scrape-worker/scrape-report "
+                         "(default: nueva / la más reciente)")
+    ap.add_argument("--school", default="UAM (Azcapotzalco)",
+                    help="Escuela a indexar con discover (default: UAM (Azcapotzalco))")
+    ap.add_argument("--school-url", default=None,
+                    help="URL del listado de la escuela (default: MP_SCHOOL_URL o búsqueda)")
     args = ap.parse_args()
 
     if args.cmd == "nombres-uam":
-        res = asyncio.run(get_prof_names())
+        if args.diff:
+            _run(update_names_with_diff())
+            return
+        res = _run(get_prof_names())
         print(json.dumps(res, ensure_ascii=False, indent=2))
         return
 
     if args.cmd == "scrape-all":
-        asyncio.run(scrape_all_professors())
+        _run(scrape_all_professors(workers=args.workers or 1, incremental=args.incremental,
+                                   resume=args.resume, order=args.order,
+                                   budget=args.budget, max_duration=args.max_duration,
+                                   only_diff=args.diff))
+        return
+
+    if args.cmd == "scrape-enqueue":
+        _run(enqueue_run(run_id=args.run, order=args.order, budget=args.budget))
+        return
+
+    if args.cmd == "scrape-worker":
+        _run(run_queue_worker(run_id=args.run, workers=args.workers or 1,
+                              incremental=args.incremental))
+        return
+
+    if args.cmd == "scrape-report":
+        scrape_report(run_id=args.run)
+        return
+
+    if args.cmd == "discover":
+        names = load_names()
+        if not names:
+            raise SystemExit("No hay nombres disponibles. Ejecuta primero: python -m src.cli nombres-uam")
+        _run(build_school_index(names, school_hint=args.school, school_url=args.school_url))
+        return
+
+    if args.cmd == "reparse":
+        asyncio.run(reparse_archive(names=[args.name] if args.name else None, workers=args.workers))
         return
 
     if args.cmd == "db-sample":
@@ -372,7 +965,7 @@ def main() -> None:
         idx = choose_index(len(names))
         sel_name = names[idx - 1]
 
-    res = asyncio.run(find_and_scrape(sel_name))
+    res = _run(find_and_scrape(sel_name, incremental=args.incremental))
 
     # Mostrar resumen
     print("\n" + "="*80)
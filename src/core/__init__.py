@@ -2,6 +2,14 @@
 Módulo core - Utilidades centrales del proyecto.
 
 Contiene:
-    browser: Context manager para Playwright con configuración personalizada
+    browser: Context manager y pool de navegador (BrowserPool) para Playwright
+    interception: Bloqueo de imágenes, fuentes, estilos y dominios de publicidad
+    http: Cliente HTTP asíncrono compartido (keep-alive, HTTP/2)
+    rate_limit: Limitador adaptativo (token bucket + AIMD) por host compartido entre workers
+    journal: Bitácora append-only de corridas de scrape-all (reanudación con --resume)
+    archive: Archivo comprimido de páginas HTML, deduplicado por hash de contenido
+    replay: Grabación de respuestas y servidor local de reproducción (pruebas sin red)
+    metrics: Temporizadores por etapa (ms), exportación Prometheus y percentiles
+    resilience: Reintentos y timeouts por etapa y circuit breaker por host
 """
 
@@ -0,0 +1,212 @@
+"""
+Archivo comprimido de páginas HTML descargadas, direccionado por contenido.
+
+Cada página (perfil y páginas de reseñas 2..N) se guarda comprimida en
+data/outputs/archive/objects/<hh>/<sha256>.html.<zst|gz>, donde el nombre es
+el hash SHA-256 del HTML. Una página que no cambió entre corridas produce el
+mismo hash y se almacena una sola vez.
+
+El índice data/outputs/archive/index.jsonl es de solo escritura al final y
+registra cada descarga:
+    {"slug": "josue-padilla-cuevas", "page": 2, "sha256": "ab12...",
+     "fetched_at": "2025-11-10T12:00:03", "url": "https://...", "codec": "zst"}
+
+Así se conserva el historial completo para volver a parsear sin red.
+
+Configuración por variables de entorno:
+    ARCHIVE_DIR: Directorio del archivo (default: data/outputs/archive)
+    ARCHIVE_CODEC: zstd | gzip | auto (default: auto, zstd si el paquete
+                   zstandard está instalado y gzip en caso contrario)
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from os import getenv
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+load_dotenv()
+ARCHIVE_DIR = Path(getenv("ARCHIVE_DIR", "data/outputs/archive"))
+ARCHIVE_CODEC = getenv("ARCHIVE_CODEC", "auto").lower()
+
+# Extensión de archivo por códec
+CODEC_SUFFIX = {"zst": ".html.zst", "gz": ".html.gz"}
+
+
+def _resolve_codec(codec: str) -> str:
+    """Traduce ARCHIVE_CODEC al códec disponible ('zst' o 'gz')."""
+    if codec in ("zstd", "zst"):
+        if zstandard is None:
+            print("⚠ ARCHIVE_CODEC=zstd pero zstandard no está instalado; se usa gzip")
+            return "gz"
+        return "zst"
+    if codec in ("gzip", "gz"):
+        return "gz"
+    return "zst" if zstandard is not None else "gz"
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("El objeto está comprimido con zstd y zstandard no está instalado")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class HtmlArchive:
+    """
+    Almacén de páginas HTML comprimidas y deduplicadas por hash.
+
+    Example:
+        archive = get_html_archive()
+        archive.put("josue-padilla-cuevas", 1, html, url=profile_url)
+        for entry in archive.entries(slug="josue-padilla-cuevas"):
+            html = archive.get(entry["sha256"])
+    """
+
+    def __init__(self, root: Path = ARCHIVE_DIR, codec: str = ARCHIVE_CODEC):
+        self.root = root
+        self.objects_dir = root / "objects"
+        self.index_path = root / "index.jsonl"
+        self.codec = _resolve_codec(codec)
+        self._lock = threading.Lock()
+
+    def _object_path(self, sha: str, codec: str) -> Path:
+        return self.objects_dir / sha[:2] / f"{sha}{CODEC_SUFFIX[codec]}"
+
+    def _find_object(self, sha: str) -> Optional[Path]:
+        """Busca el objeto con cualquiera de los códecs (pudo cambiar ARCHIVE_CODEC)."""
+        for codec in CODEC_SUFFIX:
+            path = self._object_path(sha, codec)
+            if path.exists():
+                return path
+        return None
+
+    def put(self, slug: str, page: int, html: str, url: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Archiva una página y registra la descarga en el índice.
+
+        Args:
+            slug: Slug del profesor
+            page: Número de página (1 = perfil)
+            html: Contenido HTML
+            url: URL de la página (opcional)
+
+        Returns:
+            Entrada del índice, con 'stored' = False si el contenido ya
+            estaba archivado
+        """
+        data = html.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+
+        existing = self._find_object(sha)
+        stored = existing is None
+        if stored:
+            path = self._object_path(sha, self.codec)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Escritura atómica: otro worker o proceso puede archivar el mismo hash
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(_compress(data, self.codec))
+            os.replace(tmp, path)
+            codec = self.codec
+        else:
+            codec = "zst" if existing.name.endswith(CODEC_SUFFIX["zst"]) else "gz"
+
+        entry = {
+            "slug": slug,
+            "page": page,
+            "sha256": sha,
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+            "url": url,
+            "codec": codec,
+            "size": len(data),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with self.index_path.open("a", encoding="utf-8") as f:
+                f.write(line)
+        return {**entry, "stored": stored}
+
+    def get(self, sha: str) -> str:
+        """
+        Lee una página archivada.
+
+        Args:
+            sha: Hash SHA-256 del contenido
+
+        Returns:
+            HTML descomprimido
+
+        Raises:
+            FileNotFoundError: Si el objeto no existe
+        """
+        path = self._find_object(sha)
+        if path is None:
+            raise FileNotFoundError(f"Objeto no archivado: {sha}")
+        codec = "zst" if path.name.endswith(CODEC_SUFFIX["zst"]) else "gz"
+        return _decompress(path.read_bytes(), codec).decode("utf-8")
+
+    def entries(self, slug: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Itera las entradas del índice en orden de descarga.
+
+        Args:
+            slug: Si se indica, solo las entradas de ese profesor
+
+        Yields:
+            Dicts con slug, page, sha256, fetched_at, url, codec y size
+        """
+        if not self.index_path.exists():
+            return
+        with self.index_path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # línea truncada por una interrupción
+                if slug is None or entry.get("slug") == slug:
+                    yield entry
+
+    def versions(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Todas las descargas de cada profesor.
+
+        Returns:
+            Dict slug → entradas de todas sus páginas, en orden de descarga
+        """
+        by_slug: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in self.entries():
+            by_slug.setdefault(entry["slug"], []).append(entry)
+        return by_slug
+
+
+# ============================================================================
+# INSTANCIA COMPARTIDA
+# ============================================================================
+
+_archive: Optional[HtmlArchive] = None
+
+
+def get_html_archive() -> HtmlArchive:
+    """Obtiene el archivo HTML compartido del proceso."""
+    global _archive
+    if _archive is None:
+        _archive = HtmlArchive()
+    return _archive
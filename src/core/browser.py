@@ -1,19 +1,53 @@
 """
 Módulo para gestionar contextos de navegador con Playwright.
 
-Proporciona un context manager asíncrono para crear instancias de navegador
-Chromium con configuración personalizada, incluyendo user agent y modo headless
-configurable por variables de entorno.
+Proporciona:
+- browser_ctx: context manager asíncrono que crea un navegador Chromium
+  desechable con configuración personalizada.
+- BrowserPool: pool de larga vida a nivel de proceso que mantiene el navegador
+  y sus contextos abiertos, presta páginas a quien las solicite y recicla los
+  contextos tras un número de navegaciones o un consumo de memoria dado.
+  Un watchdog cierra las páginas colgadas y reinicia el navegador completo
+  tras BROWSER_MAX_NAVIGATIONS navegaciones o BROWSER_MAX_RSS_MB de memoria.
+
+El modo headless y los límites del pool se configuran por variables de entorno.
 """
+import asyncio
+import os
+import time
+from collections import Counter
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from pathlib import Path
+from typing import AsyncGenerator, Dict, List, Optional, Set
 from dotenv import load_dotenv
 from os import getenv
-from playwright.async_api import async_playwright, BrowserContext
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+
+from .interception import get_interception_policy
+from .replay import get_recorder, record_browser_response
 
 load_dotenv()
 HEADLESS = (getenv("HEADLESS", "true").lower() == "true")
 
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+              "AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/122 Safari/537.36")
+
+# Límites del pool de navegador
+POOL_CONTEXTS = int(getenv("BROWSER_POOL_CONTEXTS", "2"))
+POOL_PAGES_PER_CONTEXT = int(getenv("BROWSER_POOL_PAGES_PER_CONTEXT", "4"))
+CONTEXT_MAX_NAVIGATIONS = int(getenv("BROWSER_CONTEXT_MAX_NAVIGATIONS", "200"))
+CONTEXT_MAX_HEAP_MB = float(getenv("BROWSER_CONTEXT_MAX_HEAP_MB", "512"))
+
+# Watchdog: préstamos colgados y reinicio del navegador (0 desactiva el límite)
+PAGE_MAX_LEASE_S = float(getenv("BROWSER_PAGE_MAX_LEASE_S", "180"))
+BROWSER_MAX_NAVIGATIONS = int(getenv("BROWSER_MAX_NAVIGATIONS", "2000"))
+BROWSER_MAX_RSS_MB = float(getenv("BROWSER_MAX_RSS_MB", "3072"))
+WATCHDOG_INTERVAL_S = float(getenv("BROWSER_WATCHDOG_INTERVAL_S", "10"))
+
+# Heap JS usado por el renderer de la página (solo Chromium expone performance.memory)
+_HEAP_JS = "() => (performance.memory ? performance.memory.usedJSHeapSize : 0)"
+
 
 @asynccontextmanager
 async def browser_ctx() -> AsyncGenerator[BrowserContext, None]:
@@ -22,7 +56,12 @@ async def browser_ctx() -> AsyncGenerator[BrowserContext, None]:
 
     Crea un navegador Chromium con un user agent personalizado y lo cierra
     automáticamente al finalizar. El modo headless se configura mediante
-    la variable de entorno HEADLESS (default: true).
+    la variable de entorno HEADLESS (default: true). Los recursos innecesarios
+    (imágenes, fuentes, estilos, publicidad) se bloquean según la política de
+    interceptación.
+
+    Para procesos que navegan muchas veces se recomienda BrowserPool, que
+    evita lanzar un Chromium nuevo en cada llamada.
 
     Yields:
         BrowserContext: Contexto del navegador de Playwright
@@ -34,14 +73,374 @@ async def browser_ctx() -> AsyncGenerator[BrowserContext, None]:
     """
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=HEADLESS)
-        ctx = await browser.new_context(
-            user_agent=("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/122 Safari/537.36")
-        )
+        ctx = await browser.new_context(user_agent=USER_AGENT)
+        await get_interception_policy().install(ctx)
         try:
             yield ctx
         finally:
             await ctx.close()
             await browser.close()
 
+
+def _browser_rss_mb() -> Optional[float]:
+    """
+    Memoria residente de los procesos hijos de este proceso (driver de
+    Playwright, Chromium y sus renderers).
+
+    Suma el VmRSS de cada proceso, así que la memoria compartida entre
+    procesos de Chromium se cuenta más de una vez: es una cota superior.
+
+    Returns:
+        RSS en MB, o None si /proc no está disponible (fuera de Linux)
+    """
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return None
+    children: Dict[int, List[int]] = {}
+    rss_kb: Dict[int, int] = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            status = (entry / "status").read_text()
+        except OSError:
+            continue  # el proceso terminó mientras se leía
+        fields = dict(line.split(":", 1) for line in status.splitlines() if ":" in line)
+        pid = int(entry.name)
+        children.setdefault(int(fields.get("PPid", "0")), []).append(pid)
+        rss_kb[pid] = int(fields.get("VmRSS", "0 kB").split()[0])
+
+    total, stack = 0, list(children.get(os.getpid(), []))
+    while stack:
+        pid = stack.pop()
+        total += rss_kb.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total / 1024
+
+
+class _ContextSlot:
+    """Contexto del pool con sus contadores de uso."""
+
+    def __init__(self, ctx: BrowserContext, browser: Browser):
+        self.ctx = ctx
+        self.browser = browser
+        self.active = 0
+        self.navigations = 0
+        self.heap_mb = 0.0
+        self.retiring = False
+
+
+class _Lease:
+    """Página prestada, vigilada por el watchdog."""
+
+    def __init__(self, page: Page, max_lease_s: Optional[float]):
+        self.page = page
+        self.started = time.monotonic()
+        self.max_lease_s = max_lease_s
+        self.killed = False
+
+
+class BrowserPool:
+    """
+    Pool de navegador Chromium de larga vida.
+
+    Mantiene un único navegador con varios contextos abiertos y presta páginas
+    mediante page(). Cada contexto cuenta las navegaciones de sus páginas y el
+    heap JS observado; al superar CONTEXT_MAX_NAVIGATIONS o CONTEXT_MAX_HEAP_MB
+    deja de recibir préstamos y se reemplaza por uno nuevo cuando su última
+    página se devuelve.
+
+    Mientras el pool está abierto, un watchdog revisa cada
+    WATCHDOG_INTERVAL_S segundos la antigüedad de cada préstamo y la memoria
+    de los procesos del navegador:
+    - cierra las páginas prestadas hace más de PAGE_MAX_LEASE_S (la operación
+      pendiente del worker falla y su política de reintentos decide)
+    - tras BROWSER_MAX_NAVIGATIONS navegaciones o BROWSER_MAX_RSS_MB de RSS
+      lanza un Chromium nuevo para los préstamos siguientes y cierra el
+      anterior cuando se devuelve su última página
+
+    Example:
+        pool = get_browser_pool()
+        async with pool.page() as page:
+            await page.goto("https://example.com")
+        await close_browser_pool()
+    """
+
+    def __init__(self, contexts: int = POOL_CONTEXTS,
+                 pages_per_context: int = POOL_PAGES_PER_CONTEXT,
+                 max_navigations: int = CONTEXT_MAX_NAVIGATIONS,
+                 max_heap_mb: float = CONTEXT_MAX_HEAP_MB,
+                 max_lease_s: float = PAGE_MAX_LEASE_S,
+                 browser_max_navigations: int = BROWSER_MAX_NAVIGATIONS,
+                 browser_max_rss_mb: float = BROWSER_MAX_RSS_MB):
+        self.contexts = max(1, contexts)
+        self.pages_per_context = max(1, pages_per_context)
+        self.max_navigations = max_navigations
+        self.max_heap_mb = max_heap_mb
+        self.max_lease_s = max_lease_s
+        self.browser_max_navigations = browser_max_navigations
+        self.browser_max_rss_mb = browser_max_rss_mb
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._slots: List[_ContextSlot] = []
+        self._draining: List[_ContextSlot] = []
+        self._leases: Set[_Lease] = set()
+        self._watchdog: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._sem = asyncio.Semaphore(self.contexts * self.pages_per_context)
+        self.loop = asyncio.get_running_loop()
+        self.leases = 0
+        self.recycled = 0
+        self.browser_navigations = 0
+        self.hung_closed = 0
+        self.restarts: Counter = Counter()
+        self.peak_rss_mb = 0.0
+
+    async def start(self) -> None:
+        """Lanza el navegador y crea los contextos si aún no existen."""
+        async with self._lock:
+            if self._browser is not None:
+                return
+            self._playwright = await async_playwright().start()
+            await self._launch()
+            self._watchdog = asyncio.create_task(self._watch())
+
+    async def _launch(self) -> None:
+        """Lanza un Chromium nuevo con sus contextos (llamar con el lock tomado)."""
+        self._browser = await self._playwright.chromium.launch(headless=HEADLESS)
+        self._slots = [_ContextSlot(await self._new_context(), self._browser)
+                       for _ in range(self.contexts)]
+        self.browser_navigations = 0
+
+    async def _new_context(self) -> BrowserContext:
+        """Crea un contexto con la configuración común y la política de interceptación."""
+        ctx = await self._browser.new_context(user_agent=USER_AGENT)
+        await get_interception_policy().install(ctx)
+        if get_recorder() is not None:
+            ctx.on("response", record_browser_response)
+        return ctx
+
+    def _pick_slot(self) -> _ContextSlot:
+        """Elige el contexto vigente con menos páginas prestadas."""
+        candidates = [s for s in self._slots if not s.retiring] or self._slots
+        return min(candidates, key=lambda s: s.active)
+
+    async def _recycle(self, slot: _ContextSlot) -> None:
+        """Cierra el contexto agotado y lo reemplaza por uno nuevo."""
+        async with self._lock:
+            if (not slot.retiring or slot.active > 0 or self._browser is None
+                    or slot not in self._slots):
+                return
+            old = slot.ctx
+            slot.ctx = await self._new_context()
+            slot.navigations = 0
+            slot.heap_mb = 0.0
+            slot.retiring = False
+            self.recycled += 1
+        try:
+            await old.close()
+        except Exception:
+            pass
+
+    async def _restart_browser(self, reason: str, detail: str) -> None:
+        """
+        Reemplaza el navegador por uno nuevo sin interrumpir los préstamos.
+
+        Los contextos del navegador anterior dejan de recibir préstamos y se
+        cierran, junto con el navegador, al devolverse su última página.
+
+        Args:
+            reason: Motivo del reinicio ("navegaciones" o "memoria"), agrupado
+                    en el resumen de la corrida
+            detail: Medición que lo disparó, para el mensaje en consola
+        """
+        async with self._lock:
+            if self._browser is None:
+                return
+            old = self._slots
+            await self._launch()
+            for slot in old:
+                slot.retiring = True
+            self._draining.extend(old)
+            self.restarts[reason] += 1
+        print(f"↺ Reiniciando navegador por {reason} ({detail}); el anterior se cierra al "
+              f"devolverse sus {sum(s.active for s in old)} páginas prestadas")
+        await self._close_drained()
+
+    async def _close_drained(self) -> None:
+        """Cierra los contextos y navegadores anteriores que ya no tienen páginas prestadas."""
+        idle = [s for s in self._draining if s.active == 0]
+        self._draining = [s for s in self._draining if s.active > 0]
+        for slot in idle:
+            try:
+                await slot.ctx.close()
+            except Exception:
+                pass
+        live = {id(s.browser) for s in self._draining} | {id(self._browser)}
+        for browser in {id(s.browser): s.browser for s in idle}.values():
+            if id(browser) not in live:
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+
+    async def _watch(self) -> None:
+        """Tarea del watchdog: revisa préstamos y memoria periódicamente."""
+        while True:
+            await asyncio.sleep(WATCHDOG_INTERVAL_S)
+            try:
+                await self._watchdog_tick()
+            except Exception as e:
+                print(f"⚠ Watchdog del navegador: {type(e).__name__}: {e}")
+
+    async def _watchdog_tick(self) -> None:
+        """Cierra las páginas colgadas y reinicia el navegador si excede sus límites."""
+        now = time.monotonic()
+        for lease in list(self._leases):
+            age = now - lease.started
+            if lease.killed or not lease.max_lease_s or age <= lease.max_lease_s:
+                continue
+            lease.killed = True
+            self.hung_closed += 1
+            print(f"⚠ Página colgada tras {age:.0f}s en {lease.page.url}; se cierra")
+            try:
+                await asyncio.wait_for(lease.page.close(), timeout=10)
+            except Exception:
+                pass
+
+        rss = await asyncio.to_thread(_browser_rss_mb)
+        if rss is not None:
+            self.peak_rss_mb = max(self.peak_rss_mb, rss)
+        if self._draining:
+            return  # el reinicio anterior aún no termina; su memoria cuenta en el RSS
+        if self.browser_max_navigations and self.browser_navigations >= self.browser_max_navigations:
+            await self._restart_browser("navegaciones", str(self.browser_navigations))
+        elif rss is not None and self.browser_max_rss_mb and rss >= self.browser_max_rss_mb:
+            await self._restart_browser("memoria", f"{rss:.0f} MB de RSS")
+
+    @asynccontextmanager
+    async def page(self, max_lease_s: Optional[float] = -1) -> AsyncGenerator[Page, None]:
+        """
+        Presta una página nueva de uno de los contextos del pool.
+
+        La página se cierra al salir del bloque. El número de páginas
+        simultáneas está acotado por contexts * pages_per_context.
+
+        Args:
+            max_lease_s: Segundos tras los que el watchdog cierra la página
+                         por colgada (-1: PAGE_MAX_LEASE_S; None: sin límite,
+                         para préstamos largos como la carga del directorio)
+
+        Yields:
+            Page: Página de Playwright lista para navegar
+        """
+        await self.start()
+        async with self._sem:
+            slot = self._pick_slot()
+            slot.active += 1
+            self.leases += 1
+            page = None
+            lease = None
+            try:
+                page = await slot.ctx.new_page()
+                lease = _Lease(page, self.max_lease_s if max_lease_s == -1 else max_lease_s)
+                self._leases.add(lease)
+
+                def _on_nav(frame, _page=page, _slot=slot):
+                    if frame == _page.main_frame:
+                        _slot.navigations += 1
+                        if _slot.browser is self._browser:
+                            self.browser_navigations += 1
+
+                page.on("framenavigated", _on_nav)
+                yield page
+            finally:
+                self._leases.discard(lease)
+                if page is not None and not (lease and lease.killed):
+                    try:
+                        heap = await page.evaluate(_HEAP_JS)
+                        slot.heap_mb = max(slot.heap_mb, heap / (1024 * 1024))
+                    except Exception:
+                        pass
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                slot.active -= 1
+                if slot in self._draining:
+                    await self._close_drained()
+                else:
+                    if (slot.navigations >= self.max_navigations
+                            or slot.heap_mb >= self.max_heap_mb):
+                        slot.retiring = True
+                    if slot.retiring and slot.active == 0:
+                        await self._recycle(slot)
+
+    def summary_lines(self) -> List[str]:
+        """Líneas de resumen del watchdog para el reporte de la corrida."""
+        lines = []
+        if self.hung_closed:
+            lines.append(f"  Navegador: {self.hung_closed} páginas colgadas cerradas por el watchdog")
+        for reason, n in self.restarts.most_common():
+            lines.append(f"  Navegador reiniciado por {reason}: {n} veces")
+        if self.recycled:
+            lines.append(f"  Contextos de navegador reciclados: {self.recycled}")
+        if self.peak_rss_mb:
+            lines.append(f"  RSS máximo del navegador: {self.peak_rss_mb:.0f} MB")
+        return lines
+
+    async def close(self) -> None:
+        """Cierra todos los contextos, el navegador y el driver de Playwright."""
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+            self._watchdog = None
+        async with self._lock:
+            for slot in self._slots + self._draining:
+                try:
+                    await slot.ctx.close()
+                except Exception:
+                    pass
+            for browser in {id(s.browser): s.browser for s in self._draining}.values():
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+            self._slots = []
+            self._draining = []
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception:
+                    pass
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+# Pool global (singleton por event loop)
+_browser_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """
+    Obtiene el pool de navegador del proceso (singleton).
+
+    Debe llamarse dentro de un event loop. Si el pool existente pertenece a
+    un loop anterior (por ejemplo, otra llamada a asyncio.run), se crea uno nuevo.
+
+    Returns:
+        BrowserPool: Pool compartido por todos los scrapers
+    """
+    global _browser_pool
+    if _browser_pool is None or _browser_pool.loop is not asyncio.get_running_loop():
+        _browser_pool = BrowserPool()
+    return _browser_pool
+
+
+async def close_browser_pool() -> None:
+    """Cierra el pool de navegador del proceso si está abierto."""
+    global _browser_pool
+    if _browser_pool is not None:
+        await _browser_pool.close()
+        _browser_pool = None
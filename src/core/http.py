@@ -0,0 +1,77 @@
+"""
+Módulo para gestionar el cliente HTTP asíncrono compartido.
+
+Proporciona un cliente httpx de larga vida con keep-alive y HTTP/2 (si el
+paquete h2 está instalado), usado para descargar páginas renderizadas en el
+servidor sin necesidad de lanzar un navegador.
+
+Configuración por variables de entorno:
+    HTTP_TIMEOUT_S: Timeout total por petición en segundos (default: 30)
+    HTTP_MAX_CONNECTIONS: Conexiones simultáneas máximas (default: 20)
+    HTTP2: Habilita HTTP/2 cuando está disponible (default: true)
+"""
+import asyncio
+from os import getenv
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from .browser import USER_AGENT
+from .replay import get_recorder, record_httpx_response
+
+load_dotenv()
+HTTP_TIMEOUT_S = float(getenv("HTTP_TIMEOUT_S", "30"))
+HTTP_MAX_CONNECTIONS = int(getenv("HTTP_MAX_CONNECTIONS", "20"))
+
+try:
+    import h2  # noqa: F401
+    HTTP2 = (getenv("HTTP2", "true").lower() == "true")
+except ImportError:
+    HTTP2 = False
+
+# Cliente HTTP global (singleton por event loop)
+_http_client: Optional[httpx.AsyncClient] = None
+_http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Obtiene el cliente HTTP del proceso (singleton).
+
+    El cliente mantiene un pool de conexiones keep-alive por host. Si el
+    cliente existente pertenece a un event loop anterior, se crea uno nuevo.
+
+    Returns:
+        httpx.AsyncClient: Cliente compartido por todos los scrapers
+    """
+    global _http_client, _http_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            http2=HTTP2,
+            timeout=HTTP_TIMEOUT_S,
+            follow_redirects=True,
+            headers={
+                "User-Agent": USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml",
+                "Accept-Language": "es-MX,es;q=0.9",
+            },
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=60,
+            ),
+            event_hooks={"response": [record_httpx_response]} if get_recorder() else None,
+        )
+        _http_loop = loop
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Cierra el cliente HTTP del proceso si está abierto."""
+    global _http_client, _http_loop
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        _http_loop = None
@@ -0,0 +1,178 @@
+"""
+Módulo para interceptar peticiones del navegador y bloquear recursos innecesarios.
+
+El scraper solo necesita el documento HTML y los scripts propios del sitio
+(la búsqueda de MisProfesores y el directorio UAM son aplicaciones JS). Las
+imágenes, fuentes, hojas de estilo, medios y los dominios de publicidad y
+analítica se abortan antes de descargarse.
+
+Configuración por variables de entorno:
+    BLOCK_REQUESTS: Habilita la interceptación (default: true)
+    BLOCK_RESOURCE_TYPES: Tipos de recurso a abortar, separados por coma
+    BLOCK_DOMAINS: Dominios adicionales a abortar, separados por coma
+"""
+from collections import Counter
+from os import getenv
+from typing import List, Optional
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+BLOCK_REQUESTS = (getenv("BLOCK_REQUESTS", "true").lower() == "true")
+
+DEFAULT_BLOCKED_TYPES = "image,font,stylesheet,media"
+
+# Dominios de publicidad y analítica conocidos
+DEFAULT_BLOCKED_DOMAINS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "adservice.google.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "amazon-adsystem.com",
+    "adnxs.com",
+    "criteo.com",
+    "criteo.net",
+    "taboola.com",
+    "outbrain.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "facebook.net",
+    "hotjar.com",
+    "pubmatic.com",
+    "rubiconproject.com",
+    "moatads.com",
+)
+
+# Tamaño típico (bytes) de cada tipo de recurso bloqueado. La petición se aborta
+# antes de recibir respuesta, así que no hay Content-Length que medir: el ahorro
+# en bytes es solo una estimación
+_BYTES_ESTIMATE = {
+    "image": 40_000,
+    "font": 45_000,
+    "stylesheet": 30_000,
+    "media": 250_000,
+    "script": 35_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+}
+_BYTES_ESTIMATE_DEFAULT = 10_000
+
+
+def _csv(value: str) -> List[str]:
+    """Convierte una lista separada por comas en lista de strings no vacíos."""
+    return [v.strip().lower() for v in value.split(",") if v.strip()]
+
+
+class InterceptionStats:
+    """Contadores de peticiones bloqueadas y permitidas durante una corrida."""
+
+    def __init__(self):
+        self.allowed = 0
+        self.blocked_by_type: Counter = Counter()
+        self.blocked_by_domain: Counter = Counter()
+        self.bytes_saved_estimate = 0
+
+    @property
+    def blocked(self) -> int:
+        """Total de peticiones abortadas."""
+        return sum(self.blocked_by_type.values())
+
+    def record_blocked(self, resource_type: str, host: str, by_domain: bool) -> None:
+        """Registra una petición abortada y su ahorro estimado."""
+        self.blocked_by_type[resource_type] += 1
+        if by_domain:
+            self.blocked_by_domain[host] += 1
+        self.bytes_saved_estimate += _BYTES_ESTIMATE.get(resource_type, _BYTES_ESTIMATE_DEFAULT)
+
+    def summary_lines(self) -> List[str]:
+        """
+        Genera el reporte de ahorro de la corrida.
+
+        Returns:
+            Lista de líneas de texto listas para imprimir
+        """
+        total = self.allowed + self.blocked
+        pct = (self.blocked / total * 100) if total else 0.0
+        lines = [
+            f"Peticiones del navegador: {total} "
+            f"(bloqueadas {self.blocked}, {pct:.0f}%)",
+            f"Ahorro estimado: ~{self.bytes_saved_estimate / (1024 * 1024):.1f} MB "
+            f"(tamaño típico por tipo de recurso, no medido)",
+        ]
+        for rtype, n in self.blocked_by_type.most_common():
+            lines.append(f"  - {rtype}: {n}")
+        for host, n in self.blocked_by_domain.most_common(5):
+            lines.append(f"  - dominio {host}: {n}")
+        return lines
+
+
+class InterceptionPolicy:
+    """
+    Política de interceptación de peticiones para contextos de Playwright.
+
+    Example:
+        policy = get_interception_policy()
+        await policy.install(ctx)
+    """
+
+    def __init__(self, enabled: bool = BLOCK_REQUESTS,
+                 blocked_types: Optional[List[str]] = None,
+                 blocked_domains: Optional[List[str]] = None):
+        self.enabled = enabled
+        self.blocked_types = set(
+            blocked_types if blocked_types is not None
+            else _csv(getenv("BLOCK_RESOURCE_TYPES", DEFAULT_BLOCKED_TYPES))
+        )
+        self.blocked_domains = tuple(
+            blocked_domains if blocked_domains is not None
+            else list(DEFAULT_BLOCKED_DOMAINS) + _csv(getenv("BLOCK_DOMAINS", ""))
+        )
+        self.stats = InterceptionStats()
+
+    def _blocked_domain(self, host: str) -> bool:
+        """Indica si el host pertenece a un dominio bloqueado."""
+        return any(host == d or host.endswith("." + d) for d in self.blocked_domains)
+
+    async def _handle(self, route) -> None:
+        """Aborta o deja pasar una petición según la política."""
+        request = route.request
+        rtype = request.resource_type
+        host = urlparse(request.url).hostname or ""
+        by_domain = self._blocked_domain(host)
+        if by_domain or (rtype in self.blocked_types and rtype != "document"):
+            self.stats.record_blocked(rtype, host, by_domain)
+            await route.abort()
+            return
+        self.stats.allowed += 1
+        await route.continue_()
+
+    async def install(self, ctx) -> None:
+        """
+        Instala la política en un contexto de navegador.
+
+        Args:
+            ctx: BrowserContext de Playwright
+        """
+        if self.enabled:
+            await ctx.route("**/*", self._handle)
+
+
+# Política global (singleton)
+_policy: Optional[InterceptionPolicy] = None
+
+
+def get_interception_policy() -> InterceptionPolicy:
+    """
+    Obtiene la política de interceptación del proceso (singleton).
+
+    Returns:
+        InterceptionPolicy: Política compartida por todos los contextos
+    """
+    global _policy
+    if _policy is None:
+        _policy = InterceptionPolicy()
+    return _policy
@@ -0,0 +1,261 @@
+"""
+Bitácora de corridas de scrape-all para poder reanudarlas.
+
+Cada corrida escribe un archivo JSONL de solo escritura al final en
+data/outputs/runs/<run_id>.jsonl. Cada línea registra un evento:
+    {"run_id": "20251110-120000", "professor": "Josue Padilla Cuevas",
+     "stage": "scrape", "outcome": "scrapeado", "timestamp": "2025-11-10T12:00:03"}
+
+Cada evento se escribe al momento, por lo que la bitácora sobrevive a una
+interrupción del proceso (Ctrl+C, kill) y `scrape-all --resume` puede omitir a
+los profesores que ya terminaron en la corrida interrumpida. La sincronización
+a disco (fsync) se agrupa cada JOURNAL_SYNC_INTERVAL_S segundos y corre en un
+hilo aparte para no bloquear el event loop; ante una caída de la máquina se
+pierden a lo más los eventos de ese intervalo.
+"""
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from os import getenv
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Set
+
+from dotenv import load_dotenv
+
+# ============================================================================
+# CONFIGURACIÓN
+# ============================================================================
+
+load_dotenv()
+RUNS_DIR = Path("data/outputs/runs")
+# Segundos entre sincronizaciones a disco de la bitácora (0: en cada evento)
+SYNC_INTERVAL_S = float(getenv("JOURNAL_SYNC_INTERVAL_S", "2"))
+
+# Resultados que marcan a un profesor como terminado dentro de una corrida
+FINISHED_OUTCOMES = ("scrapeado", "cache")
+
+
+class RunJournal:
+    """
+    Bitácora append-only de una corrida de scrape-all.
+
+    Example:
+        journal = RunJournal.open()                   # corrida nueva
+        journal = RunJournal.open(resume="latest")    # reanuda la última
+        journal.record("Nombre", "scrape", "scrapeado", reviews=12)
+        terminados = journal.finished()
+        await journal.aclose()                        # sincroniza a disco
+    """
+
+    def __init__(self, run_id: str, runs_dir: Path = RUNS_DIR):
+        self.run_id = run_id
+        self.path = runs_dir / f"{run_id}.jsonl"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._terminate_partial_line()
+        self._file: Optional[IO[str]] = None
+        self._dirty = False
+        self._last_sync = time.monotonic()
+        self._sync_task: Optional["asyncio.Future[None]"] = None
+
+    def _terminate_partial_line(self) -> None:
+        """Cierra con salto de línea un último evento truncado por una interrupción."""
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+        with self.path.open("rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write("\n")
+
+    @staticmethod
+    def new_run_id() -> str:
+        """Genera un identificador de corrida basado en la fecha y hora actual."""
+        return datetime.now().strftime("%Y%m%d-%H%M%S")
+
+    @staticmethod
+    def latest_run_id(runs_dir: Path = RUNS_DIR) -> Optional[str]:
+        """
+        Obtiene el identificador de la corrida más reciente.
+
+        Args:
+            runs_dir: Directorio de bitácoras
+
+        Returns:
+            run_id de la bitácora modificada más recientemente, o None
+        """
+        runs = sorted(runs_dir.glob("*.jsonl"), key=lambda p: p.stat().st_mtime)
+        return runs[-1].stem if runs else None
+
+    @classmethod
+    def open(cls, resume: Optional[str] = None, runs_dir: Path = RUNS_DIR) -> "RunJournal":
+        """
+        Abre la bitácora de una corrida nueva o de una corrida a reanudar.
+
+        Args:
+            resume: None para una corrida nueva, "latest" para la más reciente
+                    o el run_id de la corrida a reanudar
+
+        Returns:
+            RunJournal: Bitácora lista para registrar eventos
+
+        Raises:
+            FileNotFoundError: Si no existe la corrida a reanudar
+        """
+        if resume is None:
+            return cls(cls.new_run_id(), runs_dir)
+
+        run_id = cls.latest_run_id(runs_dir) if resume == "latest" else resume
+        if run_id is None or not (runs_dir / f"{run_id}.jsonl").exists():
+            raise FileNotFoundError(f"No existe la corrida a reanudar: {resume}")
+        return cls(run_id, runs_dir)
+
+    def record(self, professor: str, stage: str, outcome: str, **extra: Any) -> None:
+        """
+        Agrega un evento a la bitácora.
+
+        El evento se escribe al sistema operativo de inmediato; la
+        sincronización a disco se agrupa (ver _maybe_sync).
+
+        Args:
+            professor: Nombre del profesor
+            stage: Etapa del pipeline (p. ej. "scrape")
+            outcome: Resultado ("inicio", "scrapeado", "cache", "error")
+            **extra: Campos adicionales del evento
+        """
+        event = {
+            "run_id": self.run_id,
+            "professor": professor,
+            "stage": stage,
+            "outcome": outcome,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            **extra,
+        }
+        if self._file is None:
+            self._file = self.path.open("a", encoding="utf-8")
+        self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._dirty = True
+        self._maybe_sync()
+
+    def _maybe_sync(self) -> None:
+        """
+        Sincroniza a disco si pasó SYNC_INTERVAL_S desde la última vez.
+
+        Dentro de un event loop el fsync corre en un hilo (uno a la vez) para
+        no bloquear a los workers; fuera de él se hace en línea.
+        """
+        if time.monotonic() - self._last_sync < SYNC_INTERVAL_S:
+            return
+        if self._sync_task is not None and not self._sync_task.done():
+            return
+        self._dirty = False
+        self._last_sync = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            os.fsync(self._file.fileno())
+            return
+        self._sync_task = loop.run_in_executor(None, os.fsync, self._file.fileno())
+
+    def close(self) -> None:
+        """Sincroniza a disco los eventos pendientes y cierra el archivo."""
+        if self._file is None:
+            return
+        if self._dirty:
+            os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        self._dirty = False
+
+    async def aclose(self) -> None:
+        """Como close, pero espera el fsync en curso y sincroniza en un hilo."""
+        if self._sync_task is not None:
+            await self._sync_task
+            self._sync_task = None
+        await asyncio.to_thread(self.close)
+
+    def events(self) -> Iterator[Dict[str, Any]]:
+        """
+        Itera los eventos registrados, ignorando una última línea truncada.
+
+        Yields:
+            Dict con los campos de cada evento
+        """
+        if not self.path.exists():
+            return
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def finished(self) -> Set[str]:
+        """
+        Profesores cuyo último evento es un resultado terminal exitoso.
+
+        Returns:
+            Conjunto de nombres de profesores ya terminados en esta corrida
+        """
+        last: Dict[str, str] = {}
+        for event in self.events():
+            last[event["professor"]] = event["outcome"]
+        return {name for name, outcome in last.items() if outcome in FINISHED_OUTCOMES}
+
+    def pending(self, names: List[str]) -> List[str]:
+        """
+        Filtra los nombres que aún no terminaron en esta corrida.
+
+        Args:
+            names: Lista completa de profesores de la corrida
+
+        Returns:
+            Lista de nombres pendientes, en el mismo orden
+        """
+        done = self.finished()
+        return [n for n in names if n not in done]
+
+
+def recent_events(days: int, runs_dir: Path = RUNS_DIR) -> Iterator[Dict[str, Any]]:
+    """
+    Itera los eventos de todas las corridas de los últimos días.
+
+    Args:
+        days: Antigüedad máxima de los eventos a considerar
+        runs_dir: Directorio de bitácoras
+
+    Yields:
+        Dict con los campos de cada evento, en orden cronológico por corrida
+    """
+    since = datetime.now() - timedelta(days=days)
+    for path in sorted(runs_dir.glob("*.jsonl"), key=lambda p: p.stat().st_mtime):
+        if datetime.fromtimestamp(path.stat().st_mtime) < since:
+            continue
+        for event in RunJournal(path.stem, runs_dir).events():
+            try:
+                if datetime.fromisoformat(event["timestamp"]) < since:
+                    continue
+            except (KeyError, ValueError):
+                continue
+            yield event
+
+
+def recent_failures(days: int = 14, runs_dir: Path = RUNS_DIR) -> Counter:
+    """
+    Cuenta los errores por profesor registrados en las corridas recientes.
+
+    Args:
+        days: Antigüedad máxima de los eventos a considerar
+        runs_dir: Directorio de bitácoras
+
+    Returns:
+        Counter nombre del profesor → número de errores
+    """
+    return Counter(
+        event["professor"] for event in recent_events(days, runs_dir)
+        if event.get("outcome") == "error"
+    )
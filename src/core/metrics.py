@@ -0,0 +1,169 @@
+"""
+Temporizadores por etapa del pipeline de scraping.
+
+Cada worker abre un registro de tiempos por profesor (start_timings) y las
+etapas de find_and_scrape y guardar_profesor_completo suman sus milisegundos
+con `with stage("nombre"):`. El registro vive en una ContextVar, así que los
+workers concurrentes no se mezclan y las subtareas (páginas de reseñas en
+paralelo) suman al registro del profesor que las lanzó.
+
+Etapas del flujo:
+    url_lookup, search, probe, fetch_reviews, parse, archive, json,
+    db_probe, persist
+Etapas de red y de BD, anidadas dentro de las anteriores:
+    http, navigation, selector_wait, db_postgres, db_mongo
+
+Las páginas descargadas en paralelo suman sus tiempos, por lo que una etapa
+puede superar la duración real del profesor.
+
+Los tiempos se guardan por corrida en la bitácora (campo stages_ms de cada
+evento, ver core.journal) y se exportan en formato de texto de Prometheus.
+
+Configuración por variables de entorno:
+    METRICS_PROM_FILE: Archivo de métricas Prometheus
+                       (default: data/outputs/metrics/scrape.prom)
+"""
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os import getenv
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from dotenv import load_dotenv
+
+from .journal import RunJournal
+
+load_dotenv()
+METRICS_PROM_FILE = Path(getenv("METRICS_PROM_FILE", "data/outputs/metrics/scrape.prom"))
+
+# Cuantiles reportados por scrape-report y en el archivo Prometheus
+QUANTILES = (0.5, 0.95)
+
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+
+def start_timings() -> Dict[str, float]:
+    """
+    Inicia el registro de tiempos del profesor en curso.
+
+    Returns:
+        Dict etapa → milisegundos acumulados, que las etapas irán llenando
+    """
+    timings: Dict[str, float] = {}
+    _timings.set(timings)
+    return timings
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Mide una etapa y suma su duración en milisegundos al registro en curso.
+
+    Sin registro abierto (p. ej. el comando prof) no registra nada.
+
+    Args:
+        name: Nombre de la etapa
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = _timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + (time.perf_counter() - inicio) * 1000
+
+
+def rounded(timings: Dict[str, float]) -> Dict[str, float]:
+    """Redondea un registro de tiempos a décimas de milisegundo para la bitácora."""
+    return {name: round(ms, 1) for name, ms in timings.items()}
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Percentil con interpolación lineal.
+
+    Args:
+        values: Valores ordenados de menor a mayor
+        q: Cuantil entre 0 y 1
+
+    Returns:
+        Valor del percentil (0.0 si no hay valores)
+    """
+    if not values:
+        return 0.0
+    pos = (len(values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+def run_samples(journal: RunJournal) -> Dict[str, List[float]]:
+    """
+    Reúne los tiempos por etapa de una corrida desde su bitácora.
+
+    Además de las etapas, incluye 'total' con la duración de cada profesor.
+
+    Args:
+        journal: Bitácora de la corrida
+
+    Returns:
+        Dict etapa → milisegundos por profesor, ordenados de menor a mayor
+    """
+    samples: Dict[str, List[float]] = {}
+    for event in journal.events():
+        for name, ms in (event.get("stages_ms") or {}).items():
+            samples.setdefault(name, []).append(float(ms))
+        if event.get("duration_s") is not None:
+            samples.setdefault("total", []).append(float(event["duration_s"]) * 1000)
+    return {name: sorted(values) for name, values in samples.items()}
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def export_prometheus(journal: RunJournal, path: Path = METRICS_PROM_FILE) -> Path:
+    """
+    Escribe las métricas de una corrida en formato de texto de Prometheus.
+
+    El archivo se reemplaza de forma atómica, de modo que puede leerlo el
+    textfile collector de node_exporter.
+
+    Args:
+        journal: Bitácora de la corrida
+        path: Archivo de salida
+
+    Returns:
+        Path del archivo escrito
+    """
+    samples = run_samples(journal)
+    outcomes = Counter(e.get("outcome") for e in journal.events()
+                       if e.get("stage") == "scrape" and e.get("outcome") != "inicio")
+
+    lines = [
+        "# HELP scrape_stage_duration_ms Duración por profesor de cada etapa del scraping",
+        "# TYPE scrape_stage_duration_ms summary",
+    ]
+    for name, values in sorted(samples.items()):
+        for q in QUANTILES:
+            labels = _labels(run_id=journal.run_id, stage=name, quantile=str(q))
+            lines.append(f"scrape_stage_duration_ms{labels} {percentile(values, q):.1f}")
+        labels = _labels(run_id=journal.run_id, stage=name)
+        lines.append(f"scrape_stage_duration_ms_sum{labels} {sum(values):.1f}")
+        lines.append(f"scrape_stage_duration_ms_count{labels} {len(values)}")
+
+    lines += [
+        "# HELP scrape_professors_total Profesores procesados por resultado",
+        "# TYPE scrape_professors_total counter",
+    ]
+    for outcome, n in sorted(outcomes.items()):
+        lines.append(f"scrape_professors_total{_labels(run_id=journal.run_id, outcome=outcome)} {n}")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,199 @@
+"""
+Módulo para limitar la tasa de peticiones por host.
+
+Proporciona un limitador asíncrono compartido por todo el proceso, de modo que
+varios workers concurrentes consuman un único presupuesto de peticiones por
+host en lugar de que cada uno aplique sus propias pausas.
+
+Cada host tiene un token bucket cuya tasa se ajusta con AIMD (additive
+increase, multiplicative decrease):
+- Respuesta correcta con latencia bajo el objetivo: la tasa sube RATE_INCREASE_RPS
+- Latencia sobre el objetivo: la tasa baja a RATE_SLOW_FACTOR veces la actual
+- Timeout, 429 o 5xx: la tasa baja a RATE_BACKOFF_FACTOR veces la actual
+  (y un 429 con Retry-After pausa el host el tiempo indicado)
+
+Configuración por variables de entorno:
+    RATE_INITIAL_RPS: Tasa inicial por host en peticiones/segundo (default: 1.0)
+    RATE_MIN_RPS / RATE_MAX_RPS: Límites de la tasa (default: 0.2 / 6.0)
+    RATE_BURST: Peticiones que pueden emitirse en ráfaga (default: 2)
+    RATE_TARGET_LATENCY_MS: Latencia objetivo (default: 2500)
+"""
+import asyncio
+from os import getenv
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+RATE_INITIAL_RPS = float(getenv("RATE_INITIAL_RPS", "1.0"))
+RATE_MIN_RPS = float(getenv("RATE_MIN_RPS", "0.2"))
+RATE_MAX_RPS = float(getenv("RATE_MAX_RPS", "6.0"))
+RATE_BURST = float(getenv("RATE_BURST", "2"))
+RATE_TARGET_LATENCY_MS = float(getenv("RATE_TARGET_LATENCY_MS", "2500"))
+RATE_INCREASE_RPS = float(getenv("RATE_INCREASE_RPS", "0.1"))
+RATE_SLOW_FACTOR = float(getenv("RATE_SLOW_FACTOR", "0.85"))
+RATE_BACKOFF_FACTOR = float(getenv("RATE_BACKOFF_FACTOR", "0.5"))
+
+
+class _HostBucket:
+    """Token bucket de un host con su tasa actual y contadores."""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+        self.blocked_until = 0.0
+        self.lock = asyncio.Lock()
+        self.requests = 0
+        self.waited_s = 0.0
+        self.backoffs = 0
+        self.min_rate_seen = rate
+
+    def refill(self, now: float) -> None:
+        """Repone tokens según el tiempo transcurrido y la tasa actual."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class HostRateLimiter:
+    """
+    Limitador adaptativo de peticiones por host compartido entre corrutinas.
+
+    acquire() espera a que haya un token disponible para el host de la URL;
+    record() informa el resultado de la petición para ajustar la tasa.
+
+    Example:
+        limiter = get_rate_limiter()
+        await limiter.acquire(url)
+        response = await client.get(url)
+        limiter.record(url, latency_s, status=response.status_code)
+    """
+
+    def __init__(self, initial_rps: float = RATE_INITIAL_RPS,
+                 min_rps: float = RATE_MIN_RPS, max_rps: float = RATE_MAX_RPS,
+                 burst: float = RATE_BURST,
+                 target_latency_ms: float = RATE_TARGET_LATENCY_MS):
+        self.initial_rps = initial_rps
+        self.min_rps = min_rps
+        self.max_rps = max(min_rps, max_rps)
+        self.burst = max(1.0, burst)
+        self.target_latency_s = target_latency_ms / 1000
+        self._buckets: Dict[str, _HostBucket] = {}
+        self.events: List[str] = []
+
+    @staticmethod
+    def _host(url: str) -> str:
+        """Extrae el host de una URL (o la devuelve tal cual si ya es un host)."""
+        return urlparse(url).netloc or url
+
+    def _bucket(self, host: str) -> _HostBucket:
+        """Obtiene (o crea) el bucket del host."""
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            now = asyncio.get_running_loop().time()
+            bucket = _HostBucket(self.initial_rps, self.burst, now)
+            self._buckets[host] = bucket
+        return bucket
+
+    @property
+    def requests(self) -> Dict[str, int]:
+        """Peticiones emitidas por host."""
+        return {h: b.requests for h, b in self._buckets.items()}
+
+    @property
+    def waited_s(self) -> Dict[str, float]:
+        """Segundos de espera acumulados por host."""
+        return {h: b.waited_s for h, b in self._buckets.items()}
+
+    async def acquire(self, url: str) -> None:
+        """
+        Espera hasta que haya un token disponible para el host de la URL.
+
+        Args:
+            url: URL (o host) al que se va a realizar la petición
+        """
+        bucket = self._bucket(self._host(url))
+        async with bucket.lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                bucket.refill(now)
+                wait = max(bucket.blocked_until - now,
+                           (1 - bucket.tokens) / bucket.rate if bucket.tokens < 1 else 0.0)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+                bucket.waited_s += wait
+            bucket.tokens -= 1
+            bucket.requests += 1
+
+    def record(self, url: str, latency_s: float, status: Optional[int] = None,
+               timeout: bool = False, retry_after_s: Optional[float] = None) -> None:
+        """
+        Ajusta la tasa del host según el resultado de una petición (AIMD).
+
+        Args:
+            url: URL (o host) de la petición
+            latency_s: Latencia observada en segundos
+            status: Código HTTP de la respuesta (None si no hubo respuesta)
+            timeout: True si la petición expiró
+            retry_after_s: Segundos indicados por Retry-After en un 429
+        """
+        host = self._host(url)
+        bucket = self._bucket(host)
+        old = bucket.rate
+
+        if timeout or status == 429 or (status is not None and status >= 500):
+            bucket.rate = max(self.min_rps, bucket.rate * RATE_BACKOFF_FACTOR)
+            bucket.tokens = min(bucket.tokens, 0.0)
+            if retry_after_s:
+                now = asyncio.get_running_loop().time()
+                bucket.blocked_until = max(bucket.blocked_until, now + retry_after_s)
+            bucket.backoffs += 1
+            reason = "timeout" if timeout else str(status)
+            msg = f"⚠ Backoff en {host} ({reason}): {old:.2f} → {bucket.rate:.2f} req/s"
+            if retry_after_s:
+                msg += f", pausa {retry_after_s:.1f}s"
+            self.events.append(msg)
+            print(msg)
+        elif latency_s > self.target_latency_s:
+            bucket.rate = max(self.min_rps, bucket.rate * RATE_SLOW_FACTOR)
+        else:
+            bucket.rate = min(self.max_rps, bucket.rate + RATE_INCREASE_RPS)
+
+        bucket.min_rate_seen = min(bucket.min_rate_seen, bucket.rate)
+
+    def summary_lines(self) -> List[str]:
+        """
+        Genera el resumen por host de la corrida.
+
+        Returns:
+            Lista de líneas de texto listas para imprimir
+        """
+        lines = []
+        for host, b in sorted(self._buckets.items()):
+            lines.append(
+                f"Peticiones a {host}: {b.requests} "
+                f"(tasa actual {b.rate:.2f} req/s, mínima {b.min_rate_seen:.2f}, "
+                f"backoffs {b.backoffs}, espera acumulada {b.waited_s:.1f}s)"
+            )
+        return lines
+
+
+# Limitador global (singleton)
+_rate_limiter: Optional[HostRateLimiter] = None
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """
+    Obtiene el limitador de peticiones del proceso (singleton).
+
+    Returns:
+        HostRateLimiter: Limitador compartido por todos los workers
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = HostRateLimiter()
+    return _rate_limiter
@@ -0,0 +1,385 @@
+"""
+Grabación y reproducción local de respuestas de MisProfesores y del directorio UAM.
+
+Modo grabación: con REPLAY_RECORD_DIR definido, el cliente HTTP compartido y
+los contextos del BrowserPool guardan cada respuesta (documentos y XHR) en un
+cassette:
+    <dir>/index.jsonl           una línea por respuesta (método, URL, status,
+                                encabezados relevantes y hash del cuerpo)
+    <dir>/bodies/<sha256>.gz    cuerpo comprimido, deduplicado por hash
+
+Modo reproducción: un servidor HTTP local sirve el cassette bajo
+http://127.0.0.1:<puerto>/<host>/<ruta>, con latencia, errores y
+limitación de tasa configurables. Apuntando MP_BASE_URL y UAM_DIR_URL al
+servidor, el scraper corre sin red y de forma reproducible:
+
+    python -m src.core.replay --cassette data/cassettes/default --port 8765 \\
+        --latency-ms 150 --jitter-ms 50 --error-rate 0.02 --rps 5
+
+    MP_BASE_URL=http://127.0.0.1:8765/www.misprofesores.com
+    UAM_DIR_URL=http://127.0.0.1:8765/sistemas.azc.uam.mx/Somos/Directorio/
+
+El servidor reescribe los enlaces absolutos a los hosts grabados para que
+apunten a él, responde 304 a peticiones condicionales cuyo ETag coincide y
+resuelve rutas relativas al host (p. ej. XHR a /Somos/...) con el Referer.
+
+Configuración por variables de entorno:
+    REPLAY_RECORD_DIR: Directorio del cassette a grabar (vacío = no grabar)
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import getenv
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+load_dotenv()
+REPLAY_RECORD_DIR = getenv("REPLAY_RECORD_DIR", "")
+
+# Tipos de recurso del navegador que se graban (el resto se bloquea o no importa)
+RECORDED_RESOURCE_TYPES = ("document", "xhr", "fetch")
+
+# Encabezados de respuesta que se conservan en el cassette
+KEPT_HEADERS = ("content-type", "etag", "last-modified", "location")
+
+
+def _key(method: str, url: str) -> Tuple[str, str, str]:
+    """Clave de búsqueda (método, host, ruta con query) de una URL."""
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    return method.upper(), parts.netloc, path
+
+
+class Cassette:
+    """
+    Respuestas grabadas, indexadas por método, host y ruta.
+
+    Example:
+        cassette = Cassette(Path("data/cassettes/default"))
+        cassette.record("GET", url, 200, {"content-type": "text/html"}, body)
+        entry = cassette.lookup("GET", "www.misprofesores.com", "/profesores/x")
+        body = cassette.body(entry["sha256"])
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.index_path = root / "index.jsonl"
+        self.bodies_dir = root / "bodies"
+        self._lock = threading.Lock()
+        self.entries: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.hosts = set()
+        self._load()
+
+    def _load(self) -> None:
+        """Carga el índice; la última grabación de cada URL prevalece."""
+        if not self.index_path.exists():
+            return
+        with self.index_path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # línea truncada por una interrupción
+                self.entries[_key(entry["method"], entry["url"])] = entry
+                self.hosts.add(urlsplit(entry["url"]).netloc)
+
+    def record(self, method: str, url: str, status: int,
+               headers: Dict[str, str], body: bytes) -> None:
+        """
+        Graba una respuesta.
+
+        Args:
+            method: Método HTTP de la petición
+            url: URL absoluta de la petición
+            status: Código de respuesta
+            headers: Encabezados de la respuesta
+            body: Cuerpo de la respuesta ya decodificado (sin Content-Encoding)
+        """
+        if status == 304:
+            return  # no reemplazar la respuesta completa ya grabada
+        sha = hashlib.sha256(body).hexdigest()
+        body_path = self.bodies_dir / f"{sha}.gz"
+        lower = {k.lower(): v for k, v in headers.items()}
+        entry = {
+            "method": method.upper(),
+            "url": url,
+            "status": status,
+            "headers": {k: lower[k] for k in KEPT_HEADERS if k in lower},
+            "sha256": sha,
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock:
+            if not body_path.exists():
+                body_path.parent.mkdir(parents=True, exist_ok=True)
+                body_path.write_bytes(gzip.compress(body))
+            with self.index_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.entries[_key(method, url)] = entry
+            self.hosts.add(urlsplit(url).netloc)
+
+    def lookup(self, method: str, host: Optional[str], path: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca la respuesta grabada de una petición.
+
+        Args:
+            method: Método HTTP
+            host: Host original; si es None se busca la ruta en todos los hosts
+            path: Ruta con query
+
+        Returns:
+            Entrada del índice o None si no se grabó
+        """
+        hosts = [host] if host else sorted(self.hosts)
+        for h in hosts:
+            entry = self.entries.get((method.upper(), h, path))
+            if entry is not None:
+                return entry
+        return None
+
+    def body(self, sha: str) -> bytes:
+        """Lee el cuerpo grabado con el hash dado."""
+        return gzip.decompress((self.bodies_dir / f"{sha}.gz").read_bytes())
+
+
+# ============================================================================
+# GRABACIÓN
+# ============================================================================
+
+_recorder: Optional[Cassette] = None
+
+
+def get_recorder() -> Optional[Cassette]:
+    """
+    Obtiene el cassette de grabación del proceso.
+
+    Returns:
+        Cassette si REPLAY_RECORD_DIR está definido, None en caso contrario
+    """
+    global _recorder
+    if _recorder is None and REPLAY_RECORD_DIR:
+        _recorder = Cassette(Path(REPLAY_RECORD_DIR))
+        print(f"⏺ Grabando respuestas en {REPLAY_RECORD_DIR}")
+    return _recorder
+
+
+async def record_httpx_response(response) -> None:
+    """Event hook de httpx que graba la respuesta en el cassette."""
+    recorder = get_recorder()
+    if recorder is None:
+        return
+    await response.aread()
+    recorder.record(response.request.method, str(response.request.url),
+                    response.status_code, dict(response.headers), response.content)
+
+
+async def record_browser_response(response) -> None:
+    """Handler del evento 'response' de Playwright que graba documentos y XHR."""
+    recorder = get_recorder()
+    if recorder is None or response.request.resource_type not in RECORDED_RESOURCE_TYPES:
+        return
+    try:
+        body = await response.body()
+    except Exception:
+        return  # redirecciones y respuestas ya descartadas no tienen cuerpo
+    recorder.record(response.request.method, response.url, response.status,
+                    await response.all_headers(), body)
+
+
+# ============================================================================
+# SERVIDOR DE REPRODUCCIÓN
+# ============================================================================
+
+class _Throttle:
+    """Token bucket compartido por los hilos del servidor."""
+
+    def __init__(self, rps: float, burst: float):
+        self.rps = rps
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rps)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Servidor HTTP que reproduce un cassette con fallas simuladas.
+
+    Args:
+        cassette: Respuestas grabadas
+        address: Tupla (host, puerto); el puerto 0 elige uno libre
+        latency_ms: Latencia añadida a cada respuesta
+        jitter_ms: Variación aleatoria (+/-) de la latencia
+        error_rate: Fracción de peticiones que responden 503
+        rps: Peticiones/segundo admitidas antes de responder 429 (0 = sin límite)
+        burst: Ráfaga admitida por el limitador
+        seed: Semilla del generador aleatorio (reproducibilidad)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, cassette: Cassette, address: Tuple[str, int] = ("127.0.0.1", 8765),
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 rps: float = 0.0, burst: float = 5.0, seed: Optional[int] = None):
+        super().__init__(address, _ReplayHandler)
+        self.cassette = cassette
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle = _Throttle(rps, burst) if rps > 0 else None
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"served": 0, "not_modified": 0, "missing": 0, "errors": 0, "throttled": 0}
+
+    @property
+    def origin(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def delay_s(self) -> float:
+        with self.lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def inject_error(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    def count(self, stat: str) -> None:
+        with self.lock:
+            self.stats[stat] += 1
+
+    def rewrite(self, body: bytes) -> bytes:
+        """Reescribe los enlaces absolutos a los hosts grabados hacia el servidor."""
+        for host in self.cassette.hosts:
+            local = f"{self.origin}/{host}".encode()
+            for scheme in (b"https://", b"http://"):
+                body = body.replace(scheme + host.encode(), local)
+        return body
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    server: ReplayServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # el resumen se imprime al detener el servidor
+
+    def _resolve(self) -> Tuple[Optional[str], str]:
+        """Separa /<host>/<ruta> o, para rutas relativas al host, usa el Referer."""
+        first, _, rest = self.path.lstrip("/").partition("/")
+        if first in self.server.cassette.hosts:
+            return first, f"/{rest}"
+        referer = urlsplit(self.headers.get("Referer", "")).path.lstrip("/").split("/", 1)[0]
+        if referer in self.server.cassette.hosts:
+            return referer, self.path
+        return None, self.path
+
+    def _send(self, status: int, headers: Dict[str, str], body: bytes = b"") -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _serve(self) -> None:
+        srv = self.server
+        time.sleep(srv.delay_s())
+
+        if srv.throttle is not None and not srv.throttle.allow():
+            srv.count("throttled")
+            self._send(429, {"Retry-After": "1"})
+            return
+        if srv.inject_error():
+            srv.count("errors")
+            self._send(503, {"Content-Type": "text/plain"}, b"error simulado")
+            return
+
+        host, path = self._resolve()
+        method = "GET" if self.command == "HEAD" else self.command
+        entry = srv.cassette.lookup(method, host, path)
+        if entry is None:
+            srv.count("missing")
+            self._send(404, {"Content-Type": "text/plain"}, f"no grabado: {self.path}".encode())
+            return
+
+        headers = dict(entry["headers"])
+        etag = headers.get("etag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            srv.count("not_modified")
+            self._send(304, {"ETag": etag})
+            return
+        if "location" in headers:
+            headers["location"] = srv.rewrite(headers["location"].encode()).decode()
+
+        srv.count("served")
+        self._send(entry["status"], headers, srv.rewrite(srv.cassette.body(entry["sha256"])))
+
+    def do_GET(self) -> None:
+        self._serve()
+
+    def do_HEAD(self) -> None:
+        self._serve()
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._serve()
+
+
+def main() -> None:
+    """Punto de entrada: python -m src.core.replay --cassette DIR [opciones]."""
+    ap = argparse.ArgumentParser(description="Servidor local que reproduce un cassette grabado")
+    ap.add_argument("--cassette", default=REPLAY_RECORD_DIR or "data/cassettes/default",
+                    help="Directorio del cassette (default: REPLAY_RECORD_DIR)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="Latencia añadida por respuesta")
+    ap.add_argument("--jitter-ms", type=float, default=0.0, help="Variación +/- de la latencia")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Fracción de respuestas 503")
+    ap.add_argument("--rps", type=float, default=0.0, help="Límite de peticiones/segundo (429)")
+    ap.add_argument("--burst", type=float, default=5.0, help="Ráfaga admitida por el límite")
+    ap.add_argument("--seed", type=int, default=None, help="Semilla para errores y latencia")
+    args = ap.parse_args()
+
+    cassette = Cassette(Path(args.cassette))
+    if not cassette.entries:
+        raise SystemExit(f"El cassette {args.cassette} está vacío. Graba primero con REPLAY_RECORD_DIR.")
+
+    server = ReplayServer(cassette, (args.host, args.port), latency_ms=args.latency_ms,
+                          jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                          rps=args.rps, burst=args.burst, seed=args.seed)
+    print(f"▶ Reproduciendo {len(cassette.entries)} respuestas en {server.origin}")
+    for host in sorted(cassette.hosts):
+        print(f"   {server.origin}/{host}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n✓ Servidas: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
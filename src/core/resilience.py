@@ -0,0 +1,228 @@
+"""
+Políticas de reintento y timeout por etapa, y circuit breaker compartido.
+
+Cada etapa de descarga tiene su política (intentos, timeout de navegación o
+petición HTTP y timeout de espera de selectores):
+    directory: directorio UAM            search: búsqueda en /Buscar
+    profile: página 1 del perfil         reviews: páginas de reseñas 2..N
+    school: listado de la escuela
+
+El circuit breaker es uno por host y lo comparten todos los workers del
+proceso. Tras BREAKER_FAILURES fallas consecutivas (timeouts, errores de
+conexión, 429 o 5xx) se abre: toda petición nueva a ese host espera el
+enfriamiento en lugar de consumir su propio timeout. Al terminar el
+enfriamiento deja pasar una sola petición de prueba; si tiene éxito se
+cierra y, si falla, se vuelve a abrir con el doble de enfriamiento (hasta
+BREAKER_MAX_COOLDOWN_S).
+
+Configuración por variables de entorno (<ETAPA> en mayúsculas, p. ej. PROFILE):
+    RETRY_ATTEMPTS_<ETAPA>: Intentos de la etapa
+    TIMEOUT_GOTO_S_<ETAPA>: Timeout de navegación / petición HTTP en segundos
+    TIMEOUT_SELECTOR_S_<ETAPA>: Timeout de espera de selectores en segundos
+    BREAKER_FAILURES: Fallas consecutivas que abren el circuito (default: 5)
+    BREAKER_COOLDOWN_S: Enfriamiento inicial en segundos (default: 60)
+    BREAKER_MAX_COOLDOWN_S: Enfriamiento máximo en segundos (default: 600)
+"""
+import asyncio
+import time
+from os import getenv
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+from tenacity import AsyncRetrying, retry_if_not_exception_type, stop_after_attempt, wait_random_exponential
+
+load_dotenv()
+BREAKER_FAILURES = int(getenv("BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN_S = float(getenv("BREAKER_COOLDOWN_S", "60"))
+BREAKER_MAX_COOLDOWN_S = float(getenv("BREAKER_MAX_COOLDOWN_S", "600"))
+
+# Valores por defecto de cada etapa: (intentos, timeout navegación s, timeout selector s)
+STAGE_DEFAULTS = {
+    "directory": (3, 30.0, 15.0),
+    "search": (2, 20.0, 15.0),
+    "profile": (4, 20.0, 10.0),
+    "reviews": (4, 20.0, 10.0),
+    "school": (3, 20.0, 10.0),
+}
+
+
+class StagePolicy:
+    """Intentos y timeouts de una etapa de descarga."""
+
+    def __init__(self, stage: str, attempts: int, goto_s: float, selector_s: float):
+        self.stage = stage
+        self.attempts = max(1, attempts)
+        self.goto_s = goto_s
+        self.selector_s = selector_s
+
+    @property
+    def goto_ms(self) -> float:
+        return self.goto_s * 1000
+
+    @property
+    def selector_ms(self) -> float:
+        return self.selector_s * 1000
+
+    def retrying(self, no_retry: tuple = ()) -> AsyncRetrying:
+        """
+        Crea el iterador de reintentos de tenacity de la etapa.
+
+        Args:
+            no_retry: Tipos de excepción que no se reintentan
+
+        Returns:
+            AsyncRetrying con backoff exponencial aleatorio y reraise
+
+        Example:
+            async for attempt in get_policy("search").retrying():
+                with attempt:
+                    return await _search(...)
+        """
+        return AsyncRetrying(
+            wait=wait_random_exponential(min=1, max=8),
+            stop=stop_after_attempt(self.attempts),
+            retry=retry_if_not_exception_type(no_retry),
+            reraise=True,
+        )
+
+
+def _load_policies() -> Dict[str, StagePolicy]:
+    policies = {}
+    for stage, (attempts, goto_s, selector_s) in STAGE_DEFAULTS.items():
+        key = stage.upper()
+        policies[stage] = StagePolicy(
+            stage,
+            attempts=int(getenv(f"RETRY_ATTEMPTS_{key}", str(attempts))),
+            goto_s=float(getenv(f"TIMEOUT_GOTO_S_{key}", str(goto_s))),
+            selector_s=float(getenv(f"TIMEOUT_SELECTOR_S_{key}", str(selector_s))),
+        )
+    return policies
+
+
+POLICIES = _load_policies()
+
+
+def get_policy(stage: str) -> StagePolicy:
+    """
+    Obtiene la política de una etapa.
+
+    Args:
+        stage: Nombre de la etapa (ver STAGE_DEFAULTS)
+
+    Returns:
+        StagePolicy de la etapa
+    """
+    return POLICIES[stage]
+
+
+# ============================================================================
+# CIRCUIT BREAKER
+# ============================================================================
+
+class _HostCircuit:
+    """Estado del circuito de un host."""
+
+    def __init__(self, cooldown_s: float):
+        self.failures = 0
+        self.open_until = 0.0
+        self.cooldown_s = cooldown_s
+        self.probe_started: Optional[float] = None
+        self.opened = 0
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por host compartido por todos los workers del proceso.
+
+    Example:
+        breaker = get_circuit_breaker()
+        await breaker.before(url)          # espera si el circuito está abierto
+        ...
+        breaker.record(url, ok=False)      # timeout, 429 o 5xx
+    """
+
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown_s: float = BREAKER_COOLDOWN_S,
+                 max_cooldown_s: float = BREAKER_MAX_COOLDOWN_S):
+        self.failures = max(1, failures)
+        self.cooldown_s = cooldown_s
+        self.max_cooldown_s = max_cooldown_s
+        self._hosts: Dict[str, _HostCircuit] = {}
+
+    def _circuit(self, url: str) -> _HostCircuit:
+        host = urlparse(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = _HostCircuit(self.cooldown_s)
+        return self._hosts[host]
+
+    async def before(self, url: str) -> None:
+        """
+        Espera a que el circuito del host permita una petición.
+
+        Mientras el circuito está abierto, todas las peticiones esperan el fin
+        del enfriamiento. Después solo una petición de prueba pasa hasta que
+        su resultado se registre (o hasta que pase otro enfriamiento, por si
+        la prueba se canceló sin registrar resultado).
+
+        Args:
+            url: URL que se va a solicitar
+        """
+        circuit = self._circuit(url)
+        while True:
+            now = time.monotonic()
+            if circuit.open_until > now:
+                await asyncio.sleep(circuit.open_until - now)
+                continue
+            if circuit.failures < self.failures:
+                return
+            if circuit.probe_started is None or now - circuit.probe_started > circuit.cooldown_s:
+                circuit.probe_started = now  # semiabierto: esta petición es la prueba
+                return
+            await asyncio.sleep(0.5)
+
+    def record(self, url: str, ok: bool) -> None:
+        """
+        Registra el resultado de una petición.
+
+        Args:
+            url: URL solicitada
+            ok: False si hubo timeout, error de conexión, 429 o 5xx
+        """
+        circuit = self._circuit(url)
+        if ok:
+            if circuit.failures >= self.failures:
+                print(f"✓ Circuito cerrado para {urlparse(url).netloc}")
+            circuit.failures = 0
+            circuit.cooldown_s = self.cooldown_s
+            circuit.probe_started = None
+            return
+
+        circuit.failures += 1
+        if circuit.failures < self.failures:
+            return
+        if circuit.probe_started is not None:
+            # La petición de prueba falló: enfriamiento más largo
+            circuit.cooldown_s = min(circuit.cooldown_s * 2, self.max_cooldown_s)
+            circuit.probe_started = None
+        elif circuit.open_until > time.monotonic():
+            return  # ya abierto por otro worker
+        circuit.open_until = time.monotonic() + circuit.cooldown_s
+        circuit.opened += 1
+        print(f"⚠ Circuito abierto para {urlparse(url).netloc}: {circuit.failures} fallas "
+              f"consecutivas, pausa de {circuit.cooldown_s:.0f}s para todos los workers")
+
+    def summary_lines(self) -> List[str]:
+        """Líneas de resumen por host con circuitos abiertos durante la corrida."""
+        return [f"  Circuito {host}: abierto {c.opened} veces"
+                for host, c in sorted(self._hosts.items()) if c.opened]
+
+
+_breaker: Optional[CircuitBreaker] = None
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Obtiene el circuit breaker compartido del proceso."""
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker()
+    return _breaker
@@ -7,7 +7,7 @@ from datetime import datetime, date
 from typing import Optional
 
 from sqlalchemy import (
-    Integer, String, Boolean, DECIMAL, Date, DateTime, Text,
+    Integer, String, Boolean, DECIMAL, Date, DateTime, Float, Text,
     ForeignKey, UniqueConstraint, CheckConstraint, Index
 )
 from sqlalchemy.dialects.postgresql import INET
@@ -31,6 +31,7 @@ class Profesor(Base):
     nombre_completo: Mapped[str] = mapped_column(String(255), nullable=False)
     nombre_limpio: Mapped[str] = mapped_column(String(255), nullable=False)
     slug: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
+    slug_uam: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     url_directorio_uam: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     url_misprofesores: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     departamento: Mapped[str] = mapped_column(String(100), default='Sistemas')
@@ -58,6 +59,11 @@ class Profesor(Base):
         back_populates="profesor"
     )
     
+    # Índices
+    __table_args__ = (
+        Index('idx_profesores_slug_uam', 'slug_uam'),
+    )
+    
     def __repr__(self):
         return f"<Profesor(id={self.id}, nombre='{self.nombre_limpio}')>"
 
@@ -240,6 +246,7 @@ class ReseniaMetadata(Base):
     mongo_opinion_id: Mapped[Optional[str]] = mapped_column(String(24), unique=True, nullable=True)
     tiene_comentario: Mapped[bool] = mapped_column(Boolean, default=False)
     longitud_comentario: Mapped[int] = mapped_column(Integer, default=0)
+    clave_resenia: Mapped[Optional[str]] = mapped_column(String(40), nullable=True)
     fecha_extraccion: Mapped[datetime] = mapped_column(DateTime, server_default=func.current_timestamp())
     fuente: Mapped[str] = mapped_column(String(50), default='misprofesores.com')
     
@@ -257,6 +264,7 @@ class ReseniaMetadata(Base):
     __table_args__ = (
         CheckConstraint('calidad_general >= 0 AND calidad_general <= 10', name='check_resenia_calidad'),
         CheckConstraint('facilidad >= 0 AND facilidad <= 10', name='check_resenia_facilidad'),
+        Index('idx_resenias_profesor_clave', 'profesor_id', 'clave_resenia'),
     )
     
     def __repr__(self):
@@ -321,6 +329,8 @@ class HistorialScraping(Base):
     mensaje_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     stack_trace: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     duracion_segundos: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    duracion_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    bytes_transferidos: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     url_procesada: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     cache_utilizado: Mapped[bool] = mapped_column(Boolean, default=False)
     razon_rescraping: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -333,3 +343,45 @@ class HistorialScraping(Base):
     
     def __repr__(self):
         return f"<HistorialScraping(id={self.id}, profesor_id={self.profesor_id}, estado='{self.estado}')>"
+
+
+# ============================================================================
+# MODELO: ScrapeJob (Cola de trabajo distribuida)
+# ============================================================================
+
+class ScrapeJob(Base):
+    """Trabajo de scraping de un profesor dentro de una corrida distribuida."""
+    
+    __tablename__ = 'scrape_jobs'
+    
+    # Campos
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    run_id: Mapped[str] = mapped_column(String(50), nullable=False)
+    profesor_nombre: Mapped[str] = mapped_column(String(255), nullable=False)
+    estado: Mapped[str] = mapped_column(String(20), default='pendiente')
+    prioridad: Mapped[float] = mapped_column(Float, default=0)
+    intentos: Mapped[int] = mapped_column(Integer, default=0)
+    max_intentos: Mapped[int] = mapped_column(Integer, default=3)
+    worker_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    lease_hasta: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    resultado: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    mensaje_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.current_timestamp())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        server_default=func.current_timestamp(),
+        onupdate=func.current_timestamp()
+    )
+    
+    __table_args__ = (
+        UniqueConstraint('run_id', 'profesor_nombre', name='uq_scrape_job_run_profesor'),
+        CheckConstraint(
+            "estado IN ('pendiente', 'en_proceso', 'terminado', 'fallido')",
+            name='check_scrape_job_estado'
+        ),
+        Index('idx_scrape_jobs_pendientes', 'run_id', 'estado', 'prioridad'),
+    )
+    
+    def __repr__(self):
+        return f"<ScrapeJob(id={self.id}, run_id='{self.run_id}', profesor='{self.profesor_nombre}', estado='{self.estado}')>"
@@ -0,0 +1,265 @@
+"""
+Cola de trabajo de scraping en PostgreSQL para SentimentInsightUAM
+
+Permite repartir una corrida entre varios procesos o máquinas que comparten
+la misma base de datos:
+- scrape-enqueue inserta un trabajo por profesor en scrape_jobs
+- cada scrape-worker reclama trabajos con FOR UPDATE SKIP LOCKED, de modo
+  que dos workers nunca toman el mismo trabajo
+- el worker mantiene un lease (lease_hasta) que renueva con heartbeats;
+  si muere, el lease vence y otro worker puede reclamar el trabajo
+- cada reclamo cuenta un intento; al agotar max_intentos el trabajo queda
+  como 'fallido'
+
+Todas las marcas de tiempo usan el reloj de PostgreSQL (now()), no el de
+cada máquina.
+
+Configuración por variables de entorno:
+    QUEUE_LEASE_S: Duración del lease de un trabajo (default: 300)
+    QUEUE_HEARTBEAT_S: Intervalo de renovación del lease (default: 60)
+    QUEUE_MAX_ATTEMPTS: Intentos por trabajo (default: 3)
+    QUEUE_POLL_S: Espera entre consultas cuando no hay trabajos libres
+                  pero otros workers siguen procesando (default: 10)
+"""
+import os
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from . import get_db_session
+from .models import ScrapeJob
+
+QUEUE_LEASE_S = int(os.getenv("QUEUE_LEASE_S", "300"))
+QUEUE_HEARTBEAT_S = int(os.getenv("QUEUE_HEARTBEAT_S", "60"))
+QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_POLL_S = float(os.getenv("QUEUE_POLL_S", "10"))
+
+
+# ============================================================================
+# ENCOLADO
+# ============================================================================
+
+async def encolar_trabajos(
+    run_id: str,
+    trabajos: List[Tuple[str, float]],
+    max_intentos: int = QUEUE_MAX_ATTEMPTS
+) -> int:
+    """
+    Inserta los trabajos de una corrida (los ya existentes se omiten).
+
+    Args:
+        run_id: Identificador de la corrida
+        trabajos: Lista de tuplas (nombre del profesor, prioridad)
+        max_intentos: Intentos permitidos por trabajo
+
+    Returns:
+        Número de trabajos insertados
+    """
+    if not trabajos:
+        return 0
+
+    async with get_db_session() as session:
+        stmt = (
+            insert(ScrapeJob)
+            .values([
+                {
+                    'run_id': run_id,
+                    'profesor_nombre': nombre,
+                    'prioridad': prioridad,
+                    'max_intentos': max_intentos,
+                    'estado': 'pendiente',
+                }
+                for nombre, prioridad in trabajos
+            ])
+            .on_conflict_do_nothing(constraint='uq_scrape_job_run_profesor')
+            .returning(ScrapeJob.id)
+        )
+        result = await session.execute(stmt)
+        insertados = len(result.all())
+        await session.commit()
+        return insertados
+
+
+# ============================================================================
+# RECLAMO Y LEASES
+# ============================================================================
+
+async def reclamar_trabajo(run_id: str, worker_id: str,
+                           lease_s: int = QUEUE_LEASE_S) -> Optional[Dict[str, Any]]:
+    """
+    Reclama el trabajo pendiente de mayor prioridad de una corrida.
+
+    También toma trabajos 'en_proceso' cuyo lease venció (worker caído).
+    Los trabajos con lease vencido que ya agotaron sus intentos se marcan
+    como 'fallido'.
+
+    Args:
+        run_id: Identificador de la corrida
+        worker_id: Identificador del worker que reclama
+        lease_s: Duración del lease en segundos
+
+    Returns:
+        Dict con id, profesor_nombre, intentos y max_intentos, o None si no
+        hay trabajos disponibles
+    """
+    async with get_db_session() as session:
+        await session.execute(
+            update(ScrapeJob)
+            .where(
+                ScrapeJob.run_id == run_id,
+                ScrapeJob.estado == 'en_proceso',
+                ScrapeJob.lease_hasta < func.now(),
+                ScrapeJob.intentos >= ScrapeJob.max_intentos,
+            )
+            .values(estado='fallido', resultado='error', mensaje_error='lease vencido')
+        )
+
+        result = await session.execute(
+            select(ScrapeJob)
+            .where(
+                ScrapeJob.run_id == run_id,
+                ScrapeJob.intentos < ScrapeJob.max_intentos,
+                (ScrapeJob.estado == 'pendiente')
+                | ((ScrapeJob.estado == 'en_proceso') & (ScrapeJob.lease_hasta < func.now())),
+            )
+            .order_by(ScrapeJob.prioridad.desc(), ScrapeJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = result.scalar_one_or_none()
+        if job is None:
+            await session.commit()
+            return None
+
+        job.estado = 'en_proceso'
+        job.worker_id = worker_id
+        job.intentos = job.intentos + 1
+        job.lease_hasta = func.now() + timedelta(seconds=lease_s)
+        job.heartbeat_at = func.now()
+        await session.commit()
+
+        return {
+            'id': job.id,
+            'profesor_nombre': job.profesor_nombre,
+            'intentos': job.intentos,
+            'max_intentos': job.max_intentos,
+        }
+
+
+async def renovar_lease(job_id: int, worker_id: str, lease_s: int = QUEUE_LEASE_S) -> bool:
+    """
+    Renueva el lease de un trabajo (heartbeat).
+
+    Args:
+        job_id: ID del trabajo
+        worker_id: Worker que lo tiene reclamado
+        lease_s: Nueva duración del lease en segundos desde ahora
+
+    Returns:
+        False si el trabajo ya no pertenece al worker (lease perdido)
+    """
+    async with get_db_session() as session:
+        result = await session.execute(
+            update(ScrapeJob)
+            .where(
+                ScrapeJob.id == job_id,
+                ScrapeJob.worker_id == worker_id,
+                ScrapeJob.estado == 'en_proceso',
+            )
+            .values(
+                lease_hasta=func.now() + timedelta(seconds=lease_s),
+                heartbeat_at=func.now(),
+            )
+        )
+        await session.commit()
+        return result.rowcount > 0
+
+
+async def completar_trabajo(job_id: int, worker_id: str, resultado: str) -> None:
+    """
+    Marca un trabajo como terminado.
+
+    Args:
+        job_id: ID del trabajo
+        worker_id: Worker que lo procesó
+        resultado: Resultado del scraping ('scrapeado' o 'cache')
+    """
+    async with get_db_session() as session:
+        await session.execute(
+            update(ScrapeJob)
+            .where(ScrapeJob.id == job_id, ScrapeJob.worker_id == worker_id)
+            .values(estado='terminado', resultado=resultado, lease_hasta=None, mensaje_error=None)
+        )
+        await session.commit()
+
+
+async def fallar_trabajo(job_id: int, worker_id: str, error: str) -> str:
+    """
+    Registra un intento fallido: el trabajo vuelve a 'pendiente' o, si agotó
+    sus intentos, queda como 'fallido'.
+
+    Args:
+        job_id: ID del trabajo
+        worker_id: Worker que lo procesó
+        error: Mensaje de error
+
+    Returns:
+        Nuevo estado del trabajo
+    """
+    async with get_db_session() as session:
+        result = await session.execute(
+            select(ScrapeJob)
+            .where(ScrapeJob.id == job_id, ScrapeJob.worker_id == worker_id)
+            .with_for_update()
+        )
+        job = result.scalar_one_or_none()
+        if job is None:
+            return 'desconocido'
+
+        job.estado = 'fallido' if job.intentos >= job.max_intentos else 'pendiente'
+        job.resultado = 'error'
+        job.mensaje_error = error
+        job.lease_hasta = None
+        await session.commit()
+        return job.estado
+
+
+# ============================================================================
+# CONSULTAS
+# ============================================================================
+
+async def resumen_cola(run_id: str) -> Dict[str, int]:
+    """
+    Cuenta los trabajos de una corrida por estado.
+
+    Args:
+        run_id: Identificador de la corrida
+
+    Returns:
+        Dict estado → número de trabajos
+    """
+    async with get_db_session() as session:
+        result = await session.execute(
+            select(ScrapeJob.estado, func.count(ScrapeJob.id))
+            .where(ScrapeJob.run_id == run_id)
+            .group_by(ScrapeJob.estado)
+        )
+        return {estado: n for estado, n in result.all()}
+
+
+async def ultimo_run_id() -> Optional[str]:
+    """
+    Obtiene la corrida encolada más recientemente.
+
+    Returns:
+        run_id o None si la cola está vacía
+    """
+    async with get_db_session() as session:
+        result = await session.execute(
+            select(ScrapeJob.run_id)
+            .order_by(ScrapeJob.created_at.desc(), ScrapeJob.id.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
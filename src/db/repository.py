@@ -3,16 +3,20 @@ Repositorio de persistencia para SentimentInsightUAM
 
 Contiene funciones para guardar datos del scraping en PostgreSQL y MongoDB.
 """
+import hashlib
 import json
 import traceback
-from datetime import datetime, date
+from collections import Counter
+from datetime import datetime, date, timedelta
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from slugify import slugify
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.metrics import stage
+from ..mp.parser import review_key
 from . import get_db_session, get_mongo_db
 from .models import (
     Profesor, Perfil, Etiqueta, PerfilEtiqueta, Curso,
@@ -239,7 +243,123 @@ async def obtener_o_crear_curso(session: AsyncSession, nombre: str) -> Optional[
     return curso
 
 
-async def guardar_profesor_completo(data: Dict[str, Any], url_misprofesores: Optional[str] = None) -> int:
+def _slug_directorio():
+    """
+    Expresión SQL con el slug del directorio UAM de cada profesor.
+
+    Es slug_uam; en filas guardadas antes de esa columna, el slug de
+    MisProfesores.
+    """
+    return func.coalesce(Profesor.slug_uam, Profesor.slug)
+
+
+async def _buscar_profesor(
+    session: AsyncSession,
+    slug_uam: str,
+    url_misprofesores: Optional[str] = None
+) -> Optional[Profesor]:
+    """
+    Busca un profesor por el slug de su nombre en el directorio UAM.
+
+    El scraper conoce al profesor por el nombre del directorio, pero
+    Profesor.slug viene del nombre de MisProfesores y ambos pueden diferir
+    (acentos, segundos nombres, títulos). Busca por slug_uam y, si se da,
+    por la URL de MisProfesores guardada; prefiere la coincidencia por slug.
+
+    Args:
+        session: Sesión de SQLAlchemy
+        slug_uam: slugify del nombre del directorio UAM
+        url_misprofesores: URL del perfil en MisProfesores (opcional)
+
+    Returns:
+        Profesor o None si no se encuentra
+    """
+    por_slug = _slug_directorio() == slug_uam
+    condicion = or_(por_slug, Profesor.url_misprofesores == url_misprofesores) if url_misprofesores else por_slug
+    result = await session.execute(
+        select(Profesor).where(condicion).order_by(por_slug.desc(), Profesor.id).limit(1)
+    )
+    return result.scalars().first()
+
+
+def clave_resenia(review: Dict[str, Any]) -> str:
+    """
+    Huella de una reseña para reconocerla entre corridas.
+
+    Es el hash de review_key (fecha, curso original, calificación, facilidad
+    y comentario), la misma clave que usan el scraping incremental y el
+    re-parseo.
+
+    Args:
+        review: Reseña con la estructura de parse_reviews
+
+    Returns:
+        str: SHA-1 hexadecimal (40 caracteres)
+    """
+    raw = json.dumps(review_key(review), ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+async def _buscar_resenia(
+    session: AsyncSession,
+    profesor_id: int,
+    clave: str,
+    ocurrencia: int,
+    fecha_resenia: date,
+    calidad: Optional[float],
+    curso: Optional[Curso]
+) -> Optional[ReseniaMetadata]:
+    """
+    Busca la fila ya guardada que corresponde a una reseña.
+
+    Reseñas idénticas (misma clave) son legítimas, así que la n-ésima
+    aparición en un lote corresponde a la n-ésima fila guardada con esa clave.
+    Las filas anteriores a clave_resenia se reconocen por profesor, fecha,
+    calificación y curso.
+
+    Args:
+        session: Sesión de SQLAlchemy
+        profesor_id: ID del profesor
+        clave: clave_resenia de la reseña
+        ocurrencia: Apariciones previas de la misma clave en el lote
+        fecha_resenia: Fecha de la reseña
+        calidad: Calificación general
+        curso: Curso de la reseña, si tiene
+
+    Returns:
+        ReseniaMetadata existente, o None si la reseña es nueva
+    """
+    result = await session.execute(
+        select(ReseniaMetadata)
+        .where(ReseniaMetadata.profesor_id == profesor_id,
+               ReseniaMetadata.clave_resenia == clave)
+        .order_by(ReseniaMetadata.id)
+        .offset(ocurrencia)
+        .limit(1)
+    )
+    resenia = result.scalars().first()
+    if resenia is not None:
+        return resenia
+
+    query = select(ReseniaMetadata).where(
+        ReseniaMetadata.profesor_id == profesor_id,
+        ReseniaMetadata.clave_resenia.is_(None),
+        ReseniaMetadata.fecha_resenia == fecha_resenia,
+        ReseniaMetadata.calidad_general == calidad
+    )
+    if curso:
+        query = query.where(ReseniaMetadata.curso_id == curso.id)
+    result = await session.execute(query.order_by(ReseniaMetadata.id).limit(1))
+    return result.scalars().first()
+
+
+async def guardar_profesor_completo(
+    data: Dict[str, Any],
+    url_misprofesores: Optional[str] = None,
+    total_resenias: Optional[int] = None,
+    reparseo: Optional[str] = None,
+    slug_uam: Optional[str] = None
+) -> int:
     """
     Guarda un profesor completo en PostgreSQL y MongoDB.
     
@@ -250,6 +370,19 @@ async def guardar_profesor_completo(data: Dict[str, Any], url_misprofesores: Opt
     Args:
         data: JSON del scraping con la estructura completa del profesor
         url_misprofesores: URL del perfil en MisProfesores (opcional)
+        total_resenias: Total de reseñas del profesor cuando data['reviews']
+            solo contiene las nuevas (scraping incremental). Si es None se usa
+            len(data['reviews'])
+        reparseo: None para un scraping. "actualizar" o "reemplazar" cuando
+            data viene del re-parseo del HTML archivado: corrige el último
+            perfil en lugar de crear otro, actualiza en su lugar las reseñas ya
+            guardadas (clave_resenia), inserta las que falten y no registra
+            historial de scraping. "reemplazar" además elimina las reseñas y
+            opiniones de MongoDB que ya no aparecen en data (solo si data
+            contiene todas las reseñas del profesor)
+        slug_uam: slugify del nombre del profesor en el directorio UAM; se
+            guarda en el profesor para encontrarlo por ese nombre (ver
+            _buscar_profesor)
         
     Returns:
         int: ID del profesor en PostgreSQL
@@ -289,148 +422,205 @@ async def guardar_profesor_completo(data: Dict[str, Any], url_misprofesores: Opt
             nombre_limpio = limpiar_nombre_profesor(nombre_completo)
             slug = slugify(nombre_limpio)
             
-            # 2. Obtener o crear profesor
-            result = await session.execute(
-                select(Profesor).where(Profesor.slug == slug)
-            )
-            profesor = result.scalar_one_or_none()
-            
-            if profesor is None:
-                # Crear nuevo profesor
-                profesor = Profesor(
-                    nombre_completo=nombre_completo,
-                    nombre_limpio=nombre_limpio,
-                    slug=slug,
-                    url_misprofesores=url_misprofesores,
-                    departamento='Sistemas',
-                    activo=True
+            with stage("db_postgres"):
+                # 2. Obtener o crear profesor
+                result = await session.execute(
+                    select(Profesor).where(Profesor.slug == slug)
                 )
-                session.add(profesor)
-                await session.flush()
-                print(f"  → Profesor '{nombre_limpio}' creado (ID={profesor.id})")
-            else:
-                # Actualizar URL si se proporcionó
-                if url_misprofesores and not profesor.url_misprofesores:
-                    profesor.url_misprofesores = url_misprofesores
-                print(f"  → Profesor '{nombre_limpio}' ya existe (ID={profesor.id})")
+                profesor = result.scalar_one_or_none()
+                if profesor is None and slug_uam:
+                    # El nombre en MisProfesores cambió: buscar por el del directorio
+                    profesor = await _buscar_profesor(session, slug_uam, url_misprofesores)
             
-            # 3. Crear perfil (snapshot del día)
-            perfil = Perfil(
-                profesor_id=profesor.id,
-                calidad_general=data.get('overall_quality'),
-                dificultad=data.get('difficulty'),
-                porcentaje_recomendacion=data.get('recommend_percent'),
-                total_resenias_encontradas=len(data.get('reviews', [])),
-                scraping_exitoso=True,
-                fuente='misprofesores.com'
-            )
-            session.add(perfil)
-            await session.flush()
-            print(f"  → Perfil creado (ID={perfil.id}, calidad={perfil.calidad_general})")
+                if profesor is None:
+                    # Crear nuevo profesor
+                    profesor = Profesor(
+                        nombre_completo=nombre_completo,
+                        nombre_limpio=nombre_limpio,
+                        slug=slug,
+                        slug_uam=slug_uam,
+                        url_misprofesores=url_misprofesores,
+                        departamento='Sistemas',
+                        activo=True
+                    )
+                    session.add(profesor)
+                    await session.flush()
+                    print(f"  → Profesor '{nombre_limpio}' creado (ID={profesor.id})")
+                else:
+                    # Actualizar URL si se proporcionó
+                    if url_misprofesores and not profesor.url_misprofesores:
+                        profesor.url_misprofesores = url_misprofesores
+                    if slug_uam:
+                        profesor.slug_uam = slug_uam
+                    print(f"  → Profesor '{nombre_limpio}' ya existe (ID={profesor.id})")
             
-            # 4. Procesar etiquetas del perfil
-            tags_count = 0
-            for tag_data in data.get('tags', []):
-                etiqueta = await obtener_o_crear_etiqueta(session, tag_data['label'])
-                
-                perfil_etiqueta = PerfilEtiqueta(
-                    perfil_id=perfil.id,
-                    etiqueta_id=etiqueta.id,
-                    contador=tag_data.get('count', 0)
+                # 3. Crear perfil (snapshot del día); al re-parsear se corrige el último
+                perfil = None
+                if reparseo:
+                    result = await session.execute(
+                        select(Perfil)
+                        .where(Perfil.profesor_id == profesor.id)
+                        .order_by(Perfil.fecha_extraccion.desc(), Perfil.id.desc())
+                        .limit(1)
+                    )
+                    perfil = result.scalar_one_or_none()
+
+                total_encontradas = (
+                    total_resenias if total_resenias is not None else len(data.get('reviews', []))
                 )
-                session.add(perfil_etiqueta)
-                tags_count += 1
+                if perfil is None:
+                    perfil = Perfil(
+                        profesor_id=profesor.id,
+                        calidad_general=data.get('overall_quality'),
+                        dificultad=data.get('difficulty'),
+                        porcentaje_recomendacion=data.get('recommend_percent'),
+                        total_resenias_encontradas=total_encontradas,
+                        scraping_exitoso=True,
+                        fuente='misprofesores.com'
+                    )
+                    session.add(perfil)
+                    await session.flush()
+                    print(f"  → Perfil creado (ID={perfil.id}, calidad={perfil.calidad_general})")
+                else:
+                    perfil.calidad_general = data.get('overall_quality')
+                    perfil.dificultad = data.get('difficulty')
+                    perfil.porcentaje_recomendacion = data.get('recommend_percent')
+                    perfil.total_resenias_encontradas = total_encontradas
+                    await session.execute(
+                        delete(PerfilEtiqueta).where(PerfilEtiqueta.perfil_id == perfil.id)
+                    )
+                    print(f"  → Perfil actualizado (ID={perfil.id}, calidad={perfil.calidad_general})")
+            
+                # 4. Procesar etiquetas del perfil
+                tags_count = 0
+                for tag_data in data.get('tags', []):
+                    etiqueta = await obtener_o_crear_etiqueta(session, tag_data['label'])
+                
+                    perfil_etiqueta = PerfilEtiqueta(
+                        perfil_id=perfil.id,
+                        etiqueta_id=etiqueta.id,
+                        contador=tag_data.get('count', 0)
+                    )
+                    session.add(perfil_etiqueta)
+                    tags_count += 1
             
-            if tags_count > 0:
-                await session.flush()
-                print(f"  → {tags_count} etiquetas del perfil asociadas")
+                if tags_count > 0:
+                    await session.flush()
+                    print(f"  → {tags_count} etiquetas del perfil asociadas")
             
             # 5. Procesar reseñas
             reviews = data.get('reviews', [])
             resenias_insertadas = 0
+            resenias_actualizadas = 0
             resenias_duplicadas = 0
             opiniones_insertadas = 0
+            ocurrencias: Counter = Counter()
+            vigentes: List[int] = []
             
             for review in reviews:
-                # a) Obtener o crear curso
-                curso = None
-                curso_nombre_original = review.get('course', '')
-                curso_nombre_normalizado = obtener_curso_normalizado(curso_nombre_original) if curso_nombre_original else None
+                with stage("db_postgres"):
+                    # a) Obtener o crear curso
+                    curso = None
+                    curso_nombre_original = review.get('course', '')
+                    curso_nombre_normalizado = obtener_curso_normalizado(curso_nombre_original) if curso_nombre_original else None
                 
-                if curso_nombre_original:
-                    curso = await obtener_o_crear_curso(session, curso_nombre_original)
+                    if curso_nombre_original:
+                        curso = await obtener_o_crear_curso(session, curso_nombre_original)
                 
-                # b) Convertir fecha string a date object
-                fecha_resenia_str = review.get('date')
-                if fecha_resenia_str:
-                    if isinstance(fecha_resenia_str, str):
-                        fecha_resenia = datetime.fromisoformat(fecha_resenia_str).date()
-                    elif isinstance(fecha_resenia_str, date):
-                        fecha_resenia = fecha_resenia_str
+                    # b) Convertir fecha string a date object
+                    fecha_resenia_str = review.get('date')
+                    if fecha_resenia_str:
+                        if isinstance(fecha_resenia_str, str):
+                            fecha_resenia = datetime.fromisoformat(fecha_resenia_str).date()
+                        elif isinstance(fecha_resenia_str, date):
+                            fecha_resenia = fecha_resenia_str
+                        else:
+                            fecha_resenia = datetime.now().date()
                     else:
                         fecha_resenia = datetime.now().date()
-                else:
-                    fecha_resenia = datetime.now().date()
                 
-                comentario = review.get('comment', '')
-                tiene_comentario_valido = es_comentario_valido(comentario)
-                
-                # c) Verificar si la reseña ya existe (evitar duplicados)
-                # Criterio: mismo profesor + fecha + curso + calificación
-                query_duplicado = select(ReseniaMetadata).where(
-                    ReseniaMetadata.profesor_id == profesor.id,
-                    ReseniaMetadata.fecha_resenia == fecha_resenia,
-                    ReseniaMetadata.calidad_general == review.get('overall')
-                )
-                if curso:
-                    query_duplicado = query_duplicado.where(ReseniaMetadata.curso_id == curso.id)
+                    comentario = review.get('comment', '')
+                    tiene_comentario_valido = es_comentario_valido(comentario)
                 
-                result_dup = await session.execute(query_duplicado)
-                resenia_existente = result_dup.scalar_one_or_none()
+                    # c) Buscar la reseña ya guardada (misma clave_resenia)
+                    clave = clave_resenia(review)
+                    resenia = await _buscar_resenia(
+                        session, profesor.id, clave, ocurrencias[clave],
+                        fecha_resenia, review.get('overall'), curso
+                    )
+                    ocurrencias[clave] += 1
                 
-                if resenia_existente:
-                    resenias_duplicadas += 1
-                    continue  # Saltar reseña duplicada
+                    if resenia is not None and not reparseo:
+                        if resenia.clave_resenia is None:
+                            resenia.clave_resenia = clave
+                        resenias_duplicadas += 1
+                        continue  # Saltar reseña duplicada
                 
-                # d) Crear reseña en PostgreSQL
-                resenia = ReseniaMetadata(
-                    profesor_id=profesor.id,
-                    curso_id=curso.id if curso else None,
-                    perfil_id=perfil.id,
-                    fecha_resenia=fecha_resenia,
-                    calidad_general=review.get('overall'),
-                    facilidad=review.get('ease'),
-                    asistencia=review.get('attendance'),
-                    calificacion_recibida=review.get('grade_received'),
-                    nivel_interes=review.get('interest'),
-                    tiene_comentario=tiene_comentario_valido,
-                    longitud_comentario=len(comentario) if tiene_comentario_valido else 0,
-                    fuente='misprofesores.com'
-                )
-                session.add(resenia)
-                await session.flush()  # Necesario para obtener resenia.id
+                    # d) Crear reseña en PostgreSQL (o actualizarla al re-parsear)
+                    campos = dict(
+                        curso_id=curso.id if curso else None,
+                        perfil_id=perfil.id,
+                        fecha_resenia=fecha_resenia,
+                        calidad_general=review.get('overall'),
+                        facilidad=review.get('ease'),
+                        asistencia=review.get('attendance'),
+                        calificacion_recibida=review.get('grade_received'),
+                        nivel_interes=review.get('interest'),
+                        tiene_comentario=tiene_comentario_valido,
+                        longitud_comentario=len(comentario) if tiene_comentario_valido else 0,
+                        clave_resenia=clave
+                    )
+                    nueva = resenia is None
+                    if nueva:
+                        resenia = ReseniaMetadata(
+                            profesor_id=profesor.id,
+                            fuente='misprofesores.com',
+                            **campos
+                        )
+                        session.add(resenia)
+                    else:
+                        for campo, valor in campos.items():
+                            setattr(resenia, campo, valor)
+                        await session.execute(
+                            delete(ReseniaEtiqueta).where(ReseniaEtiqueta.resenia_id == resenia.id)
+                        )
+                    await session.flush()  # Necesario para obtener resenia.id
+                    vigentes.append(resenia.id)
                 
-                # e) Procesar etiquetas de la reseña
-                for tag_name in review.get('tags', []):
-                    etiqueta = await obtener_o_crear_etiqueta(session, tag_name)
+                    # e) Procesar etiquetas de la reseña
+                    for tag_name in review.get('tags', []):
+                        etiqueta = await obtener_o_crear_etiqueta(session, tag_name)
                     
-                    resenia_etiqueta = ReseniaEtiqueta(
-                        resenia_id=resenia.id,
-                        etiqueta_id=etiqueta.id
-                    )
-                    session.add(resenia_etiqueta)
+                        resenia_etiqueta = ReseniaEtiqueta(
+                            resenia_id=resenia.id,
+                            etiqueta_id=etiqueta.id
+                        )
+                        session.add(resenia_etiqueta)
                 
                 # f) Insertar opinión en MongoDB (solo si hay comentario válido)
                 if tiene_comentario_valido:
                     # Verificar duplicado en MongoDB también
-                    opinion_existente = await mongo_db.opiniones.find_one({
-                        'profesor_id': profesor.id,
-                        'comentario': comentario
-                    })
+                    with stage("db_mongo"):
+                        opinion_existente = await mongo_db.opiniones.find_one({
+                            'profesor_id': profesor.id,
+                            'comentario': comentario
+                        })
                     
                     if opinion_existente:
                         # Ya existe, solo vincular
                         resenia.mongo_opinion_id = str(opinion_existente['_id'])
+                        if reparseo:
+                            # Conserva el análisis de sentimiento; actualiza lo re-parseado
+                            with stage("db_mongo"):
+                                await mongo_db.opiniones.update_one(
+                                    {'_id': opinion_existente['_id']},
+                                    {'$set': {
+                                        'resenia_id': resenia.id,
+                                        'fecha_opinion': datetime.combine(fecha_resenia, datetime.min.time()),
+                                        'curso': curso_nombre_original,
+                                        'curso_normalizado': curso_nombre_normalizado,
+                                    }}
+                                )
                     else:
                         # Crear nueva opinión con curso normalizado
                         opinion_doc = {
@@ -459,38 +649,75 @@ async def guardar_profesor_completo(data: Dict[str, Any], url_misprofesores: Opt
                             'version_scraper': '1.2.0'
                         }
                         
-                        mongo_result = await mongo_db.opiniones.insert_one(opinion_doc)
+                        with stage("db_mongo"):
+                            mongo_result = await mongo_db.opiniones.insert_one(opinion_doc)
                         
                         # Vincular MongoDB con PostgreSQL
                         resenia.mongo_opinion_id = str(mongo_result.inserted_id)
                         opiniones_insertadas += 1
                 
-                resenias_insertadas += 1
+                if nueva:
+                    resenias_insertadas += 1
+                else:
+                    resenias_actualizadas += 1
+            
+            if reparseo == "reemplazar":
+                # resenia_etiquetas se borra en cascada (ondelete='CASCADE')
+                with stage("db_postgres"):
+                    result = await session.execute(
+                        delete(ReseniaMetadata).where(
+                            ReseniaMetadata.profesor_id == profesor.id,
+                            ReseniaMetadata.id.notin_(vigentes)
+                        )
+                    )
+                if result.rowcount:
+                    print(f"  → {result.rowcount} reseñas que ya no están en el sitio eliminadas")
             
             print(f"  → {resenias_insertadas} reseñas insertadas en PostgreSQL")
+            if resenias_actualizadas > 0:
+                print(f"  → {resenias_actualizadas} reseñas actualizadas")
             if resenias_duplicadas > 0:
                 print(f"  → {resenias_duplicadas} reseñas duplicadas omitidas")
             print(f"  → {opiniones_insertadas} opiniones insertadas en MongoDB")
             
-            # 6. Registrar en historial de scraping
+            # 6. Registrar en historial de scraping (el re-parseo no es un scraping)
             duracion = int((datetime.now() - inicio).total_seconds())
+            if data.get('cached'):
+                razon = 'cache_usado'
+            elif total_resenias is not None:
+                razon = 'scraping_incremental'
+            else:
+                razon = 'integracion_base_datos'
             
-            historial = HistorialScraping(
-                profesor_id=profesor.id,
-                estado='exito',
-                resenias_encontradas=len(reviews),
-                resenias_nuevas=resenias_insertadas,
-                resenias_actualizadas=0,
-                duracion_segundos=duracion,
-                url_procesada=url_misprofesores,
-                cache_utilizado=data.get('cached', False),
-                razon_rescraping='integracion_base_datos' if not data.get('cached') else 'cache_usado',
-                user_agent='SentimentInsightUAM/1.2.0'
-            )
-            session.add(historial)
+            if not reparseo:
+                historial = HistorialScraping(
+                    profesor_id=profesor.id,
+                    estado='exito',
+                    resenias_encontradas=len(reviews),
+                    resenias_nuevas=resenias_insertadas,
+                    resenias_actualizadas=0,
+                    duracion_segundos=duracion,
+                    url_procesada=url_misprofesores,
+                    cache_utilizado=data.get('cached', False),
+                    razon_rescraping=razon,
+                    user_agent='SentimentInsightUAM/1.2.0'
+                )
+                session.add(historial)
             
             # 7. Commit final
-            await session.commit()
+            with stage("db_postgres"):
+                await session.commit()
+            
+            if reparseo == "reemplazar":
+                # Opiniones de reseñas que ya no están (borradas o editadas en el sitio)
+                vigentes = [r.get('comment', '') for r in reviews]
+                with stage("db_mongo"):
+                    borradas = await mongo_db.opiniones.delete_many({
+                        'profesor_id': profesor.id,
+                        'comentario': {'$nin': vigentes}
+                    })
+                if borradas.deleted_count:
+                    print(f"  → {borradas.deleted_count} opiniones obsoletas eliminadas de MongoDB")
             
             print(f"✅ Persistencia exitosa: {nombre_limpio} (ID={profesor.id})")
             print(f"   Duración: {duracion}s")
@@ -517,6 +744,49 @@ async def guardar_profesor_completo(data: Dict[str, Any], url_misprofesores: Opt
             raise
 
 
+async def registrar_sondeo(
+    slug_uam: str,
+    url: Optional[str],
+    resultado: str,
+    resenias_encontradas: Optional[int],
+    cache_vigente: bool,
+    duracion_ms: int,
+    bytes_transferidos: int
+) -> None:
+    """
+    Registra en historial_scraping un sondeo de frescura del caché.
+    
+    El sondeo lee el contador exacto de reseñas (o recibe un 304 por
+    petición condicional) para decidir si el caché sigue vigente.
+    
+    Args:
+        slug_uam: Slug del nombre en el directorio UAM (se vincula al
+            profesor si existe, ver _buscar_profesor)
+        url: URL del perfil sondeada
+        resultado: Resultado del sondeo (p. ej. 'sondeo_304', 'sondeo_sin_cambios')
+        resenias_encontradas: Número de reseñas reportado por la página
+        cache_vigente: True si el caché se consideró vigente
+        duracion_ms: Duración del sondeo en milisegundos
+        bytes_transferidos: Bytes descargados por el sondeo
+    """
+    async with get_db_session() as session:
+        profesor = await _buscar_profesor(session, slug_uam, url)
+        
+        session.add(HistorialScraping(
+            profesor_id=profesor.id if profesor else None,
+            estado='sondeo',
+            resenias_encontradas=resenias_encontradas or 0,
+            duracion_segundos=duracion_ms // 1000,
+            duracion_ms=duracion_ms,
+            bytes_transferidos=bytes_transferidos,
+            url_procesada=url,
+            cache_utilizado=cache_vigente,
+            razon_rescraping=resultado,
+            user_agent='SentimentInsightUAM/1.2.0'
+        ))
+        await session.commit()
+
+
 # ============================================================================
 # FUNCIONES DE CONSULTA
 # ============================================================================
@@ -538,6 +808,65 @@ async def obtener_profesor_por_slug(slug: str) -> Optional[Profesor]:
         return result.scalar_one_or_none()
 
 
+async def obtener_url_misprofesores(slug_uam: str) -> Optional[str]:
+    """
+    Obtiene la URL de MisProfesores guardada para un profesor.
+    
+    Args:
+        slug_uam: Slug del nombre en el directorio UAM (ver _buscar_profesor)
+        
+    Returns:
+        URL del perfil o None si el profesor no existe o no tiene URL
+    """
+    async with get_db_session() as session:
+        profesor = await _buscar_profesor(session, slug_uam)
+        return profesor.url_misprofesores if profesor else None
+
+
+async def obtener_estadisticas_scraping(dias_errores: int = 14) -> Dict[str, Dict[str, Any]]:
+    """
+    Resume el historial de scraping de cada profesor para priorizar corridas.
+    
+    Args:
+        dias_errores: Ventana en días para contar errores recientes
+        
+    Returns:
+        Dict slug del directorio UAM (ver _slug_directorio) →
+        {'ultimo_exito', 'primer_exito', 'resenias_nuevas',
+        'errores_recientes'}. Un éxito es un scraping ('exito') o un
+        sondeo de frescura ('sondeo') completado.
+    """
+    exito = HistorialScraping.estado.in_(('exito', 'sondeo'))
+    desde = datetime.now() - timedelta(days=dias_errores)
+    async with get_db_session() as session:
+        result = await session.execute(
+            select(
+                _slug_directorio(),
+                func.max(HistorialScraping.timestamp).filter(exito),
+                func.min(HistorialScraping.timestamp).filter(exito),
+                func.coalesce(
+                    func.sum(HistorialScraping.resenias_nuevas)
+                    .filter(HistorialScraping.estado == 'exito'), 0
+                ),
+                func.count(HistorialScraping.id).filter(
+                    (HistorialScraping.estado == 'error')
+                    & (HistorialScraping.timestamp >= desde)
+                ),
+            )
+            .join(HistorialScraping, HistorialScraping.profesor_id == Profesor.id)
+            .group_by(_slug_directorio())
+        )
+        return {
+            slug: {
+                'ultimo_exito': ultimo,
+                'primer_exito': primero,
+                'resenias_nuevas': int(nuevas or 0),
+                'errores_recientes': int(errores or 0),
+            }
+            for slug, ultimo, primero, nuevas, errores in result.all()
+        }
+
+
 async def obtener_ultimos_profesores(limite: int = 10) -> list[Profesor]:
     """
     Obtiene los últimos profesores agregados.
@@ -3,8 +3,14 @@ Módulo mp - Scraping y parsing de MisProfesores.com
 
 Contiene:
     parser: Funciones para parsear HTML y extraer información estructurada
-            de perfiles y reseñas de profesores
+            de perfiles y reseñas de profesores (backends bs4 y lxml)
     scrape_prof: Funciones para scrapear perfiles completos con Playwright,
                  incluyendo búsqueda, navegación y paginación
+    js_extract: Extractor JS de perfil y reseñas ejecutado dentro de la página
+                (MP_EXTRACT_MODE=js), compatible con la salida de parser
+    url_cache: Caché persistente nombre → URL de perfil
+    school_index: Índice de perfiles desde el listado de la escuela (discover)
+    scheduler: Priorización de profesores para scrape-all por valor esperado
+    reparse: Re-parseo en paralelo del HTML archivado, sin red
 """
 
@@ -0,0 +1,206 @@
+"""
+Extracción estructurada dentro del navegador para MisProfesores.com
+
+En lugar de serializar el DOM completo con page.content() y volver a parsear
+el HTML con BeautifulSoup, EXTRACT_JS se ejecuta dentro de la página con
+page.evaluate y devuelve solo los campos que usa el scraper, como JSON:
+
+    {
+        "profile": {...},        # misma estructura que parser.parse_profile
+        "reviews": [...],        # misma estructura que parser.parse_reviews
+        "review_count": int,     # parser.review_count
+        "page_count": int        # parser.page_count
+    }
+
+extract_html construye el mismo extracto desde HTML con el parser de Python,
+de modo que ambos caminos pueden compararse (tests/test_js_extract.py).
+
+El modo se elige con MP_EXTRACT_MODE (html | js) y solo aplica a las páginas
+de perfil y reseñas descargadas con el navegador; el backend HTTP siempre
+recibe HTML.
+"""
+from typing import Any, Dict, Union
+
+from .parser import ParsedPage
+
+# Página descargada: HTML completo (o ya parseado) o extracto de EXTRACT_JS
+Fetched = Union[str, ParsedPage, Dict[str, Any]]
+
+# Réplica en JS de parser.py. get_text(strip=True) de BeautifulSoup concatena
+# los nodos de texto recortados sin separador; text() hace lo mismo.
+EXTRACT_JS = r"""
+() => {
+  const MONTHS = {Ene: "01", Feb: "02", Mar: "03", Abr: "04", May: "05", Jun: "06",
+                  Jul: "07", Ago: "08", Sep: "09", Oct: "10", Nov: "11", Dic: "12"};
+  const SKIP = new Set(["SCRIPT", "STYLE", "TEMPLATE", "NOSCRIPT"]);
+
+  const text = (el) => {
+    if (!el) return "";
+    const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+    const parts = [];
+    for (let n = walker.nextNode(); n; n = walker.nextNode()) {
+      if (SKIP.has(n.parentNode.nodeName)) continue;
+      const t = n.nodeValue.trim();
+      if (t) parts.push(t);
+    }
+    return parts.join("");
+  };
+  const num = (txt) => {
+    if (!txt) return null;
+    const m = txt.replace(/,/g, ".").match(/\d+(?:[.,]\d+)?/);
+    return m ? parseFloat(m[0]) : null;
+  };
+  const date = (s) => {
+    const m = s.match(/^\s*(\d{2})\/([A-Za-z]{3})\/(\d{4})/);
+    if (!m) return null;
+    const mon = m[2].charAt(0).toUpperCase() + m[2].slice(1).toLowerCase();
+    return `${m[3]}-${MONTHS[mon] || "01"}-${m[1]}`;
+  };
+  const one = (root, sel) => root ? root.querySelector(sel) : null;
+  const all = (root, sel) => root ? Array.from(root.querySelectorAll(sel)) : [];
+
+  // Perfil
+  const nameEl = one(document, ".prof_headers h1") || one(document, "h1") || one(document, "title");
+  const profile = {name: nameEl ? text(nameEl) : "Perfil", overall_quality: null,
+                   difficulty: null, recommend_percent: null, tags: []};
+  const rb = one(document, "div.rating-breakdown");
+  if (rb) {
+    profile.overall_quality = num(text(one(rb, ".quality .grade")));
+    profile.difficulty = num(text(one(rb, ".difficulty .grade")));
+    profile.recommend_percent = num(text(one(rb, ".takeAgain .grade")));
+    profile.tags = all(document, ".right-breakdown .tag-box .tag-box-choosetags").map((sp) => {
+      const t = text(sp);
+      const m = t.match(/^(.+?)\s*\((\d+)\)\s*$/);
+      return {label: m ? m[1].trim() : t, count: m ? parseInt(m[2], 10) : null};
+    });
+  }
+
+  // Reseñas (la primera fila es el encabezado)
+  const reviews = [];
+  for (const tr of all(document, "div.rating-filter.togglable table.tftable tr").slice(1)) {
+    const tdR = one(tr, "td.rating");
+    const tdC = one(tr, "td.class");
+    const tdCom = one(tr, "td.comments");
+    if (!tdR || !tdC) continue;
+
+    let overall = null, ease = null;
+    for (const box of all(tdR, ".breakdown .descriptor-container")) {
+      const desc = text(one(box, ".descriptor")).toLowerCase();
+      const scoreEl = one(box, ".score");
+      const val = scoreEl ? num(text(scoreEl)) : null;
+      if (desc.includes("calidad")) overall = val;
+      if (desc.includes("facilidad")) ease = val;
+    }
+
+    let gradeReceived = null, interest = null;
+    for (const g of all(tdC, ".grade")) {
+      const t = text(g);
+      const resp = one(g, ".response");
+      if (t.includes("Calificación Recibida")) gradeReceived = resp ? text(resp) : null;
+      if (t.includes("Interés")) interest = resp ? text(resp) : null;
+    }
+
+    const course = one(tdC, ".name .response");
+    const attendance = one(tdC, ".attendance .response");
+    const comment = one(tdCom, "p.commentsParagraph");
+    reviews.push({
+      date: date(text(one(tdR, ".date"))),
+      course: course ? text(course) : null,
+      overall: overall,
+      ease: ease,
+      attendance: attendance ? text(attendance) : null,
+      grade_received: gradeReceived,
+      interest: interest,
+      tags: all(tdCom, ".tagbox .tag-box-choosetags, .tagbox a, .tagbox span")
+        .map(text).filter((t) => t),
+      comment: comment ? text(comment) : "",
+    });
+  }
+
+  // Contador de reseñas y páginas (5 reseñas por página)
+  const cnt = one(document, "div.table-toggle.rating-count.active")
+    || one(document, "div.table-toggle.rating-count");
+  const n = cnt ? num(cnt.textContent) : null;
+  const reviewCount = n === null ? null : Math.trunc(n);
+  let pages = 1;
+  if (reviewCount) {
+    pages = Math.max(1, Math.ceil(reviewCount / 5));
+  } else {
+    const nums = all(document, "ul.pagination li a")
+      .map((a) => a.textContent.match(/\d+/)).filter((m) => m).map((m) => parseInt(m[0], 10));
+    if (nums.length) pages = Math.max(...nums);
+  }
+
+  return {profile: profile, reviews: reviews, review_count: reviewCount, page_count: pages};
+}
+"""
+
+# Campos del extracto; en ParsedPage son atributos con el mismo nombre
+FIELDS = ("profile", "reviews", "review_count", "page_count")
+
+# Campos numéricos que parser.py devuelve como float (JSON de JS no distingue 97 de 97.0)
+_PROFILE_FLOATS = ("overall_quality", "difficulty", "recommend_percent")
+_REVIEW_FLOATS = ("overall", "ease")
+
+
+def _as_float(value: Any) -> Any:
+    return float(value) if isinstance(value, (int, float)) else value
+
+
+def _normalize(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Ajusta los tipos del extracto JS a los de parser.py."""
+    for key in _PROFILE_FLOATS:
+        data["profile"][key] = _as_float(data["profile"].get(key))
+    for review in data["reviews"]:
+        for key in _REVIEW_FLOATS:
+            review[key] = _as_float(review.get(key))
+    return data
+
+
+async def extract_page(page) -> Dict[str, Any]:
+    """
+    Ejecuta EXTRACT_JS en una página de Playwright ya cargada.
+
+    Args:
+        page: Página de Playwright con el perfil o una página de reseñas
+
+    Returns:
+        Extracto con 'profile', 'reviews', 'review_count' y 'page_count'
+    """
+    return _normalize(await page.evaluate(EXTRACT_JS))
+
+
+def extract_html(html: str) -> Dict[str, Any]:
+    """
+    Construye el extracto de una página desde su HTML con el parser de Python.
+
+    Args:
+        html: Contenido HTML de la página
+
+    Returns:
+        Extracto con la misma estructura que extract_page
+    """
+    page = ParsedPage(html)
+    return {name: getattr(page, name) for name in FIELDS}
+
+
+def extract_field(fetched: Fetched, name: str) -> Any:
+    """
+    Lee un campo de una página descargada, sea HTML o extracto JS.
+
+    El HTML sin parsear se parsea en cada llamada; para leer varios campos
+    de la misma página conviene pasar un ParsedPage.
+
+    Args:
+        fetched: HTML de la página, ParsedPage o extracto de extract_page
+        name: 'profile', 'reviews', 'review_count' o 'page_count'
+
+    Returns:
+        Valor del campo, con la estructura de la función de parser.py
+        correspondiente
+    """
+    if isinstance(fetched, str):
+        fetched = ParsedPage(fetched)
+    if isinstance(fetched, ParsedPage):
+        return getattr(fetched, name)
+    return fetched[name]
@@ -3,12 +3,32 @@ Módulo para parsear perfiles y reseñas de profesores de MisProfesores.com
 
 Este módulo contiene funciones para extraer información estructurada de HTML
 de páginas de profesores, incluyendo calificaciones, etiquetas y reseñas.
+
+ParsedPage construye el árbol una sola vez y calcula perfil, reseñas y
+contadores al pedirlos; parse_profile, parse_reviews, review_count y
+page_count son atajos que parsean el HTML para obtener un solo campo.
+
+Backends (MP_PARSER_BACKEND):
+    bs4: BeautifulSoup con selectores CSS (default)
+    lxml: lxml.html con los mismos selectores precompilados a XPath; produce
+          exactamente los mismos dicts y es varias veces más rápido, útil al
+          re-parsear el archivo completo (tests/test_parser_parity.py)
+parse_school_listing usa siempre BeautifulSoup.
 """
 import re
 import math
-from typing import Optional, Dict, List, Any
+from functools import cached_property, lru_cache
+from os import getenv
+from typing import Optional, Dict, List, Any, Tuple
+from urllib.parse import urljoin
 
+import lxml.html
 from bs4 import BeautifulSoup
+from dotenv import load_dotenv
+from lxml import etree
+
+load_dotenv()
+PARSER_BACKEND = getenv("MP_PARSER_BACKEND", "bs4").lower()
 
 # Mapeo de abreviaciones de meses en español a números
 MONTHS = {
@@ -51,25 +71,8 @@ def _date_ddMonYYYY(s: str) -> Optional[str]:
     return f"{yy}-{mon}-{dd}"
 
 
-def parse_profile(html: str) -> Dict[str, Any]:
-    """
-    Extrae información del perfil de un profesor desde el HTML de MisProfesores.com
-
-    Parsea el HTML para extraer calificaciones generales, nivel de dificultad,
-    porcentaje de recomendación y etiquetas asociadas al profesor.
-
-    Args:
-        html: Contenido HTML de la página del perfil del profesor
-
-    Returns:
-        Dict con las claves:
-            - name: Nombre del profesor
-            - overall_quality: Calificación general (float o None)
-            - difficulty: Nivel de dificultad (float o None)
-            - recommend_percent: Porcentaje de recomendación (float o None)
-            - tags: Lista de diccionarios con 'label' y 'count'
-    """
-    s = BeautifulSoup(html, "lxml")
+def _profile(s: BeautifulSoup) -> Dict[str, Any]:
+    """Perfil de un documento ya parseado (ver parse_profile)."""
     rb = s.select_one("div.rating-breakdown")
     name = (s.select_one(".prof_headers h1") or s.select_one("h1") or s.select_one("title"))
     if not rb:
@@ -105,29 +108,8 @@ def parse_profile(html: str) -> Dict[str, Any]:
     }
 
 
-def parse_reviews(html: str) -> List[Dict[str, Any]]:
-    """
-    Extrae todas las reseñas de un profesor desde el HTML de MisProfesores.com
-
-    Parsea las filas de la tabla de reseñas para extraer fecha, curso, calificaciones,
-    asistencia, comentarios y etiquetas de cada reseña.
-
-    Args:
-        html: Contenido HTML de la página con las reseñas del profesor
-
-    Returns:
-        Lista de diccionarios, cada uno representa una reseña con las claves:
-            - date: Fecha en formato ISO (YYYY-MM-DD)
-            - course: Nombre del curso (str o None)
-            - overall: Calificación general (float o None)
-            - ease: Facilidad del curso (float o None)
-            - attendance: Tipo de asistencia (str o None)
-            - grade_received: Calificación recibida (str o None)
-            - interest: Nivel de interés (str o None)
-            - tags: Lista de etiquetas de la reseña
-            - comment: Comentario adicional (str)
-    """
-    s = BeautifulSoup(html, "lxml")
+def _reviews(s: BeautifulSoup) -> List[Dict[str, Any]]:
+    """Reseñas de un documento ya parseado (ver parse_reviews)."""
     rows = s.select("div.rating-filter.togglable table.tftable tr")[1:]  # Saltar header
     out = []
     for tr in rows:
@@ -191,27 +173,31 @@ def parse_reviews(html: str) -> List[Dict[str, Any]]:
     return out
 
 
-def page_count(html: str) -> int:
+def _review_count(s: BeautifulSoup) -> Optional[int]:
     """
-    Calcula el número total de páginas de reseñas disponibles.
-
-    Extrae el conteo total de reseñas y calcula cuántas páginas hay
-    (5 reseñas por página), o busca el número máximo en la paginación.
+    Lee el contador total de reseñas de un documento ya parseado.
 
     Args:
-        html: Contenido HTML de la página con reseñas
+        s: Documento BeautifulSoup de la página del profesor
 
     Returns:
-        Número total de páginas (mínimo 1)
+        Número de reseñas o None si la página no muestra el contador
     """
-    s = BeautifulSoup(html, "lxml")
-
-    # Preferir contador total de reseñas (5 reseñas por página)
-    cnt = s.select_one("div.table-toggle.rating-count.active")
+    cnt = (s.select_one("div.table-toggle.rating-count.active")
+           or s.select_one("div.table-toggle.rating-count"))
     if cnt:
         n = _num(cnt.get_text())
-        if n:
-            return max(1, math.ceil(n / 5))
+        if n is not None:
+            return int(n)
+    return None
+
+
+def _page_count(s: BeautifulSoup) -> int:
+    """Número de páginas de reseñas de un documento ya parseado (ver page_count)."""
+    # Preferir contador total de reseñas (5 reseñas por página)
+    n = _review_count(s)
+    if n:
+        return max(1, math.ceil(n / 5))
 
     # Fallback: buscar el número máximo en los botones de paginación
     nums = [
@@ -220,3 +206,456 @@ def page_count(html: str) -> int:
         if (m := re.search(r"\d+", a.get_text()))
     ]
     return max(nums) if nums else 1
+
+
+# ============================================================================
+# BACKEND LXML
+# ============================================================================
+
+# Parser con codificación explícita: acepta HTML con declaración de codificación
+_HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+# Texto visible para get_text de BeautifulSoup (excluye script, style y template)
+_TEXT = etree.XPath(".//text()[not(parent::script or parent::style or parent::template)]")
+
+_COMPOUND_RE = re.compile(r"([\w*-]*)((?:\.[\w-]+|\[[\w-]+\*=['\"][^'\"]*['\"]\])*)$")
+_PART_RE = re.compile(r"\.([\w-]+)|\[([\w-]+)\*=['\"]([^'\"]*)['\"]\]")
+
+
+def _compound_xpath(compound: str) -> str:
+    """Traduce un selector simple (tag.clase[attr*='v']) a un paso XPath."""
+    m = _COMPOUND_RE.match(compound)
+    if not m:
+        raise ValueError(f"Selector CSS no soportado: {compound}")
+    tag, rest = m.group(1) or "*", m.group(2)
+    preds = []
+    for cls, attr, value in _PART_RE.findall(rest):
+        if cls:
+            preds.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')")
+        else:
+            preds.append(f"contains(@{attr}, '{value}')")
+    return tag + "".join(f"[{p}]" for p in preds)
+
+
+@lru_cache(maxsize=None)
+def _css(selector: str) -> etree.XPath:
+    """
+    Compila un selector CSS a XPath con la semántica de select de BeautifulSoup.
+
+    Soporta tag, clases, [attr*='valor'], descendientes y listas separadas por
+    coma. "A B" desde un elemento encuentra sus descendientes B que tengan un
+    ancestro A, aunque A esté fuera del elemento (como en CSS).
+
+    Args:
+        selector: Selector CSS
+
+    Returns:
+        XPath compilado; el resultado está en orden de documento y sin duplicados
+    """
+    paths = []
+    for group in selector.split(","):
+        *ancestors, target = [_compound_xpath(c) for c in group.split()]
+        path = f"descendant::{target}"
+        cond = ""
+        for step in ancestors:
+            cond = f"[ancestor::{step}{cond}]"
+        paths.append(path + cond)
+    return etree.XPath(" | ".join(paths))
+
+
+def _lx_all(el, selector: str) -> list:
+    return _css(selector)(el)
+
+
+def _lx_one(el, selector: str):
+    found = _css(selector)(el)
+    return found[0] if found else None
+
+
+def _lx_first(el, *selectors: str):
+    """Primer selector con resultado (los elementos lxml sin hijos son falsy, no sirve `or`)."""
+    for selector in selectors:
+        found = _lx_one(el, selector)
+        if found is not None:
+            return found
+    return None
+
+
+def _lx_text(el, strip: bool = True) -> str:
+    """Equivalente de get_text de BeautifulSoup (strip=True recorta y une sin separador)."""
+    parts = _TEXT(el)
+    if not strip:
+        return "".join(parts)
+    return "".join(t for t in (p.strip() for p in parts) if t)
+
+
+def _lxml_document(html: str):
+    """Parsea HTML con lxml; un documento vacío produce un árbol vacío como en BeautifulSoup."""
+    try:
+        return lxml.html.document_fromstring(html.encode("utf-8"), parser=_HTML_PARSER)
+    except etree.ParserError:
+        return lxml.html.document_fromstring(b"<html></html>", parser=_HTML_PARSER)
+
+
+def _lx_profile(doc) -> Dict[str, Any]:
+    """Perfil de un documento lxml (ver parse_profile)."""
+    rb = _lx_one(doc, "div.rating-breakdown")
+    name = _lx_first(doc, ".prof_headers h1", "h1", "title")
+    name = _lx_text(name) if name is not None else "Perfil"
+    if rb is None:
+        return {
+            "name": name,
+            "overall_quality": None,
+            "difficulty": None,
+            "recommend_percent": None,
+            "tags": []
+        }
+
+    overall = _num(_lx_text(_lx_one(rb, ".quality .grade")))
+    recommend = _num(_lx_text(_lx_one(rb, ".takeAgain .grade")))
+    difficulty = _num(_lx_text(_lx_one(rb, ".difficulty .grade")))
+
+    tags = []
+    for sp in _lx_all(doc, ".right-breakdown .tag-box .tag-box-choosetags"):
+        t = _lx_text(sp)
+        m = re.match(r"(.+?)\s*\((\d+)\)\s*$", t)
+        tags.append({
+            "label": m.group(1).strip() if m else t,
+            "count": int(m.group(2)) if m else None
+        })
+
+    return {
+        "name": name,
+        "overall_quality": overall,
+        "difficulty": difficulty,
+        "recommend_percent": recommend,
+        "tags": tags
+    }
+
+
+def _lx_response(el, selector: str) -> Optional[str]:
+    found = _lx_one(el, selector)
+    return _lx_text(found) if found is not None else None
+
+
+def _lx_reviews(doc) -> List[Dict[str, Any]]:
+    """Reseñas de un documento lxml (ver parse_reviews)."""
+    out = []
+    for tr in _lx_all(doc, "div.rating-filter.togglable table.tftable tr")[1:]:
+        td_r = _lx_one(tr, "td.rating")
+        td_c = _lx_one(tr, "td.class")
+        td_com = _lx_one(tr, "td.comments")
+        if td_r is None or td_c is None:
+            continue
+
+        date = _date_ddMonYYYY(_lx_text(_lx_one(td_r, ".date")))
+
+        overall = ease = None
+        for box in _lx_all(td_r, ".breakdown .descriptor-container"):
+            desc = (_lx_response(box, ".descriptor") or "").lower()
+            score = _lx_response(box, ".score")
+            val = _num(score) if score is not None else None
+            if "calidad" in desc:
+                overall = val
+            if "facilidad" in desc:
+                ease = val
+
+        grade_received = interest = None
+        for g in _lx_all(td_c, ".grade"):
+            txt = _lx_text(g)
+            if "Calificación Recibida" in txt:
+                grade_received = _lx_response(g, ".response")
+            if "Interés" in txt:
+                interest = _lx_response(g, ".response")
+
+        rtags = [
+            t for t in (_lx_text(e) for e in _lx_all(td_com, ".tagbox .tag-box-choosetags, .tagbox a, .tagbox span"))
+            if t
+        ]
+        out.append({
+            "date": date,
+            "course": _lx_response(td_c, ".name .response"),
+            "overall": overall,
+            "ease": ease,
+            "attendance": _lx_response(td_c, ".attendance .response"),
+            "grade_received": grade_received,
+            "interest": interest,
+            "tags": rtags,
+            "comment": _lx_response(td_com, "p.commentsParagraph") or ""
+        })
+    return out
+
+
+def _lx_review_count(doc) -> Optional[int]:
+    """Contador total de reseñas de un documento lxml (ver _review_count)."""
+    cnt = _lx_first(doc, "div.table-toggle.rating-count.active", "div.table-toggle.rating-count")
+    if cnt is not None:
+        n = _num(_lx_text(cnt, strip=False))
+        if n is not None:
+            return int(n)
+    return None
+
+
+def _lx_page_count(doc) -> int:
+    """Número de páginas de reseñas de un documento lxml (ver page_count)."""
+    n = _lx_review_count(doc)
+    if n:
+        return max(1, math.ceil(n / 5))
+    nums = [
+        int(m.group())
+        for a in _lx_all(doc, "ul.pagination li a")
+        if (m := re.search(r"\d+", _lx_text(a, strip=False)))
+    ]
+    return max(nums) if nums else 1
+
+
+# ============================================================================
+# PÁGINA PARSEADA
+# ============================================================================
+
+class ParsedPage:
+    """
+    Página de un profesor parseada una sola vez.
+
+    El árbol (BeautifulSoup o lxml, según el backend) se construye la primera
+    vez que se pide un campo y cada campo se calcula una sola vez. Los
+    valores devueltos son los mismos objetos en cada acceso.
+
+    Args:
+        html: Contenido HTML de la página
+        backend: "bs4" o "lxml" (default: MP_PARSER_BACKEND)
+
+    Example:
+        page = ParsedPage(html)
+        if page.has_selector("div.rating-breakdown"):
+            prof = page.profile
+            pages = page.page_count
+            reviews = page.reviews
+    """
+
+    def __init__(self, html: str, backend: Optional[str] = None):
+        self.html = html
+        self.backend = backend or PARSER_BACKEND
+        if self.backend not in ("bs4", "lxml"):
+            raise ValueError(f"Backend de parser desconocido: {self.backend} (usa bs4 o lxml)")
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        return BeautifulSoup(self.html, "lxml")
+
+    @cached_property
+    def tree(self):
+        return _lxml_document(self.html)
+
+    @cached_property
+    def profile(self) -> Dict[str, Any]:
+        """Perfil del profesor, con la estructura de parse_profile."""
+        return _lx_profile(self.tree) if self.backend == "lxml" else _profile(self.soup)
+
+    @cached_property
+    def reviews(self) -> List[Dict[str, Any]]:
+        """Reseñas de la página, con la estructura de parse_reviews."""
+        return _lx_reviews(self.tree) if self.backend == "lxml" else _reviews(self.soup)
+
+    @cached_property
+    def review_count(self) -> Optional[int]:
+        """Contador total de reseñas (ver review_count)."""
+        return _lx_review_count(self.tree) if self.backend == "lxml" else _review_count(self.soup)
+
+    @cached_property
+    def page_count(self) -> int:
+        """Número total de páginas de reseñas (ver page_count)."""
+        return _lx_page_count(self.tree) if self.backend == "lxml" else _page_count(self.soup)
+
+    def has_selector(self, selector: str) -> bool:
+        """Indica si la página contiene al menos un elemento que cumpla el selector CSS."""
+        if self.backend == "lxml":
+            return _lx_one(self.tree, selector) is not None
+        return self.soup.select_one(selector) is not None
+
+
+def parse_profile(html: str) -> Dict[str, Any]:
+    """
+    Extrae información del perfil de un profesor desde el HTML de MisProfesores.com
+
+    Parsea el HTML para extraer calificaciones generales, nivel de dificultad,
+    porcentaje de recomendación y etiquetas asociadas al profesor. Si también
+    se necesitan las reseñas o el número de páginas, conviene ParsedPage.
+
+    Args:
+        html: Contenido HTML de la página del perfil del profesor
+
+    Returns:
+        Dict con las claves:
+            - name: Nombre del profesor
+            - overall_quality: Calificación general (float o None)
+            - difficulty: Nivel de dificultad (float o None)
+            - recommend_percent: Porcentaje de recomendación (float o None)
+            - tags: Lista de diccionarios con 'label' y 'count'
+    """
+    return ParsedPage(html).profile
+
+
+def parse_reviews(html: str) -> List[Dict[str, Any]]:
+    """
+    Extrae todas las reseñas de un profesor desde el HTML de MisProfesores.com
+
+    Parsea las filas de la tabla de reseñas para extraer fecha, curso, calificaciones,
+    asistencia, comentarios y etiquetas de cada reseña.
+
+    Args:
+        html: Contenido HTML de la página con las reseñas del profesor
+
+    Returns:
+        Lista de diccionarios, cada uno representa una reseña con las claves:
+            - date: Fecha en formato ISO (YYYY-MM-DD)
+            - course: Nombre del curso (str o None)
+            - overall: Calificación general (float o None)
+            - ease: Facilidad del curso (float o None)
+            - attendance: Tipo de asistencia (str o None)
+            - grade_received: Calificación recibida (str o None)
+            - interest: Nivel de interés (str o None)
+            - tags: Lista de etiquetas de la reseña
+            - comment: Comentario adicional (str)
+    """
+    return ParsedPage(html).reviews
+
+
+def review_key(review: Dict[str, Any]) -> Tuple[Any, ...]:
+    """
+    Clave de identidad de una reseña para detectar reseñas ya conocidas.
+
+    Args:
+        review: Reseña con la estructura de parse_reviews
+
+    Returns:
+        Tupla (fecha, curso, calificación general, facilidad, comentario)
+    """
+    return (review.get("date"), review.get("course"), review.get("overall"),
+            review.get("ease"), review.get("comment"))
+
+
+def review_count(html: str) -> Optional[int]:
+    """
+    Obtiene el número exacto de reseñas que reporta la página del profesor.
+
+    Lee el contador de div.table-toggle.rating-count sin recorrer la tabla
+    de reseñas, por lo que sirve para verificar si el caché está vigente.
+
+    Args:
+        html: Contenido HTML de la página del perfil
+
+    Returns:
+        Número de reseñas o None si la página no muestra el contador
+    """
+    return ParsedPage(html).review_count
+
+
+def page_count(html: str) -> int:
+    """
+    Calcula el número total de páginas de reseñas disponibles.
+
+    Extrae el conteo total de reseñas y calcula cuántas páginas hay
+    (5 reseñas por página), o busca el número máximo en la paginación.
+
+    Args:
+        html: Contenido HTML de la página con reseñas
+
+    Returns:
+        Número total de páginas (mínimo 1)
+    """
+    return ParsedPage(html).page_count
+
+
+def has_selector(html: str, selector: str) -> bool:
+    """
+    Indica si el HTML contiene al menos un elemento que cumpla el selector CSS.
+
+    Se usa para validar que una página descargada sin navegador trae el
+    contenido esperado antes de parsearla.
+
+    Args:
+        html: Contenido HTML de la página
+        selector: Selector CSS (admite listas separadas por coma)
+
+    Returns:
+        True si existe al menos un elemento que cumpla el selector
+    """
+    return ParsedPage(html).has_selector(selector)
+
+
+# Conteo con etiqueta ("23 Calificaciones") y celda que solo contiene un entero
+_LISTING_COUNT_RE = re.compile(r"\b(\d+)\s*(?:calificaci|rese[ñn]|opini|rating)", re.IGNORECASE)
+_BARE_INT_RE = re.compile(r"^\d+$")
+
+
+def _listing_count(row, link) -> Optional[int]:
+    """
+    Número de reseñas de una fila del listado de la escuela.
+
+    Las celdas son los elementos sin hijos fuera del enlace, más el texto
+    suelto de la propia fila. Usa el número con etiqueta ("23 Calificaciones")
+    si lo hay; si no, la única celda cuyo texto es solo un entero.
+    Calificaciones como "9.4", porcentajes o varios enteros sueltos no se
+    toman como conteo.
+
+    Args:
+        row: Fila (tr) o contenedor inmediato del enlace al perfil
+        link: Enlace al perfil dentro de la fila
+
+    Returns:
+        Número de reseñas, o None si no hay uno o es ambiguo
+    """
+    texts = [el.get_text(" ", strip=True) for el in row.find_all(True)
+             if el.find(True) is None and el is not link and link not in el.parents]
+    texts.append(" ".join(t.strip() for t in row.find_all(string=True, recursive=False)).strip())
+    labelled = {m for text in texts for m in _LISTING_COUNT_RE.findall(text)}
+    if labelled:
+        return int(labelled.pop()) if len(labelled) == 1 else None
+    bare = [text for text in texts if _BARE_INT_RE.match(text)]
+    return int(bare[0]) if len(bare) == 1 else None
+
+
+def parse_school_listing(html: str, base_url: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Extrae los profesores de una página del listado de una escuela.
+
+    Cada enlace a /profesores/ se toma como un profesor; el número de
+    reseñas sale de su fila (o de su contenedor inmediato) con
+    _listing_count, y es None si no se puede leer sin ambigüedad. La
+    siguiente página se obtiene del enlace rel="next" o del botón
+    "Siguiente"/"»" de la paginación.
+
+    Args:
+        html: Contenido HTML de la página del listado
+        base_url: URL de la página (para resolver enlaces relativos)
+
+    Returns:
+        Tupla (lista de dicts con 'name', 'url' y 'review_count',
+        URL absoluta de la siguiente página o None)
+    """
+    s = BeautifulSoup(html, "lxml")
+    entries: List[Dict[str, Any]] = []
+    seen = set()
+    for a in s.select("a[href*='/profesores/']"):
+        url = urljoin(base_url, a["href"])
+        name = a.get_text(" ", strip=True)
+        if not name or url in seen:
+            continue
+        seen.add(url)
+
+        row = a.find_parent("tr") or a.parent
+        entries.append({
+            "name": name,
+            "url": url,
+            "review_count": _listing_count(row, a) if row else None,
+        })
+
+    nxt = s.select_one("a[rel='next']")
+    if nxt is None:
+        for a in s.select("ul.pagination li a, .pagination a"):
+            if a.get_text(strip=True).lower() in ("siguiente", "»", "›", ">"):
+                nxt = a
+                break
+    next_url = urljoin(base_url, nxt["href"]) if nxt is not None and nxt.get("href") else None
+    return entries, next_url
@@ -0,0 +1,181 @@
+"""
+Re-parseo sin red de las páginas HTML archivadas.
+
+Cuando cambian parse_profile/parse_reviews o el mapeo de cursos, reconstruye
+los datos a partir de data/outputs/archive en lugar de volver a scrapear:
+- toma el perfil de la última versión de la página 1 y reúne las reseñas de
+  todas las versiones archivadas de cada página (sin repetirlas)
+- parsea en un pool de procesos (el parseo con BeautifulSoup es CPU)
+- guarda el JSON y actualiza los datos del profesor en la base de datos con
+  guardar_profesor_completo(reparseo=...): corrige su último perfil,
+  actualiza en su lugar las reseñas ya guardadas (con el mapeo de cursos
+  vigente), inserta las que falten y no agrega filas de perfil ni de
+  historial de scraping. Solo si las reseñas reunidas coinciden con el
+  contador del perfil ("reemplazar") borra las que ya no están; si no
+  ("actualizar"), no borra nada
+
+Uso:
+    python -m src.cli reparse
+    python -m src.cli reparse --name "Josue Padilla Cuevas" --workers 8
+"""
+import asyncio
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from slugify import slugify
+
+from ..core.archive import HtmlArchive, get_html_archive
+from .parser import ParsedPage, parse_reviews, review_key
+from .scrape_prof import DB_ENABLED, _save_json
+
+if DB_ENABLED:
+    from ..db.repository import guardar_profesor_completo
+
+
+def _parse_professor(job: Tuple[str, Path, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Parsea las páginas archivadas de un profesor (se ejecuta en un proceso hijo).
+
+    El perfil y el número de páginas salen de la última descarga de la página
+    1. Si la última versión de cada página no reúne el contador del perfil,
+    se agregan las reseñas de las versiones anteriores: las corridas
+    incrementales solo re-descargan las primeras páginas, así que una reseña
+    que se desplazó de la página 1 a la 2 solo aparece en la versión anterior
+    de la página 1. Una reseña repetida entre versiones se cuenta una vez por
+    clave (review_key), pero se conservan las reseñas idénticas que aparecen
+    juntas en una misma página.
+
+    Cada proceso lee y descomprime sus propios objetos, de modo que al pool
+    solo viajan hashes y el resultado ya parseado.
+
+    Args:
+        job: Tupla (slug, raíz del archivo, entradas del índice en orden de descarga)
+
+    Returns:
+        Dict con 'slug', 'prof' (estructura de find_and_scrape), 'pages',
+        'missing' (páginas esperadas que no están archivadas) y 'complete'
+        (True si las reseñas reunidas coinciden con el contador del perfil)
+    """
+    slug, root, entries = job
+    archive = HtmlArchive(root)
+    latest = {e["page"]: e for e in entries}
+
+    first = ParsedPage(archive.get(latest[1]["sha256"]))
+    prof = first.profile
+    pages = first.page_count
+
+    reviews: List[Dict[str, Any]] = []
+    emitted: Counter = Counter()
+    parsed = set()
+
+    def _collect(versions: List[Dict[str, Any]]) -> None:
+        for entry in versions:
+            if entry["sha256"] in parsed:
+                continue
+            parsed.add(entry["sha256"])
+            page_reviews = first.reviews if entry is latest[1] else parse_reviews(archive.get(entry["sha256"]))
+            in_page: Counter = Counter()
+            for review in page_reviews:
+                key = review_key(review)
+                in_page[key] += 1
+                if in_page[key] > emitted[key]:
+                    emitted[key] += 1
+                    reviews.append(review)
+
+    # Versiones vigentes en orden de página; si no alcanzan el contador del
+    # perfil, las anteriores de la más nueva a la más vieja (si ya lo alcanzan,
+    # las anteriores solo revivirían reseñas borradas en el sitio)
+    _collect([latest[p] for p in sorted(latest)])
+    if len(reviews) != first.review_count:
+        _collect([e for e in reversed(entries) if e is not latest[e["page"]]])
+
+    # Orden del sitio (más nuevas primero); sort es estable para la misma fecha
+    reviews.sort(key=lambda r: r.get("date") or "", reverse=True)
+
+    prof["reviews"] = reviews
+    prof["url_misprofesores"] = latest[1].get("url")
+    prof["cached"] = False
+    return {
+        "slug": slug,
+        "prof": prof,
+        "pages": pages,
+        "missing": [p for p in range(1, pages + 1) if p not in latest],
+        "complete": first.review_count is not None and len(reviews) == first.review_count,
+        "review_count": first.review_count,
+    }
+
+
+async def reparse_archive(names: Optional[List[str]] = None, workers: Optional[int] = None,
+                          archive: Optional[HtmlArchive] = None) -> Dict[str, int]:
+    """
+    Reconstruye JSON y base de datos a partir del archivo HTML.
+
+    Args:
+        names: Profesores a re-parsear (default: todos los archivados)
+        workers: Procesos del pool (default: número de CPUs)
+        archive: Archivo a leer (default: el compartido del proceso)
+
+    Returns:
+        Dict con conteos 'parsed', 'incomplete' (reseñas reunidas distintas
+        del contador del perfil), 'saved_db' y 'errors'
+    """
+    archive = archive or get_html_archive()
+    versions = archive.versions()
+    if names is not None:
+        wanted = {slugify(n) for n in names}
+        versions = {slug: entries for slug, entries in versions.items() if slug in wanted}
+    jobs = [(slug, archive.root, entries) for slug, entries in sorted(versions.items())
+            if any(e["page"] == 1 for e in entries)]
+
+    stats = {"parsed": 0, "incomplete": 0, "saved_db": 0, "errors": 0}
+    if not jobs:
+        print("⚠ No hay páginas archivadas para re-parsear")
+        return stats
+
+    workers = workers or os.cpu_count() or 1
+    print(f"⚙ Re-parseando {len(jobs)} profesores desde {archive.root} con {workers} procesos...")
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {loop.run_in_executor(pool, _parse_professor, job): job[0] for job in jobs}
+        for future in asyncio.as_completed(futures):
+            try:
+                result = await future
+            except Exception as e:
+                stats["errors"] += 1
+                print(f"❌ Error al re-parsear: {type(e).__name__}: {e}")
+                continue
+
+            slug, prof = result["slug"], result["prof"]
+            _save_json(slug, prof)
+            stats["parsed"] += 1
+            if result["complete"]:
+                print(f"✓ {slug}: {len(prof['reviews'])} reseñas en {result['pages']} páginas")
+            else:
+                stats["incomplete"] += 1
+                print(f"⚠ {slug}: {len(prof['reviews'])} de {result['review_count']} reseñas "
+                      f"(páginas sin archivar: {result['missing'] or 'ninguna'}); "
+                      f"en BD solo se actualizan e insertan")
+
+            if DB_ENABLED:
+                # Solo un conjunto completo puede borrar reseñas que no aparecen
+                modo = "reemplazar" if result["complete"] else "actualizar"
+                try:
+                    await guardar_profesor_completo(prof, url_misprofesores=prof["url_misprofesores"],
+                                                    reparseo=modo, slug_uam=slug)
+                    stats["saved_db"] += 1
+                except Exception as e:
+                    print(f"⚠ Error al guardar {slug} en BD: {e}")
+
+    print("\n" + "="*80)
+    print("RESUMEN DE RE-PARSEO")
+    print("="*80)
+    print(f"Profesores re-parseados: {stats['parsed']}")
+    print(f"Incompletos (sin borrar en BD): {stats['incomplete']}")
+    print(f"Guardados en BD: {stats['saved_db']}")
+    print(f"Errores: {stats['errors']}")
+    print("="*80)
+    return stats
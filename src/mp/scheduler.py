@@ -0,0 +1,314 @@
+"""
+Priorización y modelo de costo de profesores para scrape-all.
+
+Ordena a los profesores por el valor esperado de volver a visitarlos en lugar
+de recorrer el archivo de entrada en orden. Para cada profesor se estima:
+
+- Antigüedad: días desde el último éxito (scraping o sondeo) en
+  historial_scraping; sin base de datos se usa la última verificación del
+  caché de URLs o la fecha del JSON cacheado.
+- Ritmo de reseñas: reseñas por año en la ventana SCHED_RATE_WINDOW_DAYS,
+  calculado con las fechas de las reseñas cacheadas (o con las reseñas
+  nuevas registradas en el historial si no hay JSON).
+- Fallas recientes: errores en historial_scraping y en las bitácoras de
+  las corridas de los últimos SCHED_FAILURE_DAYS días.
+
+El valor es la probabilidad de encontrar al menos una reseña nueva,
+1 - exp(-ritmo * antigüedad), penalizada por cada falla reciente. Un
+profesor que nunca se ha scrapeado tiene valor 1.
+
+El costo esperado de cada profesor (segundos) combina el costo de un sondeo
+sin cambios y el de un scraping completo, ponderados por ese mismo valor. El
+scraping completo se estima con la última duración observada del profesor en
+las bitácoras o, si no la hay, con una recta base + segundos/página ajustada
+por mínimos cuadrados sobre las corridas recientes. El costo permite ordenar
+la corrida de mayor a menor (LPT) y estimar el tiempo restante.
+
+Configuración por variables de entorno:
+    SCHED_RATE_WINDOW_DAYS: Ventana para estimar el ritmo (default: 730)
+    SCHED_PRIOR_PER_YEAR: Ritmo mínimo supuesto por profesor (default: 0.5)
+    SCHED_FAILURE_DAYS: Ventana de fallas recientes (default: 14)
+    SCHED_FAILURE_PENALTY: Factor por cada falla reciente (default: 0.5)
+    COST_HISTORY_DAYS: Días de bitácoras usados por el modelo (default: 90)
+    COST_BASE_S / COST_PAGE_S: Costo inicial por profesor y por página
+                               mientras no hay historial (default: 3 / 1.5)
+"""
+import json
+import math
+import statistics
+import time
+from datetime import date, datetime
+from os import getenv
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from slugify import slugify
+
+from ..core.journal import recent_events, recent_failures
+from .scrape_prof import DB_ENABLED, JSON_OUTPUT_DIR
+from .url_cache import get_url_cache
+
+if DB_ENABLED:
+    from ..db.repository import obtener_estadisticas_scraping
+
+load_dotenv()
+RATE_WINDOW_DAYS = int(getenv("SCHED_RATE_WINDOW_DAYS", "730"))
+PRIOR_PER_YEAR = float(getenv("SCHED_PRIOR_PER_YEAR", "0.5"))
+FAILURE_DAYS = int(getenv("SCHED_FAILURE_DAYS", "14"))
+FAILURE_PENALTY = float(getenv("SCHED_FAILURE_PENALTY", "0.5"))
+COST_HISTORY_DAYS = int(getenv("COST_HISTORY_DAYS", "90"))
+COST_BASE_S = float(getenv("COST_BASE_S", "3"))
+COST_PAGE_S = float(getenv("COST_PAGE_S", "1.5"))
+
+# Reseñas por página en MisProfesores.com
+REVIEWS_PER_PAGE = 5
+
+# Muestras mínimas para ajustar la recta del modelo de costo
+_MIN_FIT_SAMPLES = 5
+
+
+class ProfessorSignals:
+    """Señales de un profesor usadas para calcular su prioridad."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.last_success: Optional[datetime] = None
+        self.reviews_per_year = 0.0
+        self.recent_failures = 0
+        self.pages: Optional[int] = None
+        self.last_durations: Dict[str, float] = {}
+        self.value = 0.0
+        self.cost = 0.0
+
+    def staleness_days(self, now: datetime) -> Optional[float]:
+        """Días desde el último éxito (None si nunca se ha scrapeado)."""
+        if self.last_success is None:
+            return None
+        return max(0.0, (now - self.last_success).total_seconds() / 86400)
+
+    def score(self, now: datetime) -> float:
+        """
+        Calcula el valor esperado de visitar al profesor ahora.
+
+        Args:
+            now: Momento de referencia
+
+        Returns:
+            Valor entre 0 y 1 (mayor es más prioritario)
+        """
+        staleness = self.staleness_days(now)
+        if staleness is None:
+            value = 1.0
+        else:
+            rate = (self.reviews_per_year + PRIOR_PER_YEAR) / 365
+            value = 1 - math.exp(-rate * staleness)
+        return value * FAILURE_PENALTY ** self.recent_failures
+
+
+def _cached_signals(sig: ProfessorSignals, today: date) -> None:
+    """Completa antigüedad y ritmo de reseñas desde el JSON cacheado."""
+    json_file = JSON_OUTPUT_DIR / f"{slugify(sig.name)}.json"
+    if not json_file.exists():
+        return
+    if sig.last_success is None:
+        sig.last_success = datetime.fromtimestamp(json_file.stat().st_mtime)
+    try:
+        reviews = json.loads(json_file.read_text(encoding="utf-8")).get("reviews", [])
+    except (json.JSONDecodeError, IOError):
+        return
+    if sig.pages is None:
+        sig.pages = max(1, math.ceil(len(reviews) / REVIEWS_PER_PAGE))
+    recent = 0
+    for review in reviews:
+        try:
+            age = (today - date.fromisoformat(review.get("date") or "")).days
+        except ValueError:
+            continue
+        if 0 <= age <= RATE_WINDOW_DAYS:
+            recent += 1
+    sig.reviews_per_year = recent * 365 / RATE_WINDOW_DAYS
+
+
+class CostModel:
+    """
+    Modelo de costo (segundos) de procesar a un profesor.
+
+    Example:
+        model = CostModel()
+        model.fit(list(recent_events(90)))
+        segundos = model.estimate(sig)
+    """
+
+    def __init__(self, base_s: float = COST_BASE_S, page_s: float = COST_PAGE_S):
+        self.base_s = base_s
+        self.page_s = page_s
+        self.cache_s = base_s
+        self.samples = 0
+
+    def fit(self, events: List[Dict[str, Any]]) -> None:
+        """
+        Ajusta base + segundos/página y el costo de un sondeo sin cambios.
+
+        Args:
+            events: Eventos de bitácora con duration_s y pages
+        """
+        scraped = [(e["pages"], e["duration_s"]) for e in events
+                   if e.get("outcome") == "scrapeado" and e.get("pages") and e.get("duration_s")]
+        cached = [e["duration_s"] for e in events
+                  if e.get("outcome") == "cache" and e.get("duration_s")]
+        if cached:
+            self.cache_s = statistics.median(cached)
+        self.samples = len(scraped)
+        if len(scraped) < _MIN_FIT_SAMPLES:
+            return
+        xs = [p for p, _ in scraped]
+        ys = [d for _, d in scraped]
+        mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+        var_x = sum((x - mean_x) ** 2 for x in xs)
+        if var_x > 0:
+            slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+            self.page_s = max(0.0, slope)
+        self.base_s = max(0.0, mean_y - self.page_s * mean_x)
+
+    def estimate(self, sig: ProfessorSignals) -> float:
+        """
+        Estima los segundos que tomará procesar a un profesor.
+
+        Args:
+            sig: Señales del profesor con value ya calculado
+
+        Returns:
+            Costo esperado en segundos
+        """
+        scrape_s = sig.last_durations.get("scrapeado") or (
+            self.base_s + self.page_s * (sig.pages or 1)
+        )
+        if sig.last_success is None:
+            return scrape_s
+        cache_s = sig.last_durations.get("cache") or self.cache_s
+        return (1 - sig.value) * cache_s + sig.value * scrape_s
+
+
+async def load_signals(names: List[str]) -> Dict[str, ProfessorSignals]:
+    """
+    Reúne las señales de prioridad de cada profesor.
+
+    Usa historial_scraping si la base de datos está disponible y, en
+    cualquier caso, el caché de URLs, los JSON cacheados y las bitácoras
+    de corridas anteriores.
+
+    Args:
+        names: Nombres de los profesores de la corrida
+
+    Returns:
+        Dict nombre → ProfessorSignals
+    """
+    stats: Dict[str, Dict[str, Any]] = {}
+    if DB_ENABLED:
+        try:
+            stats = await obtener_estadisticas_scraping(FAILURE_DAYS)
+        except Exception as e:
+            print(f"⚠ No se pudo leer historial_scraping para priorizar: {e}")
+
+    url_cache = get_url_cache()
+    failures = recent_failures(FAILURE_DAYS)
+    last_durations: Dict[str, Dict[str, float]] = {}
+    for event in recent_events(COST_HISTORY_DAYS):
+        if event.get("duration_s"):
+            last_durations.setdefault(event["professor"], {})[event["outcome"]] = event["duration_s"]
+    today = date.today()
+    signals: Dict[str, ProfessorSignals] = {}
+
+    for name in names:
+        sig = ProfessorSignals(name)
+        row = stats.get(slugify(name))
+        if row:
+            sig.last_success = row["ultimo_exito"]
+            sig.recent_failures = row["errores_recientes"]
+        entry = url_cache.entries.get(slugify(name))
+        if sig.last_success is None and entry and entry.get("verified_at"):
+            sig.last_success = datetime.fromisoformat(entry["verified_at"])
+        if entry and entry.get("review_count") is not None:
+            sig.pages = max(1, math.ceil(entry["review_count"] / REVIEWS_PER_PAGE))
+        _cached_signals(sig, today)
+        if not sig.reviews_per_year and row and row["primer_exito"]:
+            span_days = max(1.0, (datetime.now() - row["primer_exito"]).days)
+            sig.reviews_per_year = row["resenias_nuevas"] * 365 / span_days
+        sig.recent_failures += failures.get(name, 0)
+        sig.last_durations = last_durations.get(name, {})
+        signals[name] = sig
+
+    return signals
+
+
+async def rank_professors(names: List[str]) -> List[ProfessorSignals]:
+    """
+    Ordena los profesores del más al menos prioritario y estima su costo.
+
+    Args:
+        names: Nombres de los profesores de la corrida
+
+    Returns:
+        Lista de ProfessorSignals (con value y cost) ordenada por valor
+        descendente; los empates conservan el orden del archivo de entrada
+    """
+    signals = await load_signals(names)
+    model = CostModel()
+    model.fit(list(recent_events(COST_HISTORY_DAYS)))
+    now = datetime.now()
+    for sig in signals.values():
+        sig.value = sig.score(now)
+        sig.cost = model.estimate(sig)
+    return sorted((signals[name] for name in names), key=lambda s: s.value, reverse=True)
+
+
+class RunProgress:
+    """
+    Progreso de una corrida con throughput y ETA según el modelo de costo.
+
+    El tiempo restante es la suma de costos estimados pendientes, corregida
+    por la razón real/estimado observada hasta el momento y dividida entre
+    el número de workers.
+    """
+
+    def __init__(self, costs: Dict[str, float], workers: int):
+        self.costs = costs
+        self.workers = max(1, workers)
+        self.remaining = sum(costs.values())
+        self.done = 0
+        self.predicted_done = 0.0
+        self.actual_done = 0.0
+        self.started = time.monotonic()
+
+    def add(self, costs: Dict[str, float]) -> None:
+        """
+        Agrega profesores encolados después de iniciar la corrida.
+
+        Args:
+            costs: Dict nombre → costo estimado en segundos
+        """
+        self.costs.update(costs)
+        self.remaining += sum(costs.values())
+
+    def finish(self, name: str, duration_s: float) -> str:
+        """
+        Registra un profesor terminado y genera la línea de progreso.
+
+        Args:
+            name: Nombre del profesor
+            duration_s: Segundos que tomó procesarlo
+
+        Returns:
+            Línea con avance, throughput y ETA
+        """
+        predicted = self.costs.get(name, 0.0)
+        self.remaining = max(0.0, self.remaining - predicted)
+        self.predicted_done += predicted
+        self.actual_done += duration_s
+        self.done += 1
+        elapsed = time.monotonic() - self.started
+        ratio = self.actual_done / self.predicted_done if self.predicted_done else 1.0
+        eta = self.remaining * ratio / self.workers
+        rate = self.done / elapsed * 60 if elapsed else 0.0
+        return (f"  ⏱ {self.done}/{len(self.costs)} · {rate:.1f} prof/min · "
+                f"ETA {int(eta // 60)}m{int(eta % 60):02d}s")
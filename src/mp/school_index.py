@@ -0,0 +1,205 @@
+"""
+Índice de perfiles a partir del listado de la escuela en MisProfesores.com
+
+En lugar de una búsqueda en /Buscar por profesor, recorre el listado
+paginado de la escuela (UAM Azcapotzalco por defecto) y obtiene en pocas
+peticiones la URL de cada perfil junto con su número de reseñas. Después
+empareja en bloque esos perfiles con los nombres del directorio UAM y
+siembra el caché de URLs:
+
+- Resolución de URLs: find_and_scrape encuentra la URL en el caché y no
+  pasa por /Buscar.
+- Frescura: si el número de reseñas del listado coincide con el JSON
+  cacheado y el listado es reciente, find_and_scrape no descarga el perfil.
+
+El listado completo se guarda en data/outputs/school_index.json.
+
+Configuración por variables de entorno:
+    MP_SCHOOL_URL: URL del listado de la escuela (si no se define, se busca
+                   la escuela por nombre en /Buscar)
+    MP_SCHOOL_MAX_PAGES: Máximo de páginas del listado a recorrer (default: 100)
+    MP_SCHOOL_MATCH_MIN: Confianza mínima para asociar un perfil a un
+                         nombre del directorio (default: 0.85)
+"""
+import json
+from datetime import datetime
+from os import getenv
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from rapidfuzz import fuzz
+from slugify import slugify
+
+from ..core.browser import get_browser_pool
+from ..core.resilience import get_policy
+from .parser import parse_school_listing
+from .scrape_prof import MP_ORIGIN, _goto, _norm, fetch_prof_html, to_origin
+from .url_cache import get_url_cache
+
+load_dotenv()
+SCHOOL_URL = getenv("MP_SCHOOL_URL", "")
+SCHOOL_MAX_PAGES = int(getenv("MP_SCHOOL_MAX_PAGES", "100"))
+SCHOOL_MATCH_MIN = float(getenv("MP_SCHOOL_MATCH_MIN", "0.85"))
+
+SCHOOL_INDEX_FILE = Path("data/outputs/school_index.json")
+
+
+async def find_school_url(school_hint: str) -> str:
+    """
+    Busca la escuela por nombre en /Buscar y obtiene la URL de su listado.
+
+    Args:
+        school_hint: Nombre de la escuela (p. ej. "UAM (Azcapotzalco)")
+
+    Returns:
+        URL absoluta del listado de la escuela
+
+    Raises:
+        RuntimeError: Si la búsqueda no devuelve ninguna escuela
+    """
+    policy = get_policy("search")
+    async with get_browser_pool().page() as page:
+        await _goto(page, f"{MP_ORIGIN}/Buscar", policy)
+        search = page.locator("input[type='text'], input[role='combobox']").first
+        await search.fill(school_hint)
+        await page.keyboard.press("Enter")
+        await page.wait_for_selector("a[href*='/escuelas/']", timeout=policy.selector_ms)
+        cands = page.locator("a[href*='/escuelas/']")
+
+        best_href, best = None, -1.0
+        target = _norm(school_hint)
+        for i in range(await cands.count()):
+            txt = _norm(await cands.nth(i).inner_text())
+            score = fuzz.token_set_ratio(txt, target)
+            if score > best:
+                best_href, best = await cands.nth(i).get_attribute("href"), score
+
+    if not best_href:
+        raise RuntimeError(f"No se encontró la escuela: {school_hint}")
+    return to_origin(best_href) if best_href.startswith("http") else f"{MP_ORIGIN}{best_href}"
+
+
+async def crawl_school(school_url: str) -> List[Dict[str, Any]]:
+    """
+    Recorre el listado paginado de una escuela.
+
+    Args:
+        school_url: URL de la primera página del listado
+
+    Returns:
+        Lista de dicts con 'name', 'url' y 'review_count' (sin duplicados)
+    """
+    entries: Dict[str, Dict[str, Any]] = {}
+    url: Optional[str] = school_url
+    visited = set()
+    while url and url not in visited and len(visited) < SCHOOL_MAX_PAGES:
+        visited.add(url)
+        page = await fetch_prof_html(url, kind="school")
+        page_entries, url = parse_school_listing(page.html, url)
+        url = to_origin(url) if url else None
+        for entry in page_entries:
+            entry["url"] = to_origin(entry["url"])
+        new = [e for e in page_entries if e["url"] not in entries]
+        for entry in new:
+            entries[entry["url"]] = entry
+        print(f"  ✓ Listado página {len(visited)}: {len(new)} perfiles nuevos")
+        if not new:
+            break
+    return list(entries.values())
+
+
+def match_names(names: List[str],
+                entries: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any], float]]:
+    """
+    Empareja nombres del directorio con perfiles del listado (uno a uno).
+
+    Calcula la similitud token_sort_ratio entre todos los pares y asigna de
+    mayor a menor similitud, de modo que cada perfil se use una sola vez.
+
+    Args:
+        names: Nombres de profesores del directorio UAM
+        entries: Perfiles del listado de la escuela
+
+    Returns:
+        Lista de tuplas (nombre, perfil, confianza 0-1) con confianza
+        mayor o igual a MP_SCHOOL_MATCH_MIN
+    """
+    norm_entries = [_norm(e["name"].replace(",", " ")) for e in entries]
+    pairs = []
+    for name in names:
+        target = _norm(name)
+        for j, cand in enumerate(norm_entries):
+            score = fuzz.token_sort_ratio(target, cand) / 100
+            if score >= SCHOOL_MATCH_MIN:
+                pairs.append((score, name, j))
+
+    pairs.sort(key=lambda p: p[0], reverse=True)
+    used_names, used_entries = set(), set()
+    matches = []
+    for score, name, j in pairs:
+        if name in used_names or j in used_entries:
+            continue
+        used_names.add(name)
+        used_entries.add(j)
+        matches.append((name, entries[j], score))
+    return matches
+
+
+async def build_school_index(names: List[str], school_hint: str = "UAM (Azcapotzalco)",
+                             school_url: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Construye el índice de la escuela y siembra el caché de URLs.
+
+    Las entradas existentes con la misma URL conservan sus validadores y solo
+    reciben el conteo del listado. Una URL distinta solo reemplaza a la
+    existente si esta no viene de la búsqueda o si el match del listado es al
+    menos igual de confiable; al reemplazarla se descartan etag y
+    last_modified (son de la URL anterior). Las entradas nuevas se registran
+    con source="school".
+
+    Args:
+        names: Nombres de profesores del directorio UAM
+        school_hint: Nombre de la escuela (si no hay MP_SCHOOL_URL)
+        school_url: URL del listado (tiene prioridad sobre MP_SCHOOL_URL)
+
+    Returns:
+        Dict con 'school_url', 'listed_at', 'entries' y 'matched'
+    """
+    school_url = school_url or SCHOOL_URL or await find_school_url(school_hint)
+    print(f"⚙ Recorriendo listado de la escuela: {school_url}")
+    entries = await crawl_school(school_url)
+    matches = match_names(names, entries)
+    listed_at = datetime.now().isoformat(timespec="seconds")
+
+    cache = get_url_cache()
+    kept = 0
+    for name, entry, score in matches:
+        current = cache.entries.get(slugify(name))
+        listing = {"listing_count": entry["review_count"], "listed_at": listed_at}
+        if current and current.get("url") == entry["url"]:
+            current.update(listing)
+            continue
+        if current and current.get("source") == "search" and score < current.get("confidence", 0):
+            # Un match difuso del listado no reemplaza una búsqueda más confiable
+            kept += 1
+            continue
+        # Los validadores de la URL anterior no aplican a la nueva: put los descarta
+        cache.put(name, entry["url"], confidence=score, source="school",
+                  autosave=False, **listing)
+    cache.save()
+    if kept:
+        print(f"⚠ {kept} URLs de búsqueda con mayor confianza se conservaron sobre el listado")
+
+    index = {
+        "school_url": school_url,
+        "listed_at": listed_at,
+        "entries": entries,
+        "matched": {name: entry["url"] for name, entry, _ in matches},
+    }
+    SCHOOL_INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+    SCHOOL_INDEX_FILE.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    print(f"✓ Listado: {len(entries)} perfiles; emparejados {len(matches)} de {len(names)} nombres")
+    print(f"✓ Índice guardado en {SCHOOL_INDEX_FILE}")
+    return index
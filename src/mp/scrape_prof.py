@@ -1,40 +1,96 @@
 """
 Módulo para realizar scraping de perfiles y reseñas de profesores en MisProfesores.com
 
-Este módulo utiliza Playwright para navegar y extraer información de profesores,
-incluyendo sus calificaciones, etiquetas y reseñas de estudiantes.
+Este módulo utiliza Playwright para buscar profesores y un cliente HTTP (con
+Playwright como respaldo) para descargar sus perfiles, incluyendo sus
+calificaciones, etiquetas y reseñas de estudiantes.
 
 Características:
-- Caché inteligente: Detecta si el número de reseñas no ha cambiado
-- Persistencia: Guarda HTML y JSON en disco
+- Caché inteligente: Detecta con un sondeo exacto si el número de reseñas no ha cambiado
+- Persistencia: Guarda JSON en disco y todas las páginas HTML en un archivo
+  comprimido y deduplicado (core.archive)
 - Scraping eficiente: Evita re-scraping innecesario
 """
 import asyncio
 import json
-import random
+import re
+import time
+import unicodedata
+from datetime import datetime
+from os import getenv
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
 from slugify import slugify
 
-from tenacity import retry, wait_random_exponential, stop_after_attempt
-from ..core.browser import browser_ctx
-from .parser import parse_profile, parse_reviews, page_count
+import httpx
+from dotenv import load_dotenv
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from rapidfuzz import fuzz
+from ..core.archive import get_html_archive
+from ..core.browser import get_browser_pool, close_browser_pool
+from ..core.http import get_http_client, close_http_client
+from ..core.metrics import stage
+from ..core.rate_limit import get_rate_limiter
+from ..core.resilience import StagePolicy, get_circuit_breaker, get_policy
+from .js_extract import Fetched, extract_field, extract_page
+from .parser import ParsedPage, review_key
+from .url_cache import get_url_cache
 
 # Importar funciones de persistencia
 try:
-    from ..db.repository import guardar_profesor_completo
+    from ..db.repository import guardar_profesor_completo, obtener_url_misprofesores, registrar_sondeo
     DB_ENABLED = True
 except ImportError:
     DB_ENABLED = False
     print("⚠ Advertencia: Módulo de base de datos no disponible. Solo se guardará JSON.")
 
-BASE = "https://www.misprofesores.com"
-
-# Directorios de salida
-HTML_OUTPUT_DIR = Path("data/outputs/html")
+load_dotenv()
+
+# Origen real del sitio. Las URLs se guardan siempre con este origen (caché de
+# URLs, JSON, BD) y se traducen a BASE solo al descargarlas, de modo que BASE
+# puede apuntar al servidor de reproducción local (core.replay)
+MP_ORIGIN = "https://www.misprofesores.com"
+BASE = getenv("MP_BASE_URL", MP_ORIGIN).rstrip("/")
+
+# Backend de descarga por etapa: "http" (cliente httpx, sin JS) o "browser" (Playwright).
+# La búsqueda en /Buscar requiere JavaScript y siempre usa el navegador.
+FETCH_BACKENDS = {
+    "profile": getenv("MP_PROFILE_BACKEND", "http").lower(),
+    "reviews": getenv("MP_REVIEWS_BACKEND", "http").lower(),
+    "school": getenv("MP_SCHOOL_BACKEND", "http").lower(),
+}
+
+# Extracción de perfil y reseñas descargados con el navegador: "html" serializa
+# el DOM y lo parsea con BeautifulSoup, "js" extrae los campos dentro de la
+# página (js_extract) y solo transfiere el JSON resultante
+EXTRACT_MODE = getenv("MP_EXTRACT_MODE", "html").lower()
+EXTRACT_STAGES = ("profile", "reviews")
+
+# Páginas de reseñas descargadas en paralelo por profesor
+PAGE_CONCURRENCY = max(1, int(getenv("MP_PAGE_CONCURRENCY", "4")))
+
+# Scraping incremental: detenerse en la primera página con una reseña ya conocida
+INCREMENTAL = (getenv("MP_INCREMENTAL", "true").lower() == "true")
+
+# Antigüedad máxima (horas) del conteo del listado de la escuela para
+# considerar vigente el caché sin descargar el perfil (ver school_index)
+SCHOOL_INDEX_MAX_AGE_H = float(getenv("MP_SCHOOL_INDEX_MAX_AGE_H", "24"))
+
+# Selectores que confirman que la página trae el contenido esperado
+STAGE_SELECTORS = {
+    "profile": "div.rating-breakdown, div.rating-filter.togglable",
+    "reviews": "div.rating-filter.togglable table.tftable",
+    "school": "a[href*='/profesores/']",
+}
+
+# Directorio de salida de JSON (el HTML se guarda en core.archive)
 JSON_OUTPUT_DIR = Path("data/outputs/profesores")
 
 
+class ProfileNotFoundError(Exception):
+    """La URL del perfil respondió 404 (perfil eliminado o URL obsoleta)."""
+
+
 def _get_cached_data(prof_name: str) -> Optional[Dict[str, Any]]:
     """
     Obtiene datos cacheados de un profesor si existen.
@@ -56,22 +112,65 @@ def _get_cached_data(prof_name: str) -> Optional[Dict[str, Any]]:
     return None
 
 
-def _save_html(prof_name: str, html: str) -> Path:
+def _cache_for_url(prof_name: str, cached_data: Optional[Dict[str, Any]],
+                   profile_url: str) -> Optional[Dict[str, Any]]:
     """
-    Guarda el HTML de un profesor en disco.
+    Descarta el JSON cacheado si corresponde a otro perfil.
+
+    Si la URL del profesor cambió (p. ej. el índice de la escuela encontró
+    otro perfil), el contador y las reseñas del JSON son del perfil anterior
+    y no sirven para decidir la frescura ni como base incremental.
 
     Args:
         prof_name: Nombre del profesor
-        html: Contenido HTML a guardar
+        cached_data: JSON cacheado (o None)
+        profile_url: URL del perfil que se va a sondear
 
     Returns:
-        Path del archivo guardado
+        cached_data, o None si su url_misprofesores es otra
     """
-    HTML_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    cached_url = (cached_data or {}).get("url_misprofesores")
+    if cached_url and to_origin(cached_url) != to_origin(profile_url):
+        print(f"↺ La URL de {prof_name} cambió ({cached_url} → {profile_url}); "
+              f"se ignora el caché JSON")
+        return None
+    return cached_data
+
+
+def _page_html(fetched: Fetched) -> Optional[str]:
+    """HTML de una página descargada (None si es un extracto JS)."""
+    if isinstance(fetched, ParsedPage):
+        return fetched.html
+    return fetched if isinstance(fetched, str) else None
+
+
+def _archive_pages(prof_name: str, profile_url: str, html_pages: List[Fetched]) -> int:
+    """
+    Guarda todas las páginas descargadas de un profesor en el archivo HTML.
+
+    Las páginas se comprimen y se direccionan por hash, de modo que una página
+    sin cambios respecto a corridas anteriores no ocupa espacio adicional.
+    Las páginas extraídas en el navegador (MP_EXTRACT_MODE=js) no tienen HTML
+    y no se archivan.
+
+    Args:
+        prof_name: Nombre del profesor
+        profile_url: URL del perfil (página 1)
+        html_pages: HTML (o extracto JS) de las páginas 1..N en orden
+
+    Returns:
+        Número de páginas con contenido nuevo en el archivo
+    """
+    archive = get_html_archive()
     slug = slugify(prof_name)
-    html_file = HTML_OUTPUT_DIR / f"{slug}.html"
-    html_file.write_text(html, encoding="utf-8")
-    return html_file
+    stored = 0
+    for page, fetched in enumerate(html_pages, start=1):
+        html = _page_html(fetched)
+        if html is None:
+            continue
+        url = profile_url if page == 1 else f"{profile_url}?pag={page}"
+        stored += archive.put(slug, page, html, url=url)["stored"]
+    return stored
 
 
 def _save_json(prof_name: str, data: Dict[str, Any]) -> Path:
@@ -95,187 +194,696 @@ def _save_json(prof_name: str, data: Dict[str, Any]) -> Path:
     return json_file
 
 
+def to_base(url: str) -> str:
+    """Traduce una URL del sitio real al origen configurado en MP_BASE_URL."""
+    if BASE != MP_ORIGIN and url.startswith(MP_ORIGIN):
+        return BASE + url[len(MP_ORIGIN):]
+    return url
+
+
+def to_origin(url: str) -> str:
+    """Traduce una URL servida desde MP_BASE_URL a su forma en el sitio real."""
+    if BASE != MP_ORIGIN and url.startswith(BASE):
+        return MP_ORIGIN + url[len(BASE):]
+    return url
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Interpreta el encabezado Retry-After (solo la forma en segundos)."""
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _healthy(status: Optional[int]) -> bool:
+    """Indica si un código de respuesta cuenta como éxito para el circuit breaker."""
+    return status is not None and status != 429 and status < 500
+
+
+async def _goto(page, url: str, policy: Optional[StagePolicy] = None):
+    """
+    Navega a una URL respetando el circuit breaker y el limitador del host.
+
+    Informa al limitador la latencia y el código de respuesta (o el timeout)
+    para que ajuste la tasa del host, y al circuit breaker si la navegación
+    falló.
+
+    Args:
+        page: Instancia de página de Playwright
+        url: URL a navegar
+        policy: Política de la etapa (timeout de navegación); default: profile
+
+    Returns:
+        Response de Playwright de la navegación (o None)
+    """
+    url = to_base(url)
+    policy = policy or get_policy("profile")
+    breaker = get_circuit_breaker()
+    await breaker.before(url)
+    limiter = get_rate_limiter()
+    await limiter.acquire(url)
+    inicio = time.perf_counter()
+    try:
+        with stage("navigation"):
+            response = await page.goto(url, wait_until="domcontentloaded", timeout=policy.goto_ms)
+    except PlaywrightTimeoutError:
+        limiter.record(url, time.perf_counter() - inicio, timeout=True)
+        breaker.record(url, ok=False)
+        raise
+    except Exception:
+        breaker.record(url, ok=False)
+        raise
+    status = response.status if response is not None else None
+    retry_after = _retry_after(response.headers.get("retry-after")) if response is not None else None
+    limiter.record(url, time.perf_counter() - inicio, status=status, retry_after_s=retry_after)
+    breaker.record(url, ok=response is None or _healthy(status))
+    return response
+
+
 async def open_with_backoff(page, url: str) -> None:
     """
-    Abre una URL con un tiempo de espera aleatorio para evitar detección.
+    Abre una URL respetando el limitador adaptativo del host.
 
     Args:
         page: Instancia de página de Playwright
         url: URL a navegar
     """
-    await page.goto(url, wait_until="domcontentloaded", timeout=45000)
-    await page.wait_for_timeout(400 + int(600 * random.random()))
+    await _goto(page, url)
+
 
-@retry(wait=wait_random_exponential(min=1, max=8), stop=stop_after_attempt(4))
-async def fetch_prof_html(ctx, prof_url: str) -> str:
+async def _http_get(url: str, headers: Optional[Dict[str, str]] = None,
+                    policy: Optional[StagePolicy] = None) -> httpx.Response:
     """
-    Obtiene el HTML de la página de un profesor con reintentos automáticos.
+    Realiza un GET con el cliente HTTP compartido respetando el circuit
+    breaker y el limitador del host.
 
-    Utiliza tenacity para reintentar la petición con backoff exponencial
-    en caso de fallos temporales de red o timeouts.
+    Informa al limitador la latencia y el código de respuesta (o el timeout)
+    para que ajuste la tasa del host, y al circuit breaker si la petición
+    falló.
 
     Args:
-        ctx: Contexto del navegador de Playwright
-        prof_url: URL del perfil del profesor
+        url: URL a descargar
+        headers: Encabezados adicionales de la petición
+        policy: Política de la etapa (timeout de la petición); default: profile
 
     Returns:
-        str: Contenido HTML de la página
+        httpx.Response: Respuesta del servidor (sin validar el código)
+    """
+    url = to_base(url)
+    policy = policy or get_policy("profile")
+    breaker = get_circuit_breaker()
+    await breaker.before(url)
+    limiter = get_rate_limiter()
+    await limiter.acquire(url)
+    inicio = time.perf_counter()
+    try:
+        with stage("http"):
+            response = await get_http_client().get(url, headers=headers, timeout=policy.goto_s)
+    except httpx.TimeoutException:
+        limiter.record(url, time.perf_counter() - inicio, timeout=True)
+        breaker.record(url, ok=False)
+        raise
+    except httpx.TransportError:
+        breaker.record(url, ok=False)
+        raise
+    limiter.record(url, time.perf_counter() - inicio, status=response.status_code,
+                   retry_after_s=_retry_after(response.headers.get("Retry-After")))
+    breaker.record(url, ok=_healthy(response.status_code))
+    return response
+
+
+async def _fetch_http(url: str, policy: Optional[StagePolicy] = None) -> str:
+    """
+    Descarga una página con el cliente HTTP compartido (sin navegador).
+
+    Args:
+        url: URL a descargar
+        policy: Política de la etapa (timeout de la petición)
+
+    Returns:
+        str: Contenido HTML de la respuesta
 
     Raises:
-        Exception: Sí fallan todos los intentos después de 4 reintentos
+        ProfileNotFoundError: Si el servidor responde 404
+        httpx.HTTPStatusError: Si el servidor responde con otro código de error
     """
-    page = await ctx.new_page()
-    await page.goto(prof_url, wait_until="domcontentloaded", timeout=45000)
-    html = await page.content()
-    await page.close()
-    return html
+    response = await _http_get(url, policy=policy)
+    if response.status_code == 404:
+        raise ProfileNotFoundError(url)
+    response.raise_for_status()
+    return response.text
+
 
-async def find_and_scrape(prof_name: str, school_hint: str = "UAM (Azcapotzalco)", force: bool = False) -> Dict[str, Any]:
+async def _fetch_browser(url: str, selector: str, policy: Optional[StagePolicy] = None,
+                         extract: bool = False) -> Fetched:
     """
-    Busca un profesor por nombre y extrae su perfil completo con todas sus reseñas.
+    Descarga una página con Playwright esperando a que aparezca el selector.
 
-    Implementa caché inteligente:
-    - Si el profesor ya fue scrapeado y el número de reseñas no ha cambiado, retorna caché
-    - Guarda HTML y JSON en disco para auditoría y análisis offline
-    - Permite forzar re-scraping con el parámetro force
+    Args:
+        url: URL a navegar
+        selector: Selector CSS que indica que la página terminó de cargar
+        policy: Política de la etapa (timeouts de navegación y selector);
+                default: profile
+        extract: Si True, devuelve el extracto de js_extract en lugar del HTML
 
-    Esta función realiza las siguientes operaciones:
-    1. Verifica si existe caché del profesor
-    2. Navega a la búsqueda de MisProfesores.com
-    3. Busca al profesor por nombre
-    4. Compara número de reseñas con caché (si existe)
-    5. Si no hay cambios, retorna caché (eficiencia)
-    6. Si hay cambios, extrae información completa
-    7. Guarda HTML y JSON en disco
+    Returns:
+        Contenido HTML renderizado, o el extracto JS si extract es True
+
+    Raises:
+        ProfileNotFoundError: Si el servidor responde 404
+    """
+    policy = policy or get_policy("profile")
+    async with get_browser_pool().page() as page:
+        response = await _goto(page, url, policy)
+        if response is not None and response.status == 404:
+            raise ProfileNotFoundError(url)
+        with stage("selector_wait"):
+            await page.wait_for_selector(selector, timeout=policy.selector_ms)
+        if extract:
+            return await extract_page(page)
+        return await page.content()
+
+
+async def fetch_prof_html(prof_url: str, kind: str = "profile") -> Fetched:
+    """
+    Obtiene el HTML de la página de un profesor con reintentos automáticos.
+
+    Es la vía rápida para perfiles y páginas de reseñas (?pag=N), que se
+    renderizan en el servidor. Si el backend de la etapa es "http", descarga
+    la página con el cliente HTTP compartido y solo recurre a Playwright
+    cuando faltan los selectores esperados. Si es "browser", usa directamente
+    una página del BrowserPool. La página se devuelve ya parseada
+    (ParsedPage), así que la verificación de selectores y la extracción
+    posterior comparten un solo parseo. Con MP_EXTRACT_MODE=js, los perfiles
+    y páginas de reseñas que pasan por el navegador se devuelven como
+    extracto JS (ver js_extract.extract_field para leer ambos formatos).
+
+    Reintenta con backoff exponencial según la política de la etapa
+    (RETRY_ATTEMPTS_<ETAPA>, TIMEOUT_*_S_<ETAPA>, ver core.resilience). Si el
+    circuit breaker del host está abierto, cada intento espera el
+    enfriamiento en lugar de agotar su timeout.
 
     Args:
-        prof_name: Nombre completo del profesor a buscar
-        school_hint: Escuela del profesor (por defecto "UAM (Azcapotzalco)")
-                    Disponible para filtrado manual si es necesario
-        force: Si True, fuerza re-scraping ignorando caché
+        prof_url: URL del perfil del profesor (o de una de sus páginas de reseñas)
+        kind: Etapa de descarga, "profile", "reviews" o "school" (listado de
+              una escuela); define backend y selectores
 
     Returns:
-        Dict con la estructura:
-            - name: Nombre del profesor
-            - overall_quality: Calificación general
-            - difficulty: Nivel de dificultad
-            - recommend_percent: Porcentaje de recomendación
-            - tags: Lista de etiquetas con conteos
-            - reviews: Lista completa de reseñas paginadas
-            - cached: True si se usó caché, False si se scrapeó
+        Página parseada (ParsedPage, con el HTML en .html), o su extracto JS
 
     Raises:
-        Exception: Si no se encuentra el profesor o hay errores de navegación
+        ProfileNotFoundError: Si la URL responde 404 (no se reintenta)
+        Exception: Si fallan todos los intentos de la política de la etapa
     """
-    # 1) Verificar caché existente
-    cached_data = None if force else _get_cached_data(prof_name)
+    policy = get_policy(kind)
+    selector = STAGE_SELECTORS[kind]
+    extract = EXTRACT_MODE == "js" and kind in EXTRACT_STAGES
+    async for attempt in policy.retrying(no_retry=(ProfileNotFoundError,)):
+        with attempt:
+            if FETCH_BACKENDS[kind] == "http":
+                page = ParsedPage(await _fetch_http(prof_url, policy))
+                if page.has_selector(selector):
+                    return page
+                print(f"  ↺ {prof_url}: faltan selectores en HTML plano, usando navegador")
+            fetched = await _fetch_browser(prof_url, selector, policy, extract)
+            return ParsedPage(fetched) if isinstance(fetched, str) else fetched
+
+
+async def probe_freshness(profile_url: str, cached_count: Optional[int],
+                          validators: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Sondea la página 1 del perfil para decidir si el caché sigue vigente.
+
+    La decisión es exacta: compara el contador de div.table-toggle.rating-count
+    con el número de reseñas en caché, sin paginar la tabla de reseñas. Con el
+    backend HTTP y validadores previos (ETag/Last-Modified) se envía una
+    petición condicional; un 304 confirma el caché sin descargar la página.
+    Reintenta según la política de la etapa "profile" (core.resilience).
 
-    # school_hint está disponible para filtrado manual si se requiere en el futuro
-    async with browser_ctx() as ctx:
-        # 2) Buscar profesor en el sitio con búsqueda robusta
-        page = await ctx.new_page()
+    Args:
+        profile_url: URL del perfil
+        cached_count: Número de reseñas en caché (None si no hay caché)
+        validators: Dict con 'etag' y/o 'last_modified' de la última descarga
+
+    Returns:
+        Dict con las claves:
+            - fresh: True si el caché está vigente
+            - result: 'sondeo_304', 'sondeo_sin_cambios' o 'sondeo_cambios'
+            - review_count: Reseñas reportadas por la página (o en caché si 304)
+            - page: ParsedPage (o extracto JS) de la página 1 (None si 304);
+                    el contador ya se leyó de él, así que el perfil y las
+                    reseñas no vuelven a parsear el HTML
+            - etag / last_modified: Validadores de la respuesta
+            - bytes: Bytes descargados
+            - ms: Duración del sondeo en milisegundos
 
-        # --- Búsqueda mejorada con navegación por href ---
-        import re
-        import unicodedata
+    Raises:
+        ProfileNotFoundError: Si la URL responde 404
+    """
+    policy = get_policy("profile")
+    async for attempt in policy.retrying(no_retry=(ProfileNotFoundError,)):
+        with attempt:
+            return await _probe_once(profile_url, cached_count, validators or {}, policy)
+
+
+async def _probe_once(profile_url: str, cached_count: Optional[int],
+                      validators: Dict[str, Any], policy: StagePolicy) -> Dict[str, Any]:
+    """Un intento de probe_freshness."""
+    inicio = time.perf_counter()
+    page: Optional[Fetched] = None
+    nbytes = 0
+    etag = validators.get("etag")
+    last_modified = validators.get("last_modified")
+
+    if FETCH_BACKENDS["profile"] == "http":
+        headers = {}
+        if cached_count is not None:
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        response = await _http_get(profile_url, headers=headers, policy=policy)
+        if response.status_code == 404:
+            raise ProfileNotFoundError(profile_url)
+        if response.status_code != 304:
+            response.raise_for_status()
+            page = ParsedPage(response.text)
+            nbytes = len(response.content)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if not page.has_selector(STAGE_SELECTORS["profile"]):
+                page = await _fetch_browser(profile_url, STAGE_SELECTORS["profile"], policy,
+                                            extract=EXTRACT_MODE == "js")
+    else:
+        page = await _fetch_browser(profile_url, STAGE_SELECTORS["profile"], policy,
+                                    extract=EXTRACT_MODE == "js")
+    if isinstance(page, str):
+        page = ParsedPage(page)
+
+    if page is None:
+        count = cached_count
+        result = "sondeo_304"
+    else:
+        if not nbytes:
+            html = _page_html(page)
+            body = html if html is not None else json.dumps(page, ensure_ascii=False)
+            nbytes = len(body.encode("utf-8"))
+        count = extract_field(page, "review_count")
+        result = "sondeo_sin_cambios" if cached_count is not None and count == cached_count else "sondeo_cambios"
+
+    return {
+        "fresh": result != "sondeo_cambios",
+        "result": result,
+        "review_count": count,
+        "page": page,
+        "etag": etag,
+        "last_modified": last_modified,
+        "bytes": nbytes,
+        "ms": int((time.perf_counter() - inicio) * 1000),
+    }
+
+
+async def _record_probe(prof_name: str, profile_url: str, probe: Dict[str, Any]) -> None:
+    """Registra el sondeo en historial_scraping sin interrumpir el scraping si falla."""
+    if not DB_ENABLED:
+        return
+    try:
+        await registrar_sondeo(
+            slugify(prof_name), profile_url, probe["result"], probe["review_count"],
+            probe["fresh"], probe["ms"], probe["bytes"]
+        )
+    except Exception as e:
+        print(f"⚠ No se pudo registrar el sondeo de {prof_name}: {e}")
+
+
+async def _fetch_review_pages(profile_url: str, pages: int, start: int = 2) -> List[Fetched]:
+    """
+    Descarga en paralelo las páginas de reseñas start..N de un profesor.
 
-        def _norm(s: str) -> str:
-            """Normaliza texto removiendo acentos, espacios extras y convirtiendo a minúsculas."""
-            s = unicodedata.normalize("NFKD", s)
-            s = "".join(c for c in s if not unicodedata.combining(c))
-            return re.sub(r"\s+", " ", s).strip().lower()
+    La concurrencia por profesor está acotada por MP_PAGE_CONCURRENCY; el
+    limitador por host sigue aplicando a cada petición individual.
 
-        await page.goto(f"{BASE}/Buscar", wait_until="domcontentloaded", timeout=45000)
+    Args:
+        profile_url: URL del perfil (página 1)
+        pages: Número total de páginas de reseñas
+        start: Primera página a descargar (las anteriores ya se tienen)
+
+    Returns:
+        Lista con las páginas start..N (ParsedPage o extracto JS), en orden de página
+    """
+    sem = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+    async def _one(p: int) -> Fetched:
+        async with sem:
+            return await fetch_prof_html(f"{profile_url}?pag={p}", kind="reviews")
+
+    # gather conserva el orden de las corrutinas, no el de finalización
+    return list(await asyncio.gather(*(_one(p) for p in range(start, pages + 1))))
+
+
+async def _fetch_new_reviews(profile_url: str, first_html: Fetched, pages: int,
+                             known: Set[Tuple[Any, ...]]) -> Tuple[List[Dict[str, Any]], List[Fetched]]:
+    """
+    Descarga reseñas en orden (más nuevas primero) hasta encontrar una conocida.
+
+    Las páginas se recorren secuencialmente porque la condición de paro
+    depende del contenido de cada página.
+
+    Args:
+        profile_url: URL del perfil (página 1)
+        first_html: Página 1 ya descargada (ParsedPage o extracto JS)
+        pages: Número total de páginas de reseñas
+        known: Claves (review_key) de las reseñas ya almacenadas
+
+    Returns:
+        Tupla (reseñas nuevas en orden, HTML o extracto de las páginas descargadas)
+    """
+    new_reviews: List[Dict[str, Any]] = []
+    html_pages: List[Fetched] = []
+    for p in range(1, pages + 1):
+        page_html = first_html if p == 1 else await fetch_prof_html(f"{profile_url}?pag={p}", kind="reviews")
+        html_pages.append(page_html)
+        with stage("parse"):
+            page_reviews = extract_field(page_html, "reviews")
+        fresh = [r for r in page_reviews if review_key(r) not in known]
+        new_reviews += fresh
+        if len(fresh) < len(page_reviews):
+            break
+    return new_reviews, html_pages
+
+
+def _norm(s: str) -> str:
+    """Normaliza texto removiendo acentos, espacios extras y convirtiendo a minúsculas."""
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(c for c in s if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", s).strip().lower()
+
+
+async def _search_profile_url(prof_name: str) -> Tuple[str, float]:
+    """
+    Busca un profesor en /Buscar y obtiene la URL de su perfil.
+
+    La búsqueda requiere JavaScript, por lo que siempre usa una página
+    del BrowserPool. Elige el candidato cuyo texto normalizado se parece
+    más al nombre buscado (el primero en caso de empate).
+
+    Reintenta según la política de la etapa "search" (core.resilience),
+    salvo cuando la búsqueda responde sin enlace de perfil.
+
+    Args:
+        prof_name: Nombre completo del profesor a buscar
+
+    Returns:
+        Tupla (URL absoluta del perfil, confianza del match entre 0 y 1)
+
+    Raises:
+        RuntimeError: Si no se encuentra enlace de perfil
+    """
+    policy = get_policy("search")
+    async for attempt in policy.retrying(no_retry=(RuntimeError,)):
+        with attempt:
+            return await _search_once(prof_name, policy)
+
+
+async def _search_once(prof_name: str, policy: StagePolicy) -> Tuple[str, float]:
+    """Un intento de _search_profile_url."""
+    async with get_browser_pool().page() as page:
+        await _goto(page, f"{MP_ORIGIN}/Buscar", policy)
 
         search = page.locator("input[type='text'], input[role='combobox']").first
         await search.fill(prof_name)
         await page.keyboard.press("Enter")
 
         # Espera resultados de perfiles, sin networkidle
-        await page.wait_for_selector("a[href*='/profesores/']", timeout=30000)
+        await page.wait_for_selector("a[href*='/profesores/']", timeout=policy.selector_ms)
         cands = page.locator("a[href*='/profesores/']")
 
-        # Match normalizado, fallback al primero
+        # Match normalizado exacto; si no hay, el más parecido (fallback al primero)
         idx = 0
+        best = -1.0
         target = _norm(prof_name)
         count = await cands.count()
         for i in range(count):
-            txt = (await cands.nth(i).inner_text()).strip()
-            if _norm(txt) == target:
-                idx = i
+            txt = _norm(await cands.nth(i).inner_text())
+            score = 100.0 if txt == target else fuzz.token_sort_ratio(txt, target)
+            if score > best:
+                idx, best = i, score
+            if score == 100.0:
                 break
 
         href = await cands.nth(idx).get_attribute("href")
-        if not href:
-            raise RuntimeError("No se encontró enlace de perfil.")
-        if href.startswith("/"):
-            href = f"{BASE}{href}"
-
-        # Navegar directo al perfil y esperar contenedores del perfil
-        await page.goto(href, wait_until="domcontentloaded", timeout=45000)
-        await page.wait_for_selector("div.rating-breakdown, div.rating-filter.togglable", timeout=30000)
-        # --- Fin búsqueda mejorada ---
-
-        # 3) Extraer información del perfil
-        profile_url = page.url
-        html = await page.content()
-
-        prof = parse_profile(html)
-        pages = page_count(html)
-
-        # Calcular número esperado de reseñas
-        expected_reviews = pages * 5  # Aproximación (5 reseñas por página)
-
-        # 4) Verificar si hay cambios respecto al caché
-        if cached_data and not force:
-            cached_reviews_count = len(cached_data.get("reviews", []))
-
-            # Si el número de reseñas es el mismo, retornar caché
-            if abs(cached_reviews_count - expected_reviews) <= 5:  # Tolerancia de ±5
-                print(f"✓ Caché vigente para {prof_name} ({cached_reviews_count} reseñas)")
-                cached_data["cached"] = True
-                return cached_data
-            else:
-                print(f"✓ Detectados cambios para {prof_name}: {cached_reviews_count} → ~{expected_reviews} reseñas")
-
-        # 5) Scraping completo (hay cambios o no hay caché)
-        print(f"⚙ Scrapeando {prof_name} ({pages} páginas)...")
-        all_reviews = []
-        all_html_pages = []
 
-        for p in range(1, pages + 1):
-            url = profile_url if p == 1 else f"{profile_url}?pag={p}"
-            if p > 1:
-                await page.goto(url, wait_until="domcontentloaded", timeout=45000)
-                await page.wait_for_selector("div.rating-filter.togglable table.tftable", timeout=30000)
-                html = await page.content()
+    if not href:
+        raise RuntimeError("No se encontró enlace de perfil.")
+    if href.startswith("/"):
+        href = f"{MP_ORIGIN}{href}"
+    return to_origin(href), max(best, 0.0) / 100
+
+
+async def _lookup_profile_url(prof_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Busca una URL de perfil conocida sin pasar por /Buscar.
+
+    Consulta, en orden, el caché de URLs, la tabla profesores de PostgreSQL
+    y el JSON cacheado del profesor. Las URLs encontradas fuera del caché se
+    registran en él.
+
+    Args:
+        prof_name: Nombre completo del profesor
+
+    Returns:
+        Entrada del caché de URLs o None si no se conoce la URL
+    """
+    cache = get_url_cache()
+    entry = cache.get(prof_name)
+    if entry:
+        return entry
+
+    url = None
+    source = None
+    if DB_ENABLED:
+        try:
+            url = await obtener_url_misprofesores(slugify(prof_name))
+            source = "postgres"
+        except Exception:
+            url = None  # BD no disponible: continuar con las demás fuentes
+    if not url:
+        url = (_get_cached_data(prof_name) or {}).get("url_misprofesores")
+        source = "json"
+    if not url:
+        return None
+
+    cache.put(prof_name, url, confidence=1.0, source=source)
+    return cache.entries[slugify(prof_name)]
+
+
+def _listing_confirms_cache(entry: Dict[str, Any], cached_count: Optional[int]) -> bool:
+    """
+    Indica si el conteo reciente del listado de la escuela coincide con el caché.
+
+    Args:
+        entry: Entrada del caché de URLs del profesor
+        cached_count: Número de reseñas en el JSON cacheado
 
-            all_html_pages.append(html)
-            all_reviews += parse_reviews(html)
+    Returns:
+        True si el listado es reciente y reporta el mismo número de reseñas
+    """
+    if cached_count is None or entry.get("listing_count") is None or not entry.get("listed_at"):
+        return False
+    age_h = (datetime.now() - datetime.fromisoformat(entry["listed_at"])).total_seconds() / 3600
+    return age_h <= SCHOOL_INDEX_MAX_AGE_H and entry["listing_count"] == cached_count
 
-        # Agregar todas las reseñas al perfil
-        prof["reviews"] = all_reviews
-        prof["cached"] = False
 
-        # 6) Guardar HTML y JSON
-        # Guardar HTML de la primera página (más representativo)
-        html_path = _save_html(prof_name, all_html_pages[0])
+async def find_and_scrape(prof_name: str, school_hint: str = "UAM (Azcapotzalco)", force: bool = False,
+                          incremental: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Busca un profesor por nombre y extrae su perfil completo con todas sus reseñas.
+
+    Implementa caché inteligente:
+    - Si el profesor ya fue scrapeado y el número de reseñas no ha cambiado, retorna caché
+    - Archiva todas las páginas HTML (comprimidas) y guarda JSON para auditoría
+      y re-parseo offline
+    - Permite forzar re-scraping con el parámetro force
+
+    Esta función realiza las siguientes operaciones:
+    1. Verifica si existe caché del profesor
+    2. Resuelve la URL del perfil desde el caché de URLs, PostgreSQL o el
+       JSON cacheado; solo si no se conoce (o responde 404) busca al profesor
+       por nombre en MisProfesores.com (navegador). Si la URL resuelta no es
+       la del JSON cacheado, el caché se ignora
+    3. Sondea el perfil (HTTP o navegador, según MP_PROFILE_BACKEND), con
+       petición condicional ETag/Last-Modified cuando es posible
+    4. Compara el contador exacto de reseñas con el caché (si existe) y
+       registra el sondeo en historial_scraping
+    5. Si no hay cambios, retorna caché (eficiencia). Si el listado reciente
+       de la escuela ya reporta el mismo conteo, ni siquiera sondea
+    6. Si hay cambios, extrae información completa (según MP_REVIEWS_BACKEND).
+       En modo incremental solo descarga páginas hasta la primera que contenga
+       una reseña ya conocida y envía a la base de datos solo las nuevas; si
+       el total fusionado no coincide con el contador del sitio (reseñas
+       borradas o editadas), hace el scraping completo
+    7. Archiva las páginas HTML descargadas y guarda JSON en disco
+
+    Args:
+        prof_name: Nombre completo del profesor a buscar
+        school_hint: Escuela del profesor (por defecto "UAM (Azcapotzalco)");
+                    el listado de esa escuela se indexa con el comando discover
+        force: Si True, fuerza re-scraping ignorando caché
+        incremental: Si True, detiene la paginación en la primera reseña ya
+                    conocida. None usa la variable de entorno MP_INCREMENTAL
+
+    Returns:
+        Dict con la estructura:
+            - name: Nombre del profesor
+            - overall_quality: Calificación general
+            - difficulty: Nivel de dificultad
+            - recommend_percent: Porcentaje de recomendación
+            - tags: Lista de etiquetas con conteos
+            - reviews: Lista completa de reseñas paginadas
+            - url_misprofesores: URL del perfil
+            - cached: True si se usó caché, False si se scrapeó
+            - pages_fetched: Páginas de reseñas descargadas en esta llamada
+              (0 si el listado confirmó el caché, 1 si solo se sondeó el perfil)
+
+    Raises:
+        Exception: Si no se encuentra el profesor o hay errores de navegación
+    """
+    # 1) Verificar caché existente
+    cached_data = None if force else _get_cached_data(prof_name)
+    url_cache = get_url_cache()
+
+    # 2) Resolver URL del perfil: caché de URLs primero (sembrado también por el
+    # índice de la escuela, ver school_index), /Buscar solo si falla
+    probe = None
+    with stage("url_lookup"):
+        entry = await _lookup_profile_url(prof_name)
+    if entry:
+        cached_data = _cache_for_url(prof_name, cached_data, entry["url"])
+    cached_count = len(cached_data.get("reviews", [])) if cached_data else None
+    if entry and _listing_confirms_cache(entry, cached_count):
+        print(f"✓ Caché vigente para {prof_name} ({cached_count} reseñas, listado de la escuela)")
+        cached_data["cached"] = True
+        cached_data["pages_fetched"] = 0
+        return cached_data
+    if entry:
+        profile_url = entry["url"]
+        try:
+            with stage("probe"):
+                probe = await probe_freshness(profile_url, cached_count, entry)
+        except ProfileNotFoundError:
+            print(f"↺ URL cacheada de {prof_name} respondió 404, buscando de nuevo...")
+            url_cache.invalidate(prof_name)
+
+    if probe is None:
+        with stage("search"):
+            profile_url, confidence = await _search_profile_url(prof_name)
+        cached_data = _cache_for_url(prof_name, cached_data, profile_url)
+        cached_count = len(cached_data.get("reviews", [])) if cached_data else None
+
+        # 3) Descargar la página 1 del perfil (sondeo de frescura sin validadores)
+        with stage("probe"):
+            probe = await probe_freshness(profile_url, cached_count)
+        url_cache.put(prof_name, profile_url, confidence=confidence, source="search")
+
+    with stage("db_probe"):
+        await _record_probe(prof_name, profile_url, probe)
+
+    # 4) Verificar si hay cambios respecto al caché (contador exacto o 304)
+    if cached_data and probe["fresh"]:
+        print(f"✓ Caché vigente para {prof_name} ({cached_count} reseñas, "
+              f"{probe['result']}, {probe['ms']} ms)")
+        url_cache.touch(prof_name, etag=probe["etag"], last_modified=probe["last_modified"],
+                        review_count=probe["review_count"])
+        cached_data["cached"] = True
+        cached_data["pages_fetched"] = 1
+        return cached_data
+    if cached_data:
+        print(f"✓ Detectados cambios para {prof_name}: {cached_count} → {probe['review_count']} reseñas")
+
+    first = probe["page"]
+    with stage("parse"):
+        prof = extract_field(first, "profile")
+        pages = extract_field(first, "page_count")
+
+    # 5) Scraping (hay cambios o no hay caché)
+    if incremental is None:
+        incremental = INCREMENTAL
+    known_reviews = (cached_data or {}).get("reviews", []) if incremental else []
+    new_reviews = None
+
+    if known_reviews:
+        # Incremental: solo las reseñas más nuevas que las ya almacenadas
+        known = {review_key(r) for r in known_reviews}
+        with stage("fetch_reviews"):
+            new_reviews, all_html_pages = await _fetch_new_reviews(profile_url, first, pages, known)
+        all_reviews = new_reviews + known_reviews
+        if probe["review_count"] is not None and len(all_reviews) != probe["review_count"]:
+            # Reseñas borradas o editadas en el sitio: la fusión no cuadra con el
+            # contador y no convergería; se reconstruye con el scraping completo
+            print(f"↺ Fusión incremental de {prof_name} con {len(all_reviews)} reseñas, el sitio "
+                  f"reporta {probe['review_count']}; scrapeando completo")
+            new_reviews = None
+        else:
+            print(f"⚙ Scraping incremental de {prof_name}: {len(new_reviews)} reseñas nuevas "
+                  f"en {len(all_html_pages)}/{pages} páginas")
+
+    if new_reviews is None:
+        # Tras una fusión fallida se reutilizan las páginas que ya descargó la
+        # fase incremental y solo se piden las siguientes
+        fetched = all_html_pages if known_reviews else [first]
+        print(f"⚙ Scrapeando {prof_name} ({pages} páginas)...")
+        all_reviews = []
+        with stage("fetch_reviews"):
+            all_html_pages = fetched + await _fetch_review_pages(profile_url, pages, start=len(fetched) + 1)
+
+        with stage("parse"):
+            for page_html in all_html_pages:
+                all_reviews += extract_field(page_html, "reviews")
+
+    # Agregar todas las reseñas al perfil
+    prof["reviews"] = all_reviews
+    prof["url_misprofesores"] = profile_url
+    prof["cached"] = False
+
+    # 6) Archivar todas las páginas HTML y guardar JSON
+    with stage("archive"):
+        stored = _archive_pages(prof_name, profile_url, all_html_pages)
+    with stage("json"):
         json_path = _save_json(prof_name, prof)
 
-        print(f"✓ Guardado: HTML en {html_path.name}, JSON en {json_path.name}")
-        print(f"✓ Total reseñas extraídas: {len(all_reviews)}")
-        
-        # 7) Guardar en bases de datos (PostgreSQL + MongoDB)
-        if DB_ENABLED:
-            try:
-                print("\n💾 Guardando en bases de datos...")
-                profesor_id = await guardar_profesor_completo(prof, url_misprofesores=profile_url)
-                print(f"✅ Datos guardados en BD (Profesor ID={profesor_id})")
-            except Exception as e:
-                print(f"⚠ Error al guardar en BD: {e}")
-                print("   Los datos JSON se mantienen como respaldo")
+    archived = sum(_page_html(p) is not None for p in all_html_pages)
+    print(f"✓ Guardado: {archived} páginas HTML en el archivo ({stored} nuevas), "
+          f"JSON en {json_path.name}")
+    print(f"✓ Total reseñas extraídas: {len(all_reviews)}")
+
+    # Los validadores solo se guardan cuando el JSON en disco ya corresponde a ellos
+    url_cache.touch(prof_name, etag=probe["etag"], last_modified=probe["last_modified"],
+                    review_count=probe["review_count"])
 
-        return prof
+    # 7) Guardar en bases de datos (PostgreSQL + MongoDB)
+    if DB_ENABLED:
+        try:
+            print("\n💾 Guardando en bases de datos...")
+            with stage("persist"):
+                if new_reviews is not None:
+                    # Incremental: solo las reseñas nuevas, con el total real del perfil
+                    profesor_id = await guardar_profesor_completo(
+                        {**prof, "reviews": new_reviews},
+                        url_misprofesores=profile_url,
+                        total_resenias=len(all_reviews),
+                        slug_uam=slugify(prof_name)
+                    )
+                else:
+                    profesor_id = await guardar_profesor_completo(prof, url_misprofesores=profile_url,
+                                                                  slug_uam=slugify(prof_name))
+            print(f"✅ Datos guardados en BD (Profesor ID={profesor_id})")
+        except Exception as e:
+            print(f"⚠ Error al guardar en BD: {e}")
+            print("   Los datos JSON se mantienen como respaldo")
+
+    prof["pages_fetched"] = len(all_html_pages)
+    return prof
 
 
 if __name__ == "__main__":
@@ -285,8 +893,15 @@ if __name__ == "__main__":
     # Si no se proporciona, usa un nombre por defecto
     name = " ".join(sys.argv[1:]) or "Josue Padilla"
 
+    async def _main() -> Dict[str, Any]:
+        try:
+            return await find_and_scrape(name)
+        finally:
+            await close_browser_pool()
+            await close_http_client()
+
     # Ejecutar la búsqueda y scraping (con caché inteligente)
-    data = asyncio.run(find_and_scrape(name))
+    data = asyncio.run(_main())
 
     # Los archivos ya se guardaron automáticamente
     # Mostrar resultado en consola
@@ -0,0 +1,146 @@
+"""
+Caché de resolución de URLs de perfiles de MisProfesores.com
+
+Guarda, por profesor, la URL de su perfil junto con la confianza del match
+con el que se resolvió y la fecha de la última verificación. Permite que
+find_and_scrape navegue directo al perfil sin pasar por /Buscar.
+
+El caché vive en data/outputs/url_cache.json con la estructura:
+    {
+        "josue-padilla-cuevas": {
+            "name": "Josue Padilla Cuevas",
+            "url": "https://www.misprofesores.com/profesores/...",
+            "confidence": 1.0,
+            "source": "search",
+            "verified_at": "2025-11-10T12:00:00"
+        }
+    }
+"""
+import json
+from datetime import datetime
+from os import getenv
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from slugify import slugify
+
+load_dotenv()
+URL_CACHE_FILE = Path("data/outputs/url_cache.json")
+
+# Confianza mínima para usar una URL cacheada sin volver a buscar
+URL_MIN_CONFIDENCE = float(getenv("MP_URL_MIN_CONFIDENCE", "0.8"))
+
+
+class UrlCache:
+    """
+    Caché persistente nombre → URL de perfil.
+
+    Las entradas se indexan por el slug del nombre del profesor. Cada
+    modificación se escribe a disco de inmediato (el archivo es pequeño).
+    """
+
+    def __init__(self, path: Path = URL_CACHE_FILE):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self) -> None:
+        """Carga el caché desde disco si existe."""
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (json.JSONDecodeError, IOError):
+                self.entries = {}
+
+    def save(self) -> None:
+        """Escribe el caché a disco de forma atómica."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.entries, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def get(self, prof_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene la entrada de un profesor si su confianza es suficiente.
+
+        Args:
+            prof_name: Nombre del profesor
+
+        Returns:
+            Dict con url, confidence, source y verified_at, o None
+        """
+        entry = self.entries.get(slugify(prof_name))
+        if entry and entry.get("url") and entry.get("confidence", 0) >= URL_MIN_CONFIDENCE:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def put(self, prof_name: str, url: str, confidence: float, source: str,
+            autosave: bool = True, **extra: Any) -> None:
+        """
+        Registra (o reemplaza) la URL de un profesor como verificada ahora.
+
+        Args:
+            prof_name: Nombre del profesor
+            url: URL absoluta del perfil
+            confidence: Confianza del match nombre ↔ perfil (0-1)
+            source: Origen de la URL ("search", "postgres", "json", "school")
+            autosave: Si False, no escribe a disco (para cargas masivas
+                      seguidas de save())
+            **extra: Campos adicionales a guardar en la entrada
+        """
+        self.entries[slugify(prof_name)] = {
+            "name": prof_name,
+            "url": url,
+            "confidence": round(confidence, 3),
+            "source": source,
+            "verified_at": datetime.now().isoformat(timespec="seconds"),
+            **extra,
+        }
+        if autosave:
+            self.save()
+
+    def touch(self, prof_name: str, **extra: Any) -> None:
+        """
+        Marca la URL de un profesor como verificada ahora.
+
+        Args:
+            prof_name: Nombre del profesor
+            **extra: Campos adicionales a actualizar en la entrada
+        """
+        entry = self.entries.get(slugify(prof_name))
+        if entry:
+            entry["verified_at"] = datetime.now().isoformat(timespec="seconds")
+            entry.update(extra)
+            self.save()
+
+    def invalidate(self, prof_name: str) -> None:
+        """
+        Elimina la entrada de un profesor (por ejemplo, tras un 404).
+
+        Args:
+            prof_name: Nombre del profesor
+        """
+        if self.entries.pop(slugify(prof_name), None) is not None:
+            self.save()
+
+
+# Caché global (singleton)
+_url_cache: Optional[UrlCache] = None
+
+
+def get_url_cache() -> UrlCache:
+    """
+    Obtiene el caché de URLs del proceso (singleton).
+
+    Returns:
+        UrlCache: Caché compartido por todos los workers
+    """
+    global _url_cache
+    if _url_cache is None:
+        _url_cache = UrlCache()
+    return _url_cache
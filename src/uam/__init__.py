@@ -4,5 +4,6 @@ Módulo uam - Scraping del directorio UAM Azcapotzalco.
 Contiene:
     nombres_uam: Extracción de nombres de profesores del directorio oficial
                  de la Universidad Autónoma Metropolitana, Unidad Azcapotzalco
+    diff: Altas, bajas y cambios entre la lista guardada y el directorio actual
 """
 
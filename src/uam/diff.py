@@ -0,0 +1,105 @@
+"""
+Diferencias entre la lista guardada de profesores UAM y el directorio actual.
+
+Compara dos listas de registros {'name', 'slug', 'url'} identificando a cada
+profesor por su URL del directorio UAM y, como respaldo, por su slug:
+- added: profesores nuevos (ni su URL ni su slug existían)
+- removed: profesores que ya no aparecen
+- renamed: misma URL con otro nombre (corrección o cambio de nombre)
+- moved: mismo slug con otra URL en el directorio
+
+Cada diff se guarda en data/outputs/directorio/diffs/<timestamp>.json para
+que scrape-all --diff procese solo los nombres nuevos o cambiados.
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DIFFS_DIR = Path("data/outputs/directorio/diffs")
+
+
+def diff_directory(old: List[Dict[str, str]], new: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Calcula las altas, bajas y cambios entre dos listas del directorio.
+
+    Args:
+        old: Lista guardada de profesores
+        new: Lista recién obtenida del directorio
+
+    Returns:
+        Dict con listas 'added', 'removed', 'renamed' y 'moved'. Los cambios
+        tienen la forma {'old': registro_anterior, 'new': registro_nuevo}
+    """
+    old_by_url = {r["url"]: r for r in old if r.get("url")}
+    old_by_slug = {r["slug"]: r for r in old if r.get("slug")}
+    matched = set()
+
+    added: List[Dict[str, str]] = []
+    renamed: List[Dict[str, Any]] = []
+    moved: List[Dict[str, Any]] = []
+
+    for rec in new:
+        prev = old_by_url.get(rec.get("url"))
+        if prev is not None:
+            matched.add(id(prev))
+            if prev.get("slug") != rec.get("slug"):
+                renamed.append({"old": prev, "new": rec})
+            continue
+        prev = old_by_slug.get(rec.get("slug"))
+        if prev is not None and id(prev) not in matched:
+            matched.add(id(prev))
+            moved.append({"old": prev, "new": rec})
+            continue
+        added.append(rec)
+
+    removed = [r for r in old if id(r) not in matched]
+    return {"added": added, "removed": removed, "renamed": renamed, "moved": moved}
+
+
+def changed_names(diff: Dict[str, Any]) -> List[str]:
+    """
+    Nombres que requieren resolverse por primera vez (altas y renombrados).
+
+    Args:
+        diff: Diff calculado por diff_directory
+
+    Returns:
+        Lista de nombres de profesores
+    """
+    return [r["name"] for r in diff["added"]] + [c["new"]["name"] for c in diff["renamed"]]
+
+
+def save_diff(diff: Dict[str, Any], diffs_dir: Path = DIFFS_DIR) -> Path:
+    """
+    Guarda un diff con marca de tiempo.
+
+    Args:
+        diff: Diff calculado por diff_directory
+        diffs_dir: Directorio de diffs
+
+    Returns:
+        Path del archivo guardado
+    """
+    diffs_dir.mkdir(parents=True, exist_ok=True)
+    created = datetime.now()
+    path = diffs_dir / f"{created.strftime('%Y%m%d-%H%M%S')}.json"
+    payload = {"created_at": created.isoformat(timespec="seconds"), **diff}
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def load_latest_diff(diffs_dir: Path = DIFFS_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Carga el diff más reciente.
+
+    Args:
+        diffs_dir: Directorio de diffs
+
+    Returns:
+        Dict del diff o None si no hay ninguno
+    """
+    diffs = sorted(diffs_dir.glob("*.json"))
+    if not diffs:
+        return None
+    return json.loads(diffs[-1].read_text(encoding="utf-8"))
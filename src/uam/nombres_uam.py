@@ -1,98 +1,195 @@
 """
 Módulo para extraer nombres y datos de profesores del directorio UAM Azcapotzalco.
 
-Este módulo utiliza web scraping con Playwright y BeautifulSoup para obtener
+Este módulo utiliza web scraping con Playwright para obtener
 información de profesores desde el directorio oficial de la UAM.
 """
 import asyncio
 import json
-from typing import List, Dict
+from os import getenv
+from typing import AsyncIterator, Dict, List, Set
 
-from bs4 import BeautifulSoup
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from dotenv import load_dotenv
 from slugify import slugify
-from ..core.browser import browser_ctx
+from ..core.browser import get_browser_pool, close_browser_pool
+from ..core.resilience import get_circuit_breaker, get_policy
+
+load_dotenv()
+
+# Configurable para apuntar al servidor de reproducción local (core.replay)
+UAM_DIR = getenv("UAM_DIR_URL", "https://sistemas.azc.uam.mx/Somos/Directorio/")
+
+
+# Extrae las tarjetas de la sección Profesorado desde el DOM, con el texto de
+# cada h4/h5 recortado igual que BeautifulSoup.get_text(strip=True)
+_CARDS_JS = """
+() => {
+    const text = (el) => {
+        const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+        const parts = [];
+        while (walker.nextNode()) {
+            const t = walker.currentNode.textContent.trim();
+            if (t) parts.push(t);
+        }
+        return parts.join("");
+    };
+    const h2 = [...document.querySelectorAll("h2")]
+        .find((h) => h.childElementCount === 0 && h.textContent.includes("Profesorado"));
+    if (!h2) return null;
+    let section = null;
+    const all = [...document.querySelectorAll("section")];
+    for (const s of all) {
+        if (h2.compareDocumentPosition(s) & Node.DOCUMENT_POSITION_FOLLOWING) { section = s; break; }
+    }
+    if (!section) return [];
+    return [...section.querySelectorAll("a[href]")]
+        .filter((a) => [...a.classList].some((c) => c.includes("svelte")))
+        .map((a) => {
+            const h4 = a.querySelector("h4");
+            const h5 = a.querySelector("h5");
+            return h4 && h5 ? {first: text(h4), last: text(h5), href: a.getAttribute("href")} : null;
+        })
+        .filter((c) => c !== null);
+}
+"""
 
-UAM_DIR = "https://sistemas.azc.uam.mx/Somos/Directorio/"
+# Número de tarjetas cargadas (para esperar a que un clic agregue nuevas)
+_COUNT_JS = "(n) => document.querySelectorAll('section a[href] h4').length > n"
+_COUNT_NOW_JS = "() => document.querySelectorAll('section a[href] h4').length"
 
+BOTON_VER_MAS = "span:has-text('Ver más Profesorado')"
 
-async def get_prof_names() -> List[Dict[str, str]]:
+
+def _card_record(first: str, last: str, href: str) -> Dict[str, str]:
     """
-    Obtiene una lista de profesores del directorio UAM Azcapotzalco.
+    Construye el registro de un profesor a partir de su tarjeta.
 
-    Esta función navega al directorio UAM, hace clic repetidamente en el botón
-    "Ver más Profesorado" hasta cargar todos los profesores, y luego extrae
-    sus nombres y URLs.
+    Args:
+        first: Texto del h4 (nombre)
+        last: Texto del h5 (apellidos)
+        href: Ruta relativa del perfil
 
     Returns:
-        List[Dict[str, str]]: Lista de diccionarios con las claves:
-            - 'name': Nombre completo del profesor
-            - 'slug': Versión normalizada del nombre para URLs
-            - 'url': URL completa del perfil del profesor
+        Dict con 'name', 'slug' y 'url'
+    """
+    nombre = f"{first} {last}"
+    return {
+        "name": nombre,
+        "slug": slugify(nombre),
+        "url": f"https://sistemas.azc.uam.mx{href}"
+    }
+
+
+async def _open_directory(page) -> None:
+    """
+    Abre el directorio UAM con la política de la etapa "directory".
+
+    Reintenta con backoff y respeta el circuit breaker del host (ver
+    core.resilience).
+
+    Args:
+        page: Instancia de página de Playwright
+    """
+    policy = get_policy("directory")
+    breaker = get_circuit_breaker()
+    async for attempt in policy.retrying():
+        with attempt:
+            await breaker.before(UAM_DIR)
+            try:
+                response = await page.goto(UAM_DIR, wait_until="domcontentloaded",
+                                           timeout=policy.goto_ms)
+            except Exception:
+                breaker.record(UAM_DIR, ok=False)
+                raise
+            ok = response is None or (response.status != 429 and response.status < 500)
+            breaker.record(UAM_DIR, ok=ok)
+            if not ok:
+                raise RuntimeError(f"El directorio UAM respondió {response.status}")
+
+
+async def iter_prof_batches() -> AsyncIterator[List[Dict[str, str]]]:
+    """
+    Genera los profesores del directorio UAM por lotes, conforme se cargan.
+
+    Entrega primero las tarjetas visibles al abrir la página y después, tras
+    cada clic en "Ver más Profesorado", solo las tarjetas nuevas. En lugar de
+    una pausa fija, cada clic espera a que aparezcan tarjetas nuevas.
+
+    Yields:
+        List[Dict[str, str]]: Lote de profesores nuevos ('name', 'slug', 'url')
 
     Raises:
         RuntimeError: Si no se encuentra la sección Profesorado en la página
     """
-    async with browser_ctx() as ctx:
-        page = await ctx.new_page()
-        await page.goto(UAM_DIR, wait_until="domcontentloaded", timeout=45000)
+    seen: Set[str] = set()
+
+    # La carga completa del directorio es un préstamo largo: sin límite del watchdog
+    async with get_browser_pool().page(max_lease_s=None) as page:
+        await _open_directory(page)
 
-        # Clic repetido en "Ver más Profesorado"
-        # Continúa haciendo clic hasta que el botón ya no esté disponible
         while True:
             try:
-                boton = await page.wait_for_selector("span:has-text('Ver más Profesorado')", timeout=3000)
-                await boton.click()
-                await page.wait_for_timeout(700)
+                boton = await page.wait_for_selector(BOTON_VER_MAS, timeout=3000)
             except PlaywrightTimeoutError:
-                # El botón ya no está disponible, todos los profesores se han cargado
+                boton = None
+
+            cards = await page.evaluate(_CARDS_JS)
+            if cards is None:
+                raise RuntimeError("No se encontró la sección Profesorado")
+
+            batch = []
+            for card in cards:
+                if card["href"] in seen:
+                    continue
+                seen.add(card["href"])
+                batch.append(_card_record(card["first"], card["last"], card["href"]))
+            if batch:
+                yield batch
+
+            # El botón ya no está disponible: todos los profesores se han cargado
+            if boton is None:
                 break
 
-        html = await page.content()
-
-    # ---- PARSEO HTML ----
-    soup = BeautifulSoup(html, "lxml")
+            loaded = await page.evaluate(_COUNT_NOW_JS)
+            await boton.click()
+            try:
+                await page.wait_for_function(_COUNT_JS, arg=loaded, timeout=5000)
+            except PlaywrightTimeoutError:
+                pass
 
-    # Buscar sección de profesorado por el texto del encabezado
-    # Busca todos los h2 que contengan la palabra "Profesorado"
-    prof_sections = soup.find_all("h2")
-    prof_section = None
-    for section in prof_sections:
-        if section.string and "Profesorado" in section.string:
-            prof_section = section
-            break
 
-    if not prof_section:
-        raise RuntimeError("No se encontró la sección Profesorado")
+async def get_prof_names() -> List[Dict[str, str]]:
+    """
+    Obtiene una lista de profesores del directorio UAM Azcapotzalco.
 
-    # Obtener el contenedor con las tarjetas de profesores
-    container = prof_section.find_next("section")
+    Esta función navega al directorio UAM, hace clic repetidamente en el botón
+    "Ver más Profesorado" hasta cargar todos los profesores, y luego extrae
+    sus nombres y URLs. Para empezar a trabajar antes de que termine la carga,
+    usar iter_prof_batches.
 
-    # Extraer todas las tarjetas de profesores (links con clase svelte)
-    cards = container.find_all("a", href=True, class_=lambda c: c and "svelte" in c)
+    Returns:
+        List[Dict[str, str]]: Lista de diccionarios con las claves:
+            - 'name': Nombre completo del profesor
+            - 'slug': Versión normalizada del nombre para URLs
+            - 'url': URL completa del perfil del profesor
 
+    Raises:
+        RuntimeError: Si no se encuentra la sección Profesorado en la página
+    """
     results: List[Dict[str, str]] = []
-    for card in cards:
-        # Extraer nombre (h4) y apellido (h5) del profesor
-        h4 = card.find("h4")
-        h5 = card.find("h5")
-        if not h4 or not h5:
-            continue
-
-        # Construir nombre completo y slug
-        nombre = f"{h4.get_text(strip=True)} {h5.get_text(strip=True)}"
-        href = card["href"]
-
-        results.append({
-            "name": nombre,
-            "slug": slugify(nombre),
-            "url": f"https://sistemas.azc.uam.mx{href}"
-        })
-
+    async for batch in iter_prof_batches():
+        results.extend(batch)
     return results
 
 
 if __name__ == "__main__":
+    async def _main() -> List[Dict[str, str]]:
+        try:
+            return await get_prof_names()
+        finally:
+            await close_browser_pool()
+
     # Ejecutar la función y mostrar resultados en formato JSON
-    out = asyncio.run(get_prof_names())
+    out = asyncio.run(_main())
     print(json.dumps(out, ensure_ascii=False, indent=2))
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Test del Scraping Incremental - SentimentInsightUAM
+
+Ejecuta find_and_scrape contra el servidor de reproducción (sin red ni BD)
+con un caché que tiene una reseña que ya se borró del sitio:
+1. La fusión incremental no cuadra con el contador y se hace el scraping completo
+2. El JSON queda igual al sitio (sin la reseña borrada)
+3. La siguiente corrida converge: el caché se reporta vigente
+4. Si la URL del perfil cambió, el JSON del perfil anterior no se da por
+   vigente aunque el contador coincida
+5. Con varias páginas, el scraping completo reutiliza las páginas que ya
+   descargó la fase incremental
+
+Uso:
+    python tests/test_incremental_scrape.py
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from slugify import slugify
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.archive import HtmlArchive
+from src.core.replay import Cassette, ReplayServer
+import src.core.archive as archive
+import src.mp.scrape_prof as scrape_prof
+import src.mp.url_cache as url_cache
+from test_js_extract import REVIEW_ROW
+
+PROF_NAME = "Juan Perez"
+PROFILE_URL = "https://www.misprofesores.com/profesores/Juan-Perez_1"
+NEW_URL = "https://www.misprofesores.com/profesores/Juan-Perez_2"
+MULTI_NAME = "Ana Ruiz"
+MULTI_URL = "https://www.misprofesores.com/profesores/Ana-Ruiz_3"
+
+ROW_B = REVIEW_ROW.format(date="15/Ene/2024", overall="10", ease="4.5", course="Cálculo I",
+                          comment="Excelente profesor")
+ROW_C = REVIEW_ROW.format(date="03/Dic/2023", overall="6", ease="2", course="Álgebra",
+                          comment="Reseña que el sitio borró")
+ROW_NEW = REVIEW_ROW.format(date="20/Feb/2024", overall="8", ease="3", course="Física",
+                            comment="Reseña del perfil nuevo")
+
+
+def _row(day: int, comment: str) -> str:
+    return REVIEW_ROW.format(date=f"{day:02d}/Ene/2024", overall="9", ease="3",
+                             course="Cálculo I", comment=comment)
+
+
+def _profile_html(rows: list, count: int = None) -> str:
+    return f"""<html><body>
+<div class="prof_headers"><h1>Juan Perez</h1></div>
+<div class="rating-breakdown">
+  <div class="quality"><div class="grade">9.0</div></div>
+  <div class="takeAgain"><div class="grade">90%</div></div>
+  <div class="difficulty"><div class="grade">3</div></div>
+</div>
+<div class="table-toggle rating-count active">{count or len(rows)} Calificaciones</div>
+<div class="rating-filter togglable"><table class="tftable">
+  <tr><th>Calificación</th><th>Clase</th><th>Comentario</th></tr>
+  {"".join(rows)}
+</table></div>
+</body></html>"""
+
+
+class IncrementalTester:
+    def __init__(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="incremental-"))
+        self.ok = True
+
+    def check(self, condition: bool, message: str) -> None:
+        print(f"{'✅' if condition else '❌'} {message}")
+        self.ok = self.ok and condition
+
+    def _setup(self) -> ReplayServer:
+        cassette = Cassette(self.tmp / "cassette")
+        cassette.record("GET", PROFILE_URL, 200, {"Content-Type": "text/html; charset=utf-8"},
+                        _profile_html([ROW_B]).encode())
+        cassette.record("GET", NEW_URL, 200, {"Content-Type": "text/html; charset=utf-8"},
+                        _profile_html([ROW_NEW]).encode())
+        # Perfil de 3 páginas (11 reseñas): N1..N6 son nuevas, R1..R5 ya estaban
+        multi = [[_row(30 - d, f"N{d}") for d in range(1, 6)],
+                 [_row(24, "N6")] + [_row(10 - d, f"R{d}") for d in range(1, 5)],
+                 [_row(5, "R5")]]
+        for p, rows in enumerate(multi, 1):
+            url = MULTI_URL if p == 1 else f"{MULTI_URL}?pag={p}"
+            cassette.record("GET", url, 200, {"Content-Type": "text/html; charset=utf-8"},
+                            _profile_html(rows, count=11).encode())
+        server = ReplayServer(cassette, ("127.0.0.1", 0))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        scrape_prof.BASE = f"{server.origin}/www.misprofesores.com"
+        scrape_prof.DB_ENABLED = False
+        scrape_prof.JSON_OUTPUT_DIR = self.tmp / "profesores"
+        archive._archive = HtmlArchive(self.tmp / "archive")
+        url_cache._url_cache = url_cache.UrlCache(self.tmp / "url_cache.json")
+        url_cache._url_cache.put(PROF_NAME, PROFILE_URL, confidence=1.0, source="search")
+
+        # Caché anterior: la reseña vigente y otra que el sitio ya borró
+        cached = scrape_prof.extract_field(_profile_html([ROW_B, ROW_C]), "profile")
+        cached["reviews"] = scrape_prof.extract_field(_profile_html([ROW_B, ROW_C]), "reviews")
+        cached["url_misprofesores"] = PROFILE_URL
+        scrape_prof._save_json(PROF_NAME, cached)
+
+        # Caché de Ana Ruiz: R1..R5 y una reseña que el sitio ya borró
+        stale = _profile_html([_row(10 - d, f"R{d}") for d in range(1, 6)] + [_row(1, "RX")])
+        cached = scrape_prof.extract_field(stale, "profile")
+        cached["reviews"] = scrape_prof.extract_field(stale, "reviews")
+        cached["url_misprofesores"] = MULTI_URL
+        scrape_prof._save_json(MULTI_NAME, cached)
+        url_cache._url_cache.put(MULTI_NAME, MULTI_URL, confidence=1.0, source="search")
+        return server
+
+    def test_resena_borrada(self):
+        print("\n" + "="*70)
+        print("TEST 1: Reseña borrada en el sitio con caché incremental")
+        print("="*70)
+        server = self._setup()
+
+        async def _main():
+            try:
+                prof = await scrape_prof.find_and_scrape(PROF_NAME, incremental=True)
+                comments = [r["comment"] for r in prof["reviews"]]
+                self.check(not prof["cached"] and comments == ["Excelente profesor"],
+                           f"Scraping completo con las reseñas del sitio: {comments}")
+                path = scrape_prof.JSON_OUTPUT_DIR / f"{slugify(PROF_NAME)}.json"
+                saved = json.loads(path.read_text(encoding="utf-8"))
+                self.check(len(saved["reviews"]) == 1, "El JSON ya no tiene la reseña borrada")
+                self.check(prof["pages_fetched"] == 1,
+                           f"Páginas descargadas reportadas: {prof['pages_fetched']}")
+
+                again = await scrape_prof.find_and_scrape(PROF_NAME, incremental=True)
+                self.check(again["cached"], "La siguiente corrida converge y usa el caché")
+
+                # El índice de la escuela apunta a otro perfil con el mismo contador
+                url_cache._url_cache.put(PROF_NAME, NEW_URL, confidence=1.0, source="school",
+                                         listing_count=1, listed_at=datetime.now().isoformat())
+                moved = await scrape_prof.find_and_scrape(PROF_NAME, incremental=True)
+                comments = [r["comment"] for r in moved["reviews"]]
+                self.check(not moved["cached"] and comments == ["Reseña del perfil nuevo"],
+                           f"URL cambiada: se scrapea el perfil nuevo en lugar del caché: {comments}")
+            finally:
+                await scrape_prof.close_http_client()
+
+        try:
+            asyncio.run(_main())
+        finally:
+            scrape_prof.BASE = scrape_prof.MP_ORIGIN
+            server.shutdown()
+            server.server_close()
+
+    def test_paginas_reutilizadas(self):
+        print("\n" + "="*70)
+        print("TEST 2: Scraping completo tras una fusión fallida con varias páginas")
+        print("="*70)
+        server = self._setup()
+
+        async def _main():
+            try:
+                prof = await scrape_prof.find_and_scrape(MULTI_NAME, incremental=True)
+                comments = [r["comment"] for r in prof["reviews"]]
+                expected = [f"N{d}" for d in range(1, 7)] + [f"R{d}" for d in range(1, 6)]
+                self.check(comments == expected, f"Reseñas del sitio en orden: {comments}")
+                self.check(server.stats["served"] == 3,
+                           f"Cada página se descarga una sola vez: {server.stats['served']} peticiones")
+                self.check(prof["pages_fetched"] == 3,
+                           f"Páginas descargadas reportadas: {prof['pages_fetched']}")
+            finally:
+                await scrape_prof.close_http_client()
+
+        try:
+            asyncio.run(_main())
+        finally:
+            scrape_prof.BASE = scrape_prof.MP_ORIGIN
+            server.shutdown()
+            server.server_close()
+
+    def run(self):
+        print("\n" + "="*70)
+        print("🧪 TEST DEL SCRAPING INCREMENTAL")
+        print("="*70)
+        self.test_resena_borrada()
+        self.test_paginas_reutilizadas()
+
+        print("\n" + "="*70)
+        print("✅ TODOS LOS TESTS PASARON" if self.ok else "❌ ALGUNOS TESTS FALLARON")
+        print("="*70)
+        return self.ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if IncrementalTester().run() else 1)
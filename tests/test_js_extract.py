@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test Diferencial del Extractor JS - SentimentInsightUAM
+
+Compara el extracto que EXTRACT_JS obtiene dentro de Chromium (page.evaluate)
+con el que el parser de Python obtiene del mismo HTML (extract_html):
+1. El parser de Python extrae el perfil, las reseñas y los contadores esperados
+2. El extractor JS devuelve exactamente el mismo extracto (valores y tipos)
+3. Una página sin perfil ni reseñas produce el mismo extracto vacío
+
+Requiere Chromium de Playwright (python -m playwright install chromium).
+
+Uso:
+    python tests/test_js_extract.py
+"""
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from playwright.async_api import async_playwright
+
+from src.mp.js_extract import extract_html, extract_page
+
+REVIEW_ROW = """
+<tr>
+  <td class="rating">
+    <div class="date">{date}</div>
+    <div class="breakdown">
+      <div class="descriptor-container"><span class="descriptor">Calidad General</span>
+        <span class="score">{overall}</span></div>
+      <div class="descriptor-container"><span class="descriptor">Facilidad</span>
+        <span class="score">{ease}</span></div>
+    </div>
+  </td>
+  <td class="class">
+    <span class="name"><span class="response">{course}</span></span>
+    <span class="attendance">Asistencia: <span class="response">Obligatoria</span></span>
+    <span class="grade">Calificación Recibida: <span class="response">MB</span></span>
+    <span class="grade">Interés en la clase: <span class="response">Alto</span></span>
+  </td>
+  <td class="comments">
+    <p class="commentsParagraph">
+      {comment}
+    </p>
+    <div class="tagbox"><span>Explica bien</span> <span>Barco</span></div>
+  </td>
+</tr>
+"""
+
+PROFILE_HTML = f"""<!DOCTYPE html>
+<html><head><title>Juan Perez - MisProfesores</title></head><body>
+<div class="prof_headers"><h1>Juan <b>Pérez</b> López</h1></div>
+<div class="rating-breakdown">
+  <div class="quality"><div class="grade">9.4</div></div>
+  <div class="takeAgain"><div class="grade">97%</div></div>
+  <div class="difficulty"><div class="grade">3,5</div></div>
+</div>
+<div class="right-breakdown"><div class="tag-box">
+  <span class="tag-box-choosetags">Muy claro (12)</span>
+  <span class="tag-box-choosetags">Sin contador</span>
+</div></div>
+<div class="table-toggle rating-count active">12 Calificaciones</div>
+<div class="rating-filter togglable"><table class="tftable">
+  <tr><th>Calificación</th><th>Clase</th><th>Comentario</th></tr>
+  {REVIEW_ROW.format(date="15/Ene/2024", overall="10", ease="4.5", course="Cálculo I",
+                     comment="Excelente profesor,&nbsp;muy <b>recomendado</b>.")}
+  {REVIEW_ROW.format(date="03/dic/2023", overall="8,5", ease="3", course="Álgebra",
+                     comment="Exigente")}
+</table></div>
+<ul class="pagination"><li><a href="?pag=1">1</a></li><li><a href="?pag=3">3</a></li></ul>
+<script>var ignorado = "Calidad 1 (2)";</script>
+</body></html>
+"""
+
+EMPTY_HTML = """<html><head><title>Sin perfil</title></head><body>
+<ul class="pagination"><li><a href="#">1</a></li><li><a href="#">4</a></li></ul>
+</body></html>"""
+
+
+class JsExtractTester:
+    def __init__(self):
+        self.ok = True
+
+    def check(self, condition: bool, message: str) -> None:
+        print(f"{'✅' if condition else '❌'} {message}")
+        self.ok = self.ok and condition
+
+    def test_parser_python(self):
+        print("\n" + "="*70)
+        print("TEST 1: Extracto del parser de Python")
+        print("="*70)
+        data = extract_html(PROFILE_HTML)
+        profile, reviews = data["profile"], data["reviews"]
+        self.check(profile["name"] == "JuanPérezLópez" and profile["overall_quality"] == 9.4
+                   and profile["difficulty"] == 3.5 and profile["recommend_percent"] == 97.0,
+                   f"Perfil: {profile['name']}, {profile['overall_quality']}, "
+                   f"{profile['difficulty']}, {profile['recommend_percent']}")
+        self.check(profile["tags"] == [{"label": "Muy claro", "count": 12},
+                                       {"label": "Sin contador", "count": None}],
+                   f"Etiquetas del perfil: {profile['tags']}")
+        self.check(len(reviews) == 2 and reviews[1]["date"] == "2023-12-03"
+                   and reviews[1]["overall"] == 8.5,
+                   f"{len(reviews)} reseñas, segunda del {reviews[1]['date'] if reviews else None}")
+        self.check(data["review_count"] == 12 and data["page_count"] == 3,
+                   f"Contadores: {data['review_count']} reseñas, {data['page_count']} páginas")
+
+    async def _compare(self, browser, html: str, label: str) -> None:
+        page = await browser.new_page()
+        try:
+            await page.set_content(html)
+            js = await extract_page(page)
+        finally:
+            await page.close()
+        py = extract_html(html)
+        # json.dumps distingue 97 de 97.0: compara valores y tipos
+        same = json.dumps(js, sort_keys=True) == json.dumps(py, sort_keys=True)
+        self.check(same, f"{label}: extracto JS idéntico al del parser de Python")
+        if not same:
+            for key in py:
+                if json.dumps(js.get(key), sort_keys=True) != json.dumps(py[key], sort_keys=True):
+                    print(f"   {key}:\n     js={js.get(key)}\n     py={py[key]}")
+
+    def test_diferencial(self) -> bool:
+        print("\n" + "="*70)
+        print("TEST 2: Extractor JS contra parser de Python")
+        print("="*70)
+
+        async def _main():
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(headless=True)
+                try:
+                    await self._compare(browser, PROFILE_HTML, "Perfil con reseñas")
+                    await self._compare(browser, EMPTY_HTML, "Página sin perfil")
+                finally:
+                    await browser.close()
+
+        try:
+            asyncio.run(_main())
+        except Exception as e:
+            print(f"❌ Chromium no disponible: {e}")
+            return False
+        return True
+
+    def run(self):
+        print("\n" + "="*70)
+        print("🧪 TEST DIFERENCIAL DEL EXTRACTOR JS")
+        print("="*70)
+        self.test_parser_python()
+        if not self.test_diferencial():
+            self.ok = False
+
+        print("\n" + "="*70)
+        print("✅ TODOS LOS TESTS PASARON" if self.ok else "❌ ALGUNOS TESTS FALLARON")
+        print("="*70)
+        return self.ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if JsExtractTester().run() else 1)
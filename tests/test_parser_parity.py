@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test de Paridad de Backends del Parser - SentimentInsightUAM
+
+Parsea cada página del archivo HTML (ARCHIVE_DIR, ver src/core/archive.py)
+con los backends bs4 y lxml de src/mp/parser.py y verifica:
+1. Perfil, reseñas, contador y número de páginas serializan a bytes idénticos
+2. Los selectores de validación de páginas dan el mismo resultado
+3. Tiempo de parseo de cada backend sobre todo el archivo
+
+Si el archivo está vacío, usa las páginas de ejemplo de test_js_extract.py.
+PARITY_LIMIT limita el número de páginas revisadas (default: todas).
+
+Uso:
+    python tests/test_parser_parity.py
+    ARCHIVE_DIR=/ruta/al/archive PARITY_LIMIT=500 python tests/test_parser_parity.py
+"""
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.archive import get_html_archive
+from src.mp.parser import ParsedPage
+
+FIELDS = ("profile", "reviews", "review_count", "page_count")
+SELECTORS = (
+    "div.rating-breakdown, div.rating-filter.togglable",
+    "div.rating-filter.togglable table.tftable",
+    "a[href*='/profesores/']",
+)
+
+
+def _snapshot(html: str, backend: str) -> bytes:
+    """Serializa todo lo que el parser extrae de una página con un backend."""
+    page = ParsedPage(html, backend)
+    data = {name: getattr(page, name) for name in FIELDS}
+    data["selectors"] = [page.has_selector(s) for s in SELECTORS]
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+class ParityTester:
+    def __init__(self):
+        self.limit = int(os.getenv("PARITY_LIMIT", "0")) or None
+        self.ok = True
+
+    def _pages(self) -> List[Tuple[str, str]]:
+        """Páginas a revisar como (etiqueta, HTML), sin repetir contenido."""
+        archive = get_html_archive()
+        seen: Dict[str, str] = {}
+        for entry in archive.entries():
+            if entry["sha256"] not in seen:
+                seen[entry["sha256"]] = f"{entry['slug']} p{entry['page']}"
+            if self.limit and len(seen) >= self.limit:
+                break
+        if seen:
+            print(f"Revisando {len(seen)} páginas de {archive.root}")
+            return [(label, archive.get(sha)) for sha, label in seen.items()]
+
+        print(f"⚠ El archivo {archive.root} está vacío; se usan las páginas de ejemplo")
+        from test_js_extract import EMPTY_HTML, PROFILE_HTML
+        return [("ejemplo perfil", PROFILE_HTML), ("ejemplo vacío", EMPTY_HTML)]
+
+    def run(self):
+        print("\n" + "="*70)
+        print("🧪 TEST DE PARIDAD DE BACKENDS DEL PARSER (bs4 vs lxml)")
+        print("="*70)
+        pages = self._pages()
+
+        tiempos = {"bs4": 0.0, "lxml": 0.0}
+        diferentes = []
+        for label, html in pages:
+            snapshots = {}
+            for backend in tiempos:
+                inicio = time.perf_counter()
+                snapshots[backend] = _snapshot(html, backend)
+                tiempos[backend] += time.perf_counter() - inicio
+            if snapshots["bs4"] != snapshots["lxml"]:
+                diferentes.append(label)
+                if len(diferentes) <= 5:
+                    print(f"❌ {label}:\n   bs4 ={snapshots['bs4'][:300]!r}\n   lxml={snapshots['lxml'][:300]!r}")
+
+        self.ok = not diferentes
+        print(f"{'✅' if self.ok else '❌'} {len(pages) - len(diferentes)}/{len(pages)} páginas idénticas")
+        speedup = tiempos["bs4"] / tiempos["lxml"] if tiempos["lxml"] else 0.0
+        print(f"⏱ bs4: {tiempos['bs4'] * 1000:.0f} ms, lxml: {tiempos['lxml'] * 1000:.0f} ms "
+              f"({speedup:.1f}x)")
+
+        print("\n" + "="*70)
+        print("✅ TODOS LOS TESTS PASARON" if self.ok else "❌ ALGUNOS TESTS FALLARON")
+        print("="*70)
+        return self.ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if ParityTester().run() else 1)
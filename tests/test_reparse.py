@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test del Re-parseo del Archivo HTML - SentimentInsightUAM
+
+Archiva páginas de perfiles en un archivo temporal y ejecuta reparse_archive
+(sin red ni BD):
+1. Tras una corrida incremental (página 1 archivada dos veces, con las reseñas
+   desplazadas) no se pierde la reseña que solo quedó en la versión anterior
+2. Reseñas idénticas en una misma página se conservan
+3. Una reseña borrada en el sitio no revive desde una versión anterior
+4. Si faltan páginas archivadas, el profesor se reporta incompleto
+
+Uso:
+    python tests/test_reparse.py
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.archive import HtmlArchive
+import src.mp.scrape_prof as scrape_prof
+import src.mp.reparse as reparse
+from test_js_extract import REVIEW_ROW
+
+
+def _row(day: int, comment: str) -> str:
+    return REVIEW_ROW.format(date=f"{day:02d}/Ene/2024", overall="9", ease="3",
+                             course="Cálculo I", comment=comment)
+
+
+def _page_html(count: int, rows: list) -> str:
+    return f"""<html><body>
+<div class="prof_headers"><h1>Juan Perez</h1></div>
+<div class="rating-breakdown">
+  <div class="quality"><div class="grade">9.0</div></div>
+  <div class="takeAgain"><div class="grade">90%</div></div>
+  <div class="difficulty"><div class="grade">3</div></div>
+</div>
+<div class="table-toggle rating-count active">{count} Calificaciones</div>
+<div class="rating-filter togglable"><table class="tftable">
+  <tr><th>Calificación</th><th>Clase</th><th>Comentario</th></tr>
+  {"".join(rows)}
+</table></div>
+</body></html>"""
+
+
+class ReparseTester:
+    def __init__(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="reparse-"))
+        self.archive = HtmlArchive(self.tmp / "archive")
+        scrape_prof.JSON_OUTPUT_DIR = self.tmp / "profesores"
+        reparse.DB_ENABLED = False
+        self.ok = True
+
+    def check(self, condition: bool, message: str) -> None:
+        print(f"{'✅' if condition else '❌'} {message}")
+        self.ok = self.ok and condition
+
+    def _reparse(self, slug: str):
+        stats = asyncio.run(reparse.reparse_archive(names=[slug], workers=1, archive=self.archive))
+        saved = json.loads((scrape_prof.JSON_OUTPUT_DIR / f"{slug}.json").read_text(encoding="utf-8"))
+        return stats, [r["comment"] for r in saved["reviews"]]
+
+    def test_resenias_desplazadas(self):
+        print("\n" + "="*70)
+        print("TEST 1: Página 1 archivada dos veces con reseñas desplazadas")
+        print("="*70)
+        slug = "desplazadas"
+        # Corrida completa: 7 reseñas (la página 2 tiene dos reseñas idénticas)
+        self.archive.put(slug, 1, _page_html(7, [_row(d, f"R{d}") for d in (20, 19, 18, 17, 16)]))
+        self.archive.put(slug, 2, _page_html(7, [_row(5, ""), _row(5, "")]))
+        # Corrida incremental: una reseña nueva empuja R16 a la página 2, que no se re-descarga
+        self.archive.put(slug, 1, _page_html(8, [_row(d, f"R{d}") for d in (25, 20, 19, 18, 17)]))
+
+        stats, comments = self._reparse(slug)
+        self.check(comments == ["R25", "R20", "R19", "R18", "R17", "R16", "", ""],
+                   f"Reseñas re-parseadas en orden: {comments}")
+        self.check(stats["incomplete"] == 0, "El conjunto coincide con el contador (modo reemplazar)")
+
+    def test_resenia_borrada(self):
+        print("\n" + "="*70)
+        print("TEST 2: Reseña borrada en el sitio")
+        print("="*70)
+        slug = "borrada"
+        self.archive.put(slug, 1, _page_html(3, [_row(d, f"R{d}") for d in (20, 19, 18)]))
+        self.archive.put(slug, 1, _page_html(2, [_row(d, f"R{d}") for d in (20, 18)]))
+
+        stats, comments = self._reparse(slug)
+        self.check(comments == ["R20", "R18"], f"La reseña borrada no revive: {comments}")
+        self.check(stats["incomplete"] == 0, "El conjunto coincide con el contador")
+
+    def test_pagina_faltante(self):
+        print("\n" + "="*70)
+        print("TEST 3: Página 2 sin archivar")
+        print("="*70)
+        slug = "faltante"
+        self.archive.put(slug, 1, _page_html(7, [_row(d, f"R{d}") for d in (20, 19, 18, 17, 16)]))
+
+        stats, comments = self._reparse(slug)
+        self.check(len(comments) == 5, f"Se guardan las {len(comments)} reseñas archivadas")
+        self.check(stats["incomplete"] == 1, "El profesor se reporta incompleto (modo actualizar)")
+
+    def run(self):
+        print("\n" + "="*70)
+        print("🧪 TEST DEL RE-PARSEO DEL ARCHIVO HTML")
+        print("="*70)
+        self.test_resenias_desplazadas()
+        self.test_resenia_borrada()
+        self.test_pagina_faltante()
+
+        print("\n" + "="*70)
+        print("✅ TODOS LOS TESTS PASARON" if self.ok else "❌ ALGUNOS TESTS FALLARON")
+        print("="*70)
+        return self.ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if ReparseTester().run() else 1)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Test del Servidor de Reproducción - SentimentInsightUAM
+
+Valida, sin red y sin bases de datos, el cassette y el servidor local de
+src/core/replay.py:
+1. Un cassette grabado se sirve bajo /<host>/<ruta> con los enlaces reescritos
+2. Peticiones condicionales con ETag reciben 304
+3. Rutas relativas al host se resuelven con el Referer
+4. Inyección de errores (503) y limitación de tasa (429)
+5. fetch_prof_html descarga a través del servidor con MP_BASE_URL
+6. El hook de httpx graba respuestas en un cassette nuevo
+7. El circuit breaker se abre ante errores 503 y pausa las peticiones
+
+Uso:
+    python tests/test_replay_server.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+
+from src.core.replay import Cassette, ReplayServer, record_httpx_response
+import src.core.replay as replay
+import src.core.resilience as resilience
+import src.mp.scrape_prof as scrape_prof
+
+PROFILE_URL = "https://www.misprofesores.com/profesores/Juan-Perez_1"
+PROFILE_HTML = (
+    "<html><body><h1>Juan Perez</h1>"
+    "<div class='rating-breakdown'></div>"
+    f"<a href='{PROFILE_URL}?pag=2'>Siguiente</a>"
+    "</body></html>"
+)
+
+
+class ReplayTester:
+    def __init__(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="cassette-"))
+        self.cassette = Cassette(self.tmp / "fuente")
+        self.cassette.record("GET", PROFILE_URL, 200,
+                             {"Content-Type": "text/html; charset=utf-8", "ETag": '"v1"'},
+                             PROFILE_HTML.encode())
+        self.cassette.record("GET", "https://sistemas.azc.uam.mx/Somos/Directorio/api?p=2", 200,
+                             {"Content-Type": "application/json"}, b'{"ok": true}')
+        self.ok = True
+
+    def _start(self, **kwargs) -> ReplayServer:
+        server = ReplayServer(self.cassette, ("127.0.0.1", 0), seed=1, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def check(self, condition: bool, message: str) -> None:
+        print(f"{'✅' if condition else '❌'} {message}")
+        self.ok = self.ok and condition
+
+    def test_reproduccion(self):
+        print("\n" + "="*70)
+        print("TEST 1: Reproducción, 304 y rutas relativas")
+        print("="*70)
+        server = self._start()
+        local = f"{server.origin}/www.misprofesores.com/profesores/Juan-Perez_1"
+        try:
+            r = httpx.get(local)
+            self.check(r.status_code == 200, f"Perfil servido ({r.status_code})")
+            self.check(f"{server.origin}/www.misprofesores.com/profesores" in r.text,
+                       "Enlaces absolutos reescritos hacia el servidor")
+            r = httpx.get(local, headers={"If-None-Match": '"v1"'})
+            self.check(r.status_code == 304, f"ETag coincidente → 304 ({r.status_code})")
+            r = httpx.get(f"{server.origin}/Somos/Directorio/api?p=2",
+                          headers={"Referer": f"{server.origin}/sistemas.azc.uam.mx/Somos/Directorio/"})
+            self.check(r.status_code == 200 and r.json() == {"ok": True},
+                       "Ruta relativa al host resuelta con el Referer")
+            r = httpx.get(f"{server.origin}/www.misprofesores.com/no-grabado")
+            self.check(r.status_code == 404, f"URL no grabada → 404 ({r.status_code})")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_fallas(self):
+        print("\n" + "="*70)
+        print("TEST 2: Inyección de errores y limitación de tasa")
+        print("="*70)
+        local = "/www.misprofesores.com/profesores/Juan-Perez_1"
+
+        server = self._start(error_rate=1.0)
+        try:
+            r = httpx.get(server.origin + local)
+            self.check(r.status_code == 503, f"error_rate=1 → 503 ({r.status_code})")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        server = self._start(rps=0.5, burst=2)
+        try:
+            codes = [httpx.get(server.origin + local).status_code for _ in range(4)]
+            self.check(codes[:2] == [200, 200] and 429 in codes[2:],
+                       f"rps=0.5, burst=2 → {codes}")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_scraper_y_grabacion(self):
+        print("\n" + "="*70)
+        print("TEST 3: fetch_prof_html con MP_BASE_URL y grabación con httpx")
+        print("="*70)
+        server = self._start(latency_ms=20)
+        scrape_prof.BASE = f"{server.origin}/www.misprofesores.com"
+
+        async def _main():
+            try:
+                page = await scrape_prof.fetch_prof_html(PROFILE_URL)
+                self.check("Juan Perez" in page.html, "fetch_prof_html descargó el perfil del servidor local")
+                self.check(scrape_prof.to_origin(f"{scrape_prof.BASE}/profesores/x")
+                           == "https://www.misprofesores.com/profesores/x",
+                           "to_origin restaura la URL del sitio real")
+
+                replay._recorder = Cassette(self.tmp / "grabado")
+                async with httpx.AsyncClient(event_hooks={"response": [record_httpx_response]}) as client:
+                    await client.get(scrape_prof.to_base(PROFILE_URL))
+                grabado = Cassette(self.tmp / "grabado")
+                self.check(len(grabado.entries) == 1, "El hook de httpx grabó la respuesta")
+            finally:
+                replay._recorder = None
+                await scrape_prof.close_http_client()
+
+        try:
+            asyncio.run(_main())
+        finally:
+            scrape_prof.BASE = scrape_prof.MP_ORIGIN
+            server.shutdown()
+            server.server_close()
+
+    def test_circuit_breaker(self):
+        print("\n" + "="*70)
+        print("TEST 4: Circuit breaker ante un servidor degradado")
+        print("="*70)
+        server = self._start(error_rate=1.0)
+        scrape_prof.BASE = f"{server.origin}/www.misprofesores.com"
+        resilience._breaker = resilience.CircuitBreaker(failures=2, cooldown_s=1.0)
+
+        async def _main():
+            try:
+                codes = [(await scrape_prof._http_get(PROFILE_URL)).status_code for _ in range(2)]
+                inicio = asyncio.get_running_loop().time()
+                await scrape_prof._http_get(PROFILE_URL)
+                pausa = asyncio.get_running_loop().time() - inicio
+                self.check(codes == [503, 503] and pausa >= 0.9,
+                           f"2 fallas abren el circuito; la siguiente petición esperó {pausa:.1f}s")
+                self.check(resilience._breaker._circuit(scrape_prof.BASE).cooldown_s == 2.0,
+                           "La prueba semiabierta falló y duplicó el enfriamiento")
+            finally:
+                await scrape_prof.close_http_client()
+
+        try:
+            asyncio.run(_main())
+        finally:
+            resilience._breaker = None
+            scrape_prof.BASE = scrape_prof.MP_ORIGIN
+            server.shutdown()
+            server.server_close()
+
+    def run(self):
+        print("\n" + "="*70)
+        print("🧪 TEST DEL SERVIDOR DE REPRODUCCIÓN")
+        print("="*70)
+        self.test_reproduccion()
+        self.test_fallas()
+        self.test_scraper_y_grabacion()
+        self.test_circuit_breaker()
+
+        print("\n" + "="*70)
+        print("✅ TODOS LOS TESTS PASARON" if self.ok else "❌ ALGUNOS TESTS FALLARON")
+        print("="*70)
+        return self.ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if ReplayTester().run() else 1)
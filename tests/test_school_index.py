@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test del Índice de la Escuela - SentimentInsightUAM
+
+Verifica con páginas de ejemplo (sin red):
+1. parse_school_listing lee el número de reseñas de su propia celda o etiqueta,
+   sin confundirlo con calificaciones, porcentajes ni años
+2. Un conteo ambiguo o ausente se reporta como None
+3. Enlaces relativos y la siguiente página se resuelven contra la URL base
+4. match_names empareja nombres uno a uno y descarta los de baja similitud
+
+Uso:
+    python tests/test_school_index.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.mp.parser import parse_school_listing
+from src.mp.school_index import match_names
+
+BASE_URL = "https://www.misprofesores.com/escuelas/UAM-Azcapotzalco_1234"
+
+LISTING_HTML = """<html><body>
+<table class="profesores">
+  <tr><th>Profesor</th><th>Departamento</th><th>Calidad</th><th>Reseñas</th><th>Recomiendan</th></tr>
+  <tr><td><a href="/profesores/Juan-Perez_1">Perez, Juan</a></td>
+      <td>Sistemas</td><td>9.4</td><td>23</td><td>90%</td></tr>
+  <tr><td><a href="/profesores/Ana-Ruiz_2">Ruiz Lopez, Ana</a></td>
+      <td>Sistemas</td><td>8</td><td>12</td><td>desde 2019</td></tr>
+  <tr><td><a href="/profesores/Luis-Gomez_3">Gomez, Luis</a></td>
+      <td>Sistemas</td><td><span>7.5</span> <span>5 Calificaciones</span></td><td>2021</td></tr>
+  <tr><td><a href="/profesores/Eva-Diaz_4">Diaz, Eva</a></td>
+      <td>Sistemas</td><td>9.0</td><td>80%</td></tr>
+</table>
+<div class="sin-tabla"><a href="/profesores/Raul-Mora_5">Mora, Raul</a> 7 Calificaciones</div>
+<ul class="pagination"><li><a href="?pag=1">1</a></li><li><a href="?pag=2">Siguiente</a></li></ul>
+</body></html>"""
+
+
+class SchoolIndexTester:
+    def __init__(self):
+        self.ok = True
+
+    def check(self, condition: bool, message: str) -> None:
+        print(f"{'✅' if condition else '❌'} {message}")
+        self.ok = self.ok and condition
+
+    def test_listado(self):
+        print("\n" + "="*70)
+        print("TEST 1: parse_school_listing")
+        print("="*70)
+        entries, next_url = parse_school_listing(LISTING_HTML, BASE_URL)
+        counts = {e["name"]: e["review_count"] for e in entries}
+        print(f"   {counts}")
+        self.check(counts["Perez, Juan"] == 23, "Conteo de su celda, no la calificación 9.4 ni el 90%")
+        self.check(counts["Gomez, Luis"] == 5, "Conteo con etiqueta sobre un año suelto")
+        self.check(counts["Mora, Raul"] == 7, "Conteo con etiqueta en texto suelto del contenedor")
+        self.check(counts["Ruiz Lopez, Ana"] is None, "Dos enteros sueltos (8 y 12): conteo ambiguo")
+        self.check(counts["Diaz, Eva"] is None, "Sin conteo: None")
+        self.check(entries[0]["url"] == "https://www.misprofesores.com/profesores/Juan-Perez_1",
+                   f"URL absoluta del perfil: {entries[0]['url']}")
+        self.check(next_url == f"{BASE_URL}?pag=2", f"Siguiente página: {next_url}")
+
+    def test_emparejamiento(self):
+        print("\n" + "="*70)
+        print("TEST 2: match_names")
+        print("="*70)
+        entries, _ = parse_school_listing(LISTING_HTML, BASE_URL)
+        names = ["Juan Pérez", "Ana Ruiz López", "Luis Gómez", "Profesor Inexistente"]
+        matches = {name: (entry["url"], score) for name, entry, score in match_names(names, entries)}
+        print(f"   {matches}")
+        self.check(matches.get("Juan Pérez", ("",))[0].endswith("Juan-Perez_1"),
+                   "Nombre con acento y orden 'Apellido, Nombre'")
+        self.check(matches.get("Ana Ruiz López", ("",))[0].endswith("Ana-Ruiz_2"),
+                   "Nombre con dos apellidos")
+        self.check("Profesor Inexistente" not in matches, "Nombre sin perfil parecido se descarta")
+        urls = [url for url, _ in matches.values()]
+        self.check(len(urls) == len(set(urls)), "Cada perfil se asigna a un solo nombre")
+
+        # Dos nombres compiten por el mismo perfil: gana el más parecido
+        duel = match_names(["Juan Perez", "Juan Pere"], entries[:1])
+        self.check([name for name, _, _ in duel] == ["Juan Perez"],
+                   f"Asignación uno a uno por mayor similitud: {duel}")
+
+    def run(self):
+        print("\n" + "="*70)
+        print("🧪 TEST DEL ÍNDICE DE LA ESCUELA")
+        print("="*70)
+        self.test_listado()
+        self.test_emparejamiento()
+
+        print("\n" + "="*70)
+        print("✅ TODOS LOS TESTS PASARON" if self.ok else "❌ ALGUNOS TESTS FALLARON")
+        print("="*70)
+        return self.ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if SchoolIndexTester().run() else 1)
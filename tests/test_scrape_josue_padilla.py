@@ -19,6 +19,8 @@ try:
     from dotenv import load_dotenv
     
     from src.mp.scrape_prof import find_and_scrape
+    from src.core.browser import close_browser_pool
+    from src.core.http import close_http_client
     from src.db import get_db_session, get_mongo_db, init_db, close_db
     from src.db.models import Profesor, Perfil, ReseniaMetadata
 except ImportError as e:
@@ -364,6 +366,8 @@ class TestScrapingIntegration:
         print("="*70)
         
         try:
+            await close_browser_pool()
+            await close_http_client()
             await close_db()
             print("✅ Conexiones cerradas")
         except Exception as e:
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test de Integración de la Cola de Trabajo - SentimentInsightUAM
+
+Valida la cola scrape_jobs contra un PostgreSQL local con varios procesos
+worker reclamando trabajos a la vez:
+1. Cada trabajo se procesa exactamente una vez (FOR UPDATE SKIP LOCKED)
+2. Un trabajo cuyo lease vence vuelve a reclamarse y cuenta otro intento
+3. Un trabajo que agota sus intentos queda como 'fallido'
+
+No hace scraping: los workers simulan el trabajo con una pausa corta.
+
+Requisitos: PostgreSQL en ejecución con la tabla scrape_jobs
+(scripts/init_postgres.sql o scripts/migrations/002_scrape_jobs.sql)
+
+Uso:
+    python tests/test_scrape_queue.py
+"""
+
+import asyncio
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+RUN_ID = f"test-cola-{os.getpid()}"
+NUM_TRABAJOS = 40
+NUM_PROCESOS = 4
+
+
+def _proceso_worker(n: int, resultados: "mp.Queue") -> None:
+    """Proceso worker: reclama y completa trabajos hasta vaciar la corrida."""
+    from src.db.queue import completar_trabajo, reclamar_trabajo
+
+    async def _main():
+        worker_id = f"test:{os.getpid()}:{n}"
+        procesados = []
+        while True:
+            job = await reclamar_trabajo(RUN_ID, worker_id, lease_s=30)
+            if job is None:
+                break
+            await asyncio.sleep(random.uniform(0.01, 0.05))
+            await completar_trabajo(job["id"], worker_id, "scrapeado")
+            procesados.append(job["id"])
+        return procesados
+
+    resultados.put(asyncio.run(_main()))
+
+
+class QueueTester:
+    def __init__(self):
+        self.ok = True
+
+    async def limpiar(self):
+        from sqlalchemy import delete
+        from src.db import get_db_session
+        from src.db.models import ScrapeJob
+
+        async with get_db_session() as session:
+            await session.execute(delete(ScrapeJob).where(ScrapeJob.run_id.like(f"{RUN_ID}%")))
+            await session.commit()
+
+    def test_reclamo_concurrente(self):
+        print("\n" + "="*70)
+        print(f"TEST 1: {NUM_PROCESOS} procesos, {NUM_TRABAJOS} trabajos")
+        print("="*70)
+        from src.db.queue import encolar_trabajos, resumen_cola
+
+        trabajos = [(f"Profesor Prueba {i}", float(i)) for i in range(NUM_TRABAJOS)]
+        insertados = asyncio.run(encolar_trabajos(RUN_ID, trabajos))
+        repetidos = asyncio.run(encolar_trabajos(RUN_ID, trabajos))
+        assert insertados == NUM_TRABAJOS, f"Se esperaban {NUM_TRABAJOS} inserciones, hubo {insertados}"
+        assert repetidos == 0, "Reencolar la misma corrida no debe duplicar trabajos"
+
+        ctx = mp.get_context("spawn")
+        resultados = ctx.Queue()
+        procesos = [ctx.Process(target=_proceso_worker, args=(n, resultados)) for n in range(NUM_PROCESOS)]
+        inicio = time.monotonic()
+        for p in procesos:
+            p.start()
+        procesados = []
+        por_proceso = []
+        for _ in procesos:
+            ids = resultados.get(timeout=120)
+            por_proceso.append(len(ids))
+            procesados.extend(ids)
+        for p in procesos:
+            p.join()
+
+        duplicados = [i for i, n in Counter(procesados).items() if n > 1]
+        assert not duplicados, f"Trabajos procesados más de una vez: {duplicados}"
+        assert len(procesados) == NUM_TRABAJOS, f"Procesados {len(procesados)} de {NUM_TRABAJOS}"
+
+        resumen = asyncio.run(resumen_cola(RUN_ID))
+        assert resumen == {"terminado": NUM_TRABAJOS}, f"Estado inesperado: {resumen}"
+        print(f"✅ {NUM_TRABAJOS} trabajos procesados una sola vez en {time.monotonic() - inicio:.1f}s")
+        print(f"   Reparto por proceso: {por_proceso}")
+
+    def test_lease_vencido(self):
+        print("\n" + "="*70)
+        print("TEST 2: Lease vencido y agotamiento de intentos")
+        print("="*70)
+        from src.db.queue import encolar_trabajos, reclamar_trabajo, resumen_cola
+
+        run_id = f"{RUN_ID}-lease"
+
+        async def _escenario():
+            await encolar_trabajos(run_id, [("Profesor Lease", 1.0)], max_intentos=2)
+
+            # Worker A reclama y "muere" sin completar
+            a = await reclamar_trabajo(run_id, "test:A", lease_s=1)
+            assert a and a["intentos"] == 1
+            assert await reclamar_trabajo(run_id, "test:B", lease_s=1) is None, \
+                "Un trabajo con lease vigente no debe reclamarse"
+
+            # Al vencer el lease, worker B lo toma como segundo intento
+            await asyncio.sleep(2)
+            b = await reclamar_trabajo(run_id, "test:B", lease_s=1)
+            assert b and b["id"] == a["id"] and b["intentos"] == 2
+
+            # B también muere: sin intentos restantes, el trabajo queda fallido
+            await asyncio.sleep(2)
+            assert await reclamar_trabajo(run_id, "test:C", lease_s=1) is None
+            return await resumen_cola(run_id)
+
+        resumen = asyncio.run(_escenario())
+        assert resumen == {"fallido": 1}, f"Estado inesperado: {resumen}"
+        print("✅ Lease vencido reclamado por otro worker y marcado fallido al agotar intentos")
+
+    def run(self):
+        print("\n" + "="*70)
+        print("🧪 TEST DE COLA DE TRABAJO (scrape_jobs)")
+        print("="*70)
+        try:
+            asyncio.run(self.limpiar())
+        except Exception as e:
+            print(f"❌ PostgreSQL no disponible: {e}")
+            return False
+
+        for test in (self.test_reclamo_concurrente, self.test_lease_vencido):
+            try:
+                test()
+            except AssertionError as e:
+                print(f"❌ {e}")
+                self.ok = False
+        asyncio.run(self.limpiar())
+
+        print("\n" + "="*70)
+        print("✅ TODOS LOS TESTS PASARON" if self.ok else "❌ ALGUNOS TESTS FALLARON")
+        print("="*70)
+        return self.ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if QueueTester().run() else 1)